@@ -170,26 +170,21 @@ class QtAnnotator(Annotator):
         """
         Copy tag of previous image
         """
-        if self._data_counter != 0:
+        tag_groups: Optional[dict] = self._previous_tag_groups()
+        if tag_groups is not None:
 
             if not self._scene.tag_groups.additional_attributes:
-                 self._scene.tag_groups.additional_attributes = list(
-                     self._dataset[self._data_counter - 1].annotation["tag groups"]["additional_attributes"])
+                 self._scene.tag_groups.additional_attributes = list(tag_groups["additional_attributes"])
             if not self._scene.tag_groups.environment:
-                self._scene.tag_groups.environment = list(
-                    self._dataset[self._data_counter - 1].annotation["tag groups"]["environment"])
+                self._scene.tag_groups.environment = list(tag_groups["environment"])
             if not self._scene.tag_groups.light:
-                self._scene.tag_groups.light = list(
-                    self._dataset[self._data_counter - 1].annotation["tag groups"]["light"])
+                self._scene.tag_groups.light = list(tag_groups["light"])
             if not self._scene.tag_groups.time_of_day:
-                self._scene.tag_groups.time_of_day = list(
-                    self._dataset[self._data_counter - 1].annotation["tag groups"]["time_of_day"])
+                self._scene.tag_groups.time_of_day = list(tag_groups["time_of_day"])
             if not self._scene.tag_groups.track_layout:
-                self._scene.tag_groups.track_layout = list(
-                    self._dataset[self._data_counter - 1].annotation["tag groups"]["track_layout"])
+                self._scene.tag_groups.track_layout = list(tag_groups["track_layout"])
             if not self._scene.tag_groups.weather:
-                self._scene.tag_groups.weather = list(
-                    self._dataset[self._data_counter - 1].annotation["tag groups"]["weather"])
+                self._scene.tag_groups.weather = list(tag_groups["weather"])
 
             # update gui
             self._gui_event.post(
@@ -206,19 +201,14 @@ class QtAnnotator(Annotator):
         """
         Copy tag of previous image, overwrite existent tag groups
         """
-        if self._data_counter != 0:
-            self._scene.tag_groups.additional_attributes = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["additional_attributes"])
-            self._scene.tag_groups.environment = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["environment"])
-            self._scene.tag_groups.light = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["light"])
-            self._scene.tag_groups.time_of_day = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["time_of_day"])
-            self._scene.tag_groups.track_layout = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["track_layout"])
-            self._scene.tag_groups.weather = list(
-                self._dataset[self._data_counter - 1].annotation["tag groups"]["weather"])
+        tag_groups: Optional[dict] = self._previous_tag_groups()
+        if tag_groups is not None:
+            self._scene.tag_groups.additional_attributes = list(tag_groups["additional_attributes"])
+            self._scene.tag_groups.environment = list(tag_groups["environment"])
+            self._scene.tag_groups.light = list(tag_groups["light"])
+            self._scene.tag_groups.time_of_day = list(tag_groups["time_of_day"])
+            self._scene.tag_groups.track_layout = list(tag_groups["track_layout"])
+            self._scene.tag_groups.weather = list(tag_groups["weather"])
 
             # update gui
             self._gui_event.post(
@@ -231,6 +221,21 @@ class QtAnnotator(Annotator):
                 "additional": self._scene.tag_groups.additional_attributes}
             )
 
+    def _previous_tag_groups(self) -> Optional[dict]:
+        """
+        Tag groups of the previous scene, read from its annotation without
+        loading the image or tracks.
+        :return: Tags by tag group, None for the first or an unannotated scene
+        """
+        if self._data_counter == 0:
+            return None
+        annotation: Optional[dict] = self._dataset.read_annotation_keys(
+            self._data_counter - 1, ("tag groups",)
+        )
+        if annotation is None:
+            return None
+        return annotation.get("tag groups")
+
     def _add_initial_ego_track(self):
         if len(self._scene.tracks) == 0:
             if not (self._scene.tag_groups.track_layout.count("unknown") or self._scene.tag_groups.additional_attributes.count("duplicate")):
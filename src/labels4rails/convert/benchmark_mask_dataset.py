@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import time
+from typing import Optional
+
+import cv2
+
+import hydra.core.config_store
+from hydra import compose, initialize
+
+from labels4rails import data
+from labels4rails import label_conversion
+from labels4rails.utils.config import Labels4RailsConfig
+
+config_store = hydra.core.config_store.ConfigStore.instance()
+config_store.store(name="rail_label_config", node=Labels4RailsConfig)
+
+
+def main(
+    data_path_in: str,
+    masks_path: str,
+    images_path: Optional[str],
+    size: Optional[tuple[int, int]],
+    limit: int,
+    cfg_file: Optional[str] = None,
+):
+    dataset = data.DataSet(None, data_path_in)
+    # Same configuration as the export of the pixelmasks
+    cfg: Labels4RailsConfig = label_conversion.label_converter_segmentation.default_config()
+    if cfg_file:
+        if pathlib.Path(cfg_file).is_absolute():
+            cfg_file = pathlib.Path(cfg_file).relative_to(pathlib.Path(__file__).parent)
+        initialize(config_path=str(pathlib.Path(cfg_file).parent))
+        cfg = compose(config_name=pathlib.Path(cfg_file).name)
+    scenes = label_conversion.MaskDataset(dataset, cfg, output_size=size)
+    names = scenes.names[:limit]
+    if not names:
+        print("No annotated scenes found in", data_path_in)
+        return
+    masks_dir = pathlib.Path(data_path_in).joinpath(masks_path)
+    images_dir = None if images_path is None else pathlib.Path(data_path_in).joinpath(images_path)
+    items = dict(zip(dataset.names, range(len(dataset))))
+
+    start = time.perf_counter()
+    for index in range(len(names)):
+        scenes[index]
+    rendered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        cv2.imread(str(masks_dir / (name + ".png")), cv2.IMREAD_UNCHANGED)
+        if images_dir is not None:
+            cv2.imread(str(images_dir / (name + ".jpg")))
+        else:
+            image = dataset[items[name]].image
+            if size is not None:
+                cv2.resize(image, tuple(size), interpolation=cv2.INTER_AREA)
+    stored = time.perf_counter() - start
+
+    print(f"{len(names)} scenes, single process")
+    print(f"{'rendered on access':<20} {rendered / len(names) * 1000:>8.2f} ms/scene {len(names) / rendered:>8.1f} scenes/s")
+    print(f"{'pre-rendered PNGs':<20} {stored / len(names) * 1000:>8.2f} ms/scene {len(names) / stored:>8.1f} scenes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare loading frames with pixelmasks rendered on access against reading exported pixelmasks.')
+    parser.add_argument('in_data_path', type=str, help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('masks_path', type=str, help='exported pixelmasks relative to in_data_path')
+    parser.add_argument('-i', '--images', type=str, help='exported resized images relative to in_data_path, the frames are resized on access otherwise')
+    parser.add_argument('-s', '--size', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'), help='resolution the pixelmasks were exported at')
+    parser.add_argument('-n', '--limit', type=int, default=200, help='maximum number of scenes to load')
+    parser.add_argument('-c', '--config_file', type=str, help="relative path to the config file the pixelmasks were exported with")
+
+    args = parser.parse_args()
+    main(args.in_data_path, args.masks_path, args.images, args.size, args.limit, args.config_file)
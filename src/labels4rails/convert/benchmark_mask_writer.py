@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import tempfile
+import time
+
+import natsort
+import numpy as np
+import PIL.Image
+
+from labels4rails import label_conversion
+
+
+def main(masks_path: str, levels: list[int], limit: int):
+    mask_paths = natsort.natsorted(pathlib.Path(masks_path).glob("*.png"))[:limit]
+    # Pillow keeps palette indices, OpenCV would convert to colour
+    masks = [np.array(PIL.Image.open(path)) for path in mask_paths]
+    if not masks:
+        print("No masks found in", masks_path)
+        return
+    reference_bytes = sum(path.stat().st_size for path in mask_paths)
+    print(f"{len(masks)} masks, {reference_bytes / len(masks) / 1024:.1f} KiB per mask as stored\n")
+
+    writers = []
+    for level in levels:
+        for strategy in (label_conversion.PngStrategy.DEFAULT, label_conversion.PngStrategy.RLE):
+            writers.append(("greyscale", level, strategy, label_conversion.OpenCVMaskWriter(level, strategy)))
+            writers.append(("palette", level, strategy, label_conversion.PaletteMaskWriter(None, level, strategy)))
+
+    print(f"{'writer':<10} {'level':>5} {'strategy':<12} {'ms/mask':>8} {'KiB/mask':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, level, strategy, writer in writers:
+            paths = [pathlib.Path(tmp_dir) / f"{index}.png" for index in range(len(masks))]
+            start = time.perf_counter()
+            for path, mask in zip(paths, masks):
+                writer.write(path, mask)
+            duration = time.perf_counter() - start
+            size = sum(path.stat().st_size for path in paths)
+            print(
+                f"{name:<10} {level:>5} {strategy.name:<12} "
+                f"{duration / len(masks) * 1000:>8.2f} {size / len(masks) / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure write time and file size of pixelmasks per PNG compression level.')
+    parser.add_argument('masks_path', type=str, help='directory containing exported pixelmasks')
+    parser.add_argument('-l', '--levels', type=int, nargs='+', default=list(range(10)), help='compression levels to measure')
+    parser.add_argument('-n', '--limit', type=int, default=200, help='maximum number of masks to write per setting')
+
+    args = parser.parse_args()
+    main(args.masks_path, args.levels, args.limit)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+
+from labels4rails import data
+from labels4rails import scene
+
+DUPLICATE_TAG = data.DUPLICATE_TAG
+
+
+def tag_duplicates(annotations_path: pathlib.Path, duplicates: dict) -> int:
+    """
+    Add the tag 'duplicate' to the additional attributes of duplicate frames,
+    frames without annotation get one with only this tag. The annotator does
+    not add an initial track to them and exporters skip them while they have
+    no tracks.
+    :return: Number of annotations written
+    """
+    store = data.open_annotation_store(annotations_path)
+    serializer = scene.DictSceneSerializer()
+    written = 0
+    for name in duplicates:
+        annotation = store.read(name)
+        if annotation is None:
+            tag_groups = scene.target.TagGroups([], [], [], [], [], [DUPLICATE_TAG])
+            annotation = serializer.serialize(scene.Scene(tag_groups, {}, {}))
+        else:
+            tags = annotation.setdefault("tag groups", {}).setdefault("additional_attributes", [])
+            if DUPLICATE_TAG in tags:
+                continue
+            tags.append(DUPLICATE_TAG)
+        store.write(name, annotation)
+        written += 1
+    if isinstance(store, data.PackedAnnotationStore):
+        store.close()
+    return written
+
+
+def main(data_path_in_list, threshold: int, output_file: str, tag: bool, workers: int):
+    lines = []
+    for data_path_in in data_path_in_list:
+        data_path = pathlib.Path(data_path_in)
+        hashes = data.FrameHashes(data_path / "images", workers=workers)
+        duplicates = hashes.duplicates(threshold)
+        print(f"{data_path}: {len(duplicates)} of {len(hashes)} frames are near-duplicates, hashed {hashes.hashed} images.")
+        lines += [f"{data_path}\t{name}\t{kept}\n" for name, kept in duplicates.items()]
+        if tag:
+            written = tag_duplicates(data_path / "annotations", duplicates)
+            print(f"Tagged {written} frames as '{DUPLICATE_TAG}'.")
+    if output_file:
+        with open(output_file, "w") as file_pointer:
+            file_pointer.writelines(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Find duplicate and near-duplicate frames by their perceptual hash, e.g. of a standing train.')
+    parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('-t', '--threshold', type=int, default=data.frame_hashes.DEFAULT_THRESHOLD, help='maximum number of differing hash bits (of 64) of near-duplicates, 0 for exact duplicates only')
+    parser.add_argument('-o', '--output', type=str, help='text file to store data batch, duplicate frame and the kept frame it duplicates per line')
+    parser.add_argument('--tag', action='store_true', help="add the tag 'duplicate' to the additional attributes of duplicate frames (frames without annotation get one), so the annotator shows them and exporters skip them")
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of threads decoding images')
+
+    args = parser.parse_args()
+    main(args.in_data_path, args.threshold, args.output, args.tag, args.workers)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+import argparse
+
+from labels4rails import data
+
+
+def main(annotations_path: str, unpack: bool, remove: bool):
+    if unpack:
+        data.unpack_annotations(annotations_path, remove)
+    else:
+        data.pack_annotations(annotations_path, remove)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert annotations between one JSON file per scene and a single annotation pack.')
+    parser.add_argument('annotations_path', type=str, help='path to the annotations directory of a data batch')
+    parser.add_argument('-u', '--unpack', action='store_true', help='convert the annotation pack into JSON files')
+    parser.add_argument('-r', '--remove', action='store_true', help='delete the source layout after converting')
+
+    args = parser.parse_args()
+    main(args.annotations_path, args.unpack, args.remove)
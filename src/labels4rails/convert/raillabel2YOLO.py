@@ -11,7 +11,7 @@ from src.utils.config import Labels4RailsConfig
 config_store = hydra.core.config_store.ConfigStore.instance()
 config_store.store(name="rail_label_config", node=Labels4RailsConfig)
 
-def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str]):
+def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str], workers : int = 1):
     cfg: Labels4RailsConfig = None
     if cfg_file:
         if pathlib.Path(cfg_file).is_absolute():
@@ -37,15 +37,16 @@ def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str]):
 
     dataset: data.IDataSet = data.DataSet(None, data_path_in)
     label_converter_yolo = label_conversion.LabelConverterYOLO(dataset, cfg)
-    label_converter_yolo.generate_switch_labels(output_pth, kinds, directions)
+    label_converter_yolo.generate_switch_labels(output_pth, kinds, directions, workers)
     
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Create YOLO labels.')
     parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
     parser.add_argument('out_data_path', type=str, nargs='+', help='path to resulting Yolo labels relative to in_data_path')
     parser.add_argument('-c', '--config_file', type=str, help="relative path to config file")
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes writing labels')
     
     args = parser.parse_args()
-    main(args.in_data_path[0], args.out_data_path[0], args.config_file)
+    main(args.in_data_path[0], args.out_data_path[0], args.config_file, args.workers)
 
 #Aufrufen mit D:\data\test_000 YOLO 
\ No newline at end of file
@@ -12,20 +12,38 @@ from src.utils.config import Labels4RailsConfig
 config_store = hydra.core.config_store.ConfigStore.instance()
 config_store.store(name="rail_label_config", node=Labels4RailsConfig)
 
-def main(data_path_in_list, data_path_out, cfg_file: Optional[str]): 
+def main(
+    data_path_in_list,
+    data_path_out,
+    cfg_file: Optional[str],
+    workers: int = 1,
+    palette: bool = False,
+    compression: Optional[int] = None,
+    size: Optional[tuple[int, int]] = None,
+    scale: Optional[float] = None,
+    images_path_out: Optional[str] = None,
+    undistort: bool = False,
+):
     cfg: Labels4RailsConfig = None
     if cfg_file:
         if pathlib.Path(cfg_file).is_absolute():
             cfg_file = pathlib.Path(cfg_file).relative_to(pathlib.Path(__file__).parent)
         initialize(config_path=str(pathlib.Path(cfg_file).parent))
         cfg = compose(config_name=pathlib.Path(cfg_file).name)
+    mask_writer: label_conversion.IMaskWriter = label_conversion.OpenCVMaskWriter(compression)
+    if palette:
+        colors = {} if cfg is None else label_conversion.mask_palette(cfg.targets.tracks)
+        mask_writer = label_conversion.PaletteMaskWriter(colors, 6 if compression is None else compression)
     for data_path_in in data_path_in_list:
         output_pth = pathlib.Path(data_path_in).joinpath(data_path_out)
         if output_pth.exists() == False:
             output_pth.mkdir(parents=True, exist_ok=True)
 
         label_converter_pm = label_conversion.label_converter.LabelConverterPixelmask(None, cfg, data_path_in)
-        label_converter_pm.generate_track_labels(output_pth)
+        images_pth = None if images_path_out is None else pathlib.Path(data_path_in).joinpath(images_path_out)
+        label_converter_pm.generate_track_labels(
+            output_pth, workers, mask_writer, size, scale, images_pth, undistort=undistort
+        )
 
 
 if __name__ == "__main__":
@@ -33,7 +51,25 @@ if __name__ == "__main__":
     parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
     parser.add_argument('out_data_path', type=str, help='path to resulting Yolo labels relative to in_data_path')
     parser.add_argument('-c', '--config_file', type=str, help="relative path to config file")
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes writing pixelmasks')
+    parser.add_argument('-p', '--palette', action='store_true', help='write palette PNGs showing the class colours')
+    parser.add_argument('--compression', type=int, choices=range(10), help='PNG compression level, 0 is fastest, 9 is smallest')
+    parser.add_argument('-s', '--size', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'), help='resolution of the pixelmasks, e.g. the training resolution')
+    parser.add_argument('--scale', type=float, help='factor from camera to pixelmask resolution, alternative to --size')
+    parser.add_argument('-i', '--images', type=str, help='path to store the images resized to the pixelmask resolution, relative to in_data_path')
+    parser.add_argument('-u', '--undistort', action='store_true', help='remove the lens distortion of the camera calibration from pixelmasks and images')
     
     args = parser.parse_args()
 
-    main(args.in_data_path, args.out_data_path, args.config_file)
+    main(
+        args.in_data_path,
+        args.out_data_path,
+        args.config_file,
+        args.workers,
+        args.palette,
+        args.compression,
+        args.size,
+        args.scale,
+        args.images,
+        args.undistort,
+    )
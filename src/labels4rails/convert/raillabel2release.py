@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import hydra.core.config_store
+from hydra import compose, initialize
+from typing import Optional
+import argparse
+import pathlib
+
+from labels4rails import scene
+from labels4rails import label_conversion
+from labels4rails.utils.config import Labels4RailsConfig
+
+config_store = hydra.core.config_store.ConfigStore.instance()
+config_store.store(name="rail_label_config", node=Labels4RailsConfig)
+
+def output_pth(data_path_in: str, path_out: Optional[str]) -> Optional[pathlib.Path]:
+    return None if path_out is None else pathlib.Path(data_path_in).joinpath(path_out)
+
+def main(
+    data_path_in_list,
+    masks_path_out: Optional[str],
+    yolo_path_out: Optional[str],
+    images_path_out: Optional[str],
+    metadata_path_out: Optional[str],
+    cfg_file: Optional[str],
+    workers: int = 1,
+    palette: bool = False,
+    compression: Optional[int] = None,
+    size: Optional[tuple[int, int]] = None,
+    scale: Optional[float] = None,
+):
+    cfg: Labels4RailsConfig = None
+    if cfg_file:
+        if pathlib.Path(cfg_file).is_absolute():
+            cfg_file = pathlib.Path(cfg_file).relative_to(pathlib.Path(__file__).parent)
+        initialize(config_path=str(pathlib.Path(cfg_file).parent))
+        cfg = compose(config_name=pathlib.Path(cfg_file).name)
+    mask_writer: label_conversion.IMaskWriter = label_conversion.OpenCVMaskWriter(compression)
+    if palette:
+        colors = {} if cfg is None else label_conversion.mask_palette(cfg.targets.tracks)
+        mask_writer = label_conversion.PaletteMaskWriter(colors, 6 if compression is None else compression)
+
+    directions = [
+        scene.target.SwitchDirection.LEFT,
+        scene.target.SwitchDirection.RIGHT,
+        scene.target.SwitchDirection.UNKNOWN,
+    ]
+    kinds = [
+        scene.target.SwitchKind.FORK,
+        scene.target.SwitchKind.MERGE,
+    ]
+
+    for data_path_in in data_path_in_list:
+        label_converter_pm = label_conversion.label_converter.LabelConverterPixelmask(None, cfg, data_path_in)
+        label_converter_pm.generate_labels(
+            output_pth(data_path_in, masks_path_out),
+            output_pth(data_path_in, yolo_path_out),
+            output_pth(data_path_in, images_path_out),
+            output_pth(data_path_in, metadata_path_out),
+            kinds,
+            directions,
+            workers,
+            mask_writer,
+            size,
+            scale,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create pixelmasks, YOLO labels, resized images and metadata in a single pass.')
+    parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('-m', '--masks', type=str, help='path to resulting pixelmasks relative to in_data_path')
+    parser.add_argument('-y', '--yolo', type=str, help='path to resulting YOLO labels relative to in_data_path')
+    parser.add_argument('-i', '--images', type=str, help='path to store the images resized to the pixelmask resolution, relative to in_data_path')
+    parser.add_argument('--metadata', type=str, help='CSV file with one row per scene, relative to in_data_path')
+    parser.add_argument('-c', '--config_file', type=str, help="relative path to config file")
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes writing labels')
+    parser.add_argument('-p', '--palette', action='store_true', help='write palette PNGs showing the class colours')
+    parser.add_argument('--compression', type=int, choices=range(10), help='PNG compression level, 0 is fastest, 9 is smallest')
+    parser.add_argument('-s', '--size', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'), help='resolution of pixelmasks and images, e.g. the training resolution')
+    parser.add_argument('--scale', type=float, help='factor from camera to pixelmask resolution, alternative to --size')
+
+    args = parser.parse_args()
+    if not (args.masks or args.yolo or args.images or args.metadata):
+        parser.error('expected at least one of --masks, --yolo, --images or --metadata')
+
+    main(
+        args.in_data_path,
+        args.masks,
+        args.yolo,
+        args.images,
+        args.metadata,
+        args.config_file,
+        args.workers,
+        args.palette,
+        args.compression,
+        args.size,
+        args.scale,
+    )
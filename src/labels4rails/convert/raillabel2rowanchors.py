@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import hydra.core.config_store
+from hydra import compose, initialize
+from typing import Optional
+import argparse
+import pathlib
+
+from labels4rails import label_conversion
+from labels4rails.utils.config import Labels4RailsConfig
+
+config_store = hydra.core.config_store.ConfigStore.instance()
+config_store.store(name="rail_label_config", node=Labels4RailsConfig)
+
+def main(
+    data_path_in_list,
+    data_path_out: str,
+    images_path_out: Optional[str],
+    cfg_file: Optional[str],
+    workers: int = 1,
+    crop: Optional[tuple[int, int, int, int]] = None,
+):
+    cfg: Labels4RailsConfig = None
+    if cfg_file:
+        if pathlib.Path(cfg_file).is_absolute():
+            cfg_file = pathlib.Path(cfg_file).relative_to(pathlib.Path(__file__).parent)
+        initialize(config_path=str(pathlib.Path(cfg_file).parent))
+        cfg = compose(config_name=pathlib.Path(cfg_file).name)
+
+    for data_path_in in data_path_in_list:
+        output_pth = pathlib.Path(data_path_in).joinpath(data_path_out)
+        images_pth = None if images_path_out is None else pathlib.Path(data_path_in).joinpath(images_path_out)
+        label_converter_pm = label_conversion.label_converter.LabelConverterPixelmask(None, cfg, data_path_in)
+        label_converter_pm.generate_row_anchor_labels(output_pth, images_pth, workers, crop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create row-anchor targets of the track detector from the rail splines.')
+    parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('out_data_path', type=str, help='path to store row_anchors.npz relative to in_data_path')
+    parser.add_argument('-i', '--images', type=str, help='path to store the images resized to the model input, relative to in_data_path')
+    parser.add_argument('-c', '--config_file', type=str, help="relative path to config file")
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes writing targets')
+    parser.add_argument('--crop', type=int, nargs=4, metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'), help='image region the model sees, the whole image by default')
+
+    args = parser.parse_args()
+    main(args.in_data_path, args.out_data_path, args.images, args.config_file, args.workers, args.crop)
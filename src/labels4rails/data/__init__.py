@@ -1,2 +1,18 @@
-from .camera_config import ICameraReader, OpenCVCameraReader
+from .annotation_store import (
+    IAnnotationStore,
+    DirectoryAnnotationStore,
+    PackedAnnotationStore,
+    open_annotation_store,
+    pack_annotations,
+    unpack_annotations,
+)
+from .annotation_hashes import AnnotationHashes
+from .camera_config import ICameraReader, OpenCVCameraReader, CameraCalibration, read_calibration
 from .data_set import Data, DataSet, IDataSet
+from .frame_cache import FrameCache
+from .frame_hashes import DUPLICATE_TAG, FrameHashes, HashIndex, hamming, hash_file, perceptual_hash
+from .json_keys import load_keys, loads_keys
+from .listing import IMAGE_EXTENSIONS, ImageListing
+from .stamp_cache import StampCache
+from .tag_index import TagIndex
+from .video import VideoDataSet, VideoIndex
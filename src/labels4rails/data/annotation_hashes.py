@@ -0,0 +1,69 @@
+from typing import Optional, Union
+import hashlib
+import pathlib
+from . import annotation_store
+from . import stamp_cache
+
+
+class AnnotationHashes:
+    """
+    Content hashes of the annotations of a chunk, e.g. to tell which
+    exported labels are outdated. Hashes are persisted next to the
+    annotations together with a version token of every annotation, only
+    added or changed annotations are read and none is parsed.
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        annotations_path: Union[pathlib.Path, str],
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param annotations_path: Annotations directory, JSON files or pack
+        :param cache_path: File to persist the hashes, None to store them
+            as hidden file in the parent directory of the annotations
+        """
+        self._annotations_path: pathlib.Path = pathlib.Path(annotations_path)
+        self._cache_path: pathlib.Path
+        if cache_path is None:
+            name: str = f".{self._annotations_path.name}.hashes.json"
+            self._cache_path = self._annotations_path.parent / name
+        else:
+            self._cache_path = pathlib.Path(cache_path)
+        # name -> hash
+        self._cache: stamp_cache.StampCache = stamp_cache.StampCache(self._cache_path, self.VERSION)
+        self.hashed: int = 0
+        self._update()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cache
+
+    def __getitem__(self, name: str) -> str:
+        """
+        :param name: Scene name
+        :return: SHA-1 of the stored annotation as hex digest
+        """
+        return self._cache[name]
+
+    @property
+    def names(self) -> list[str]:
+        return self._cache.names
+
+    def _update(self) -> None:
+        """
+        Load the persisted hashes and hash added or changed annotations.
+        """
+        store: annotation_store.IAnnotationStore = annotation_store.open_annotation_store(
+            self._annotations_path
+        )
+
+        def content_hash(name: str) -> Optional[str]:
+            raw: Optional[bytes] = store.read_raw(name)
+            return None if raw is None else hashlib.sha1(raw).hexdigest()
+
+        self.hashed = self._cache.update(store.stamps(), content_hash)
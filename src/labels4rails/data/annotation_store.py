@@ -0,0 +1,737 @@
+from typing import Iterable, Iterator, Optional, Union
+import abc
+import contextlib
+import json
+import os
+import pathlib
+import struct
+import threading
+import time
+import zlib
+from . import json_keys
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+PACK_NAME: str = "annotations.pack"
+
+# Files modified this recently may still change within the same timestamp
+# tick of coarse grained (network) file systems.
+_MTIME_SETTLE_SECONDS: float = 2.0
+# Bytes read at once while searching for the next record after invalid ones
+_RESYNC_CHUNK: int = 1 << 20
+
+
+class IAnnotationStore(metaclass=abc.ABCMeta):
+    """
+    Serialized scenes of a chunk, accessed by scene name.
+    """
+
+    @abc.abstractmethod
+    def __contains__(self, name: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def names(self) -> list[str]:
+        """
+        Names of all stored scenes.
+        :return: Scene names
+        """
+        pass
+
+    @abc.abstractmethod
+    def read(self, name: str) -> Optional[dict]:
+        """
+        Read serialized scene.
+        :param name: Scene name
+        :return: Serialized scene, None if not stored
+        """
+        pass
+
+    @abc.abstractmethod
+    def write(self, name: str, annotation: dict) -> None:
+        """
+        Store serialized scene, replacing a stored one.
+        :param name: Scene name
+        :param annotation: Serialized scene
+        """
+        pass
+
+    @abc.abstractmethod
+    def delete(self, name: str) -> None:
+        """
+        Remove serialized scene.
+        :param name: Scene name
+        """
+        pass
+
+    @abc.abstractmethod
+    def stamps(self) -> dict[str, Optional[tuple[int, ...]]]:
+        """
+        Cheap version token of every stored scene, changing whenever the
+        scene is written. Scenes are not read.
+        :return: Token by scene name, None if a change may go unnoticed
+        """
+        pass
+
+    def read_keys(self, name: str, keys: Iterable[str]) -> Optional[dict]:
+        """
+        Read top-level keys of a serialized scene, e.g. the tag groups
+        without the tracks.
+        :param name: Scene name
+        :param keys: Top-level keys to read
+        :return: Values by key, keys missing in the scene are left out,
+            None if not stored
+        """
+        annotation: Optional[dict] = self.read(name)
+        if annotation is None:
+            return None
+        return {key: annotation[key] for key in keys if key in annotation}
+
+    def read_raw(self, name: str) -> Optional[bytes]:
+        """
+        Read serialized scene as stored, e.g. to hash it or to locate
+        errors in the text. The content may not be valid JSON.
+        :param name: Scene name
+        :return: JSON text, None if not stored
+        """
+        annotation: Optional[dict] = self.read(name)
+        if annotation is None:
+            return None
+        return json.dumps(annotation, indent=4, sort_keys=True).encode()
+
+    def items(self) -> Iterator[tuple[str, dict]]:
+        """
+        Iterate over all stored scenes.
+        :return: Iterator over scene names and serialized scenes
+        """
+        for name in self.names():
+            annotation: Optional[dict] = self.read(name)
+            if annotation is not None:
+                yield name, annotation
+
+
+class DirectoryAnnotationStore(IAnnotationStore):
+    """
+    One JSON file per scene.
+    """
+
+    def __init__(self, annotations_path: Union[pathlib.Path, str]) -> None:
+        """
+        :param annotations_path: Directory containing the JSON files
+        """
+        self._annotations_path: pathlib.Path = pathlib.Path(annotations_path)
+
+    def __contains__(self, name: str) -> bool:
+        return self._path(name).is_file()
+
+    def _path(self, name: str) -> pathlib.Path:
+        return self._annotations_path / (name + ".json")
+
+    def names(self) -> list[str]:
+        return sorted(
+            entry.name.removesuffix(".json")
+            for entry in os.scandir(self._annotations_path)
+            if entry.name.endswith(".json") and not entry.name.startswith(".")
+        )
+
+    def stamps(self) -> dict[str, Optional[tuple[int, ...]]]:
+        """
+        Modification time and size of the JSON files.
+        :return: Token by scene name, None for files modified too recently
+        """
+        settled: int = int((time.time() - _MTIME_SETTLE_SECONDS) * 1e9)
+        stamps: dict[str, Optional[tuple[int, ...]]] = {}
+        with os.scandir(self._annotations_path) as directory:
+            for entry in directory:
+                if not entry.name.endswith(".json") or entry.name.startswith("."):
+                    continue
+                stat = entry.stat()
+                stamp: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+                stamps[entry.name.removesuffix(".json")] = stamp if stamp[0] < settled else None
+        return stamps
+
+    def read(self, name: str) -> Optional[dict]:
+        try:
+            with open(self._path(name)) as file_pointer:
+                return json.load(file_pointer)
+        except FileNotFoundError:
+            return None
+
+    def read_keys(self, name: str, keys: Iterable[str]) -> Optional[dict]:
+        """
+        Scenes are written with sorted keys, so the tag groups precede the
+        tracks and reading stops before them.
+        """
+        try:
+            with open(self._path(name)) as file_pointer:
+                return json_keys.load_keys(file_pointer, keys)
+        except FileNotFoundError:
+            return None
+
+    def read_raw(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as file_pointer:
+                return file_pointer.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, annotation: dict) -> None:
+        with open(self._path(name), "w") as file_pointer:
+            json.dump(annotation, file_pointer, indent=4, sort_keys=True)
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class PackedAnnotationStore(IAnnotationStore):
+    """
+    All scenes of a chunk in a single append-only record file. Every write
+    appends a record, a deletion appends a tombstone. The offset of the
+    latest record per scene is kept in memory and persisted in an index
+    file, so opening only scans records appended since the index was
+    written. Records carry a CRC, a torn record at the end of the file is
+    skipped by the next append. Superseded records are removed by
+    compaction. Appends and compaction of all processes are serialized by
+    a lock file next to the record file, every append first scans the
+    records other processes appended.
+
+    Record layout: magic, flags, name length, payload length, CRC32 of name
+    and payload, name (UTF-8), payload (compact JSON).
+    """
+
+    MAGIC: bytes = b"L4RP"
+    FILE_HEADER: bytes = b"L4RPACK1"
+    RECORD_HEADER = struct.Struct("<4sBHII")
+    TOMBSTONE: int = 1
+
+    def __init__(
+        self,
+        pack_path: Union[pathlib.Path, str],
+        auto_compact: float = 0.5,
+    ) -> None:
+        """
+        :param pack_path: Record file, created if missing
+        :param auto_compact: Compact after a write if superseded records
+            take more than this share of the file, 0 to disable
+        """
+        self._pack_path: pathlib.Path = pathlib.Path(pack_path)
+        self._index_path: pathlib.Path = self._pack_path.with_name(
+            f".{self._pack_path.name}.idx"
+        )
+        # Compaction replaces the record file, so it cannot carry the lock
+        self._lock_path: pathlib.Path = self._pack_path.with_name(
+            f".{self._pack_path.name}.lock"
+        )
+        self._auto_compact: float = auto_compact
+        self._offsets: dict[str, tuple[int, int]] = {}  # name: offset, size
+        self._end: int = len(self.FILE_HEADER)
+        self._dead_bytes: int = 0
+        self._inode: Optional[int] = None
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth: int = 0
+        self._file = None
+        self._file_pid: Optional[int] = None
+
+        try:
+            with open(self._pack_path, "xb") as file_pointer:
+                file_pointer.write(self.FILE_HEADER)
+        except FileExistsError:
+            pass
+        self._open()
+
+    def __getstate__(self) -> dict:
+        # Worker processes open their own file.
+        state: dict = self.__dict__.copy()
+        state["_file"] = None
+        state["_file_pid"] = None
+        state["_lock_file"] = None
+        state["_lock_depth"] = 0
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._pack_path
+
+    @property
+    def index_path(self) -> pathlib.Path:
+        return self._index_path
+
+    @property
+    def lock_path(self) -> pathlib.Path:
+        return self._lock_path
+
+    def names(self) -> list[str]:
+        return sorted(self._offsets)
+
+    def stamps(self) -> dict[str, Optional[tuple[int, ...]]]:
+        """
+        Location of the latest record of every scene, records are never
+        rewritten in place. Compaction replaces the file and its inode.
+        :return: Inode, offset and size by scene name
+        """
+        with self._lock:
+            return {name: (self._inode, *location) for name, location in self._offsets.items()}
+
+    def read(self, name: str) -> Optional[dict]:
+        with self._lock:
+            location: Optional[tuple[int, int]] = self._offsets.get(name)
+            if location is None:
+                return None
+            file_pointer = self._handle()
+            file_pointer.seek(location[0])
+            record: bytes = file_pointer.read(location[1])
+        _, _, payload = self._decode(record)
+        return json.loads(payload)
+
+    def read_keys(self, name: str, keys: Iterable[str]) -> Optional[dict]:
+        with self._lock:
+            location: Optional[tuple[int, int]] = self._offsets.get(name)
+            if location is None:
+                return None
+            file_pointer = self._handle()
+            file_pointer.seek(location[0])
+            record: bytes = file_pointer.read(location[1])
+        _, _, payload = self._decode(record)
+        return json_keys.loads_keys(payload.decode(), keys)
+
+    def read_raw(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            location: Optional[tuple[int, int]] = self._offsets.get(name)
+            if location is None:
+                return None
+            file_pointer = self._handle()
+            file_pointer.seek(location[0])
+            record: bytes = file_pointer.read(location[1])
+        _, _, payload = self._decode(record)
+        return payload
+
+    def write(self, name: str, annotation: dict) -> None:
+        with self._locked():
+            self._append(name, self._serialize(annotation), 0)
+            self._sync()
+
+    def write_many(self, annotations: Iterable[tuple[str, dict]]) -> None:
+        """
+        Write several scenes with a single sync to disk.
+        :param annotations: Scene names and serialized scenes
+        """
+        with self._locked():
+            for name, annotation in annotations:
+                self._append(name, self._serialize(annotation), 0, compact=False)
+            self._sync()
+
+    def delete(self, name: str) -> None:
+        with self._locked():
+            self._refresh()
+            if name in self._offsets:
+                self._append(name, b"", self.TOMBSTONE)
+                self._sync()
+
+    def compact(self) -> None:
+        """
+        Rewrite the record file with the latest record of every scene only.
+        The file is replaced atomically, other stores reopen it before their
+        next append.
+        """
+        with self._locked():
+            self._refresh()
+            file_pointer = self._handle()
+            tmp_path: pathlib.Path = self._pack_path.with_name(
+                f"{self._pack_path.name}.{os.getpid()}.tmp"
+            )
+            offsets: dict[str, tuple[int, int]] = {}
+            with open(tmp_path, "wb") as tmp_pointer:
+                tmp_pointer.write(self.FILE_HEADER)
+                for name in sorted(self._offsets, key=lambda name: self._offsets[name][0]):
+                    offset, size = self._offsets[name]
+                    file_pointer.seek(offset)
+                    offsets[name] = (tmp_pointer.tell(), size)
+                    tmp_pointer.write(file_pointer.read(size))
+                tmp_pointer.flush()
+                os.fsync(tmp_pointer.fileno())
+                end: int = tmp_pointer.tell()
+            file_pointer.close()
+            os.replace(tmp_path, self._pack_path)
+            self._file = open(self._pack_path, "r+b")
+            self._file_pid = os.getpid()
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            self._offsets = offsets
+            self._end = end
+            self._dead_bytes = 0
+            self._store_index()
+
+    def flush(self) -> None:
+        """
+        Persist the offset table, so the next open does not rescan the
+        records appended meanwhile.
+        """
+        with self._lock:
+            self._store_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self._store_index()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold the lock of the record file across threads and processes.
+        Nested use keeps the lock.
+        """
+        with self._lock:
+            if self._lock_depth == 0:
+                self._lock_file = open(self._lock_path, "a+b")
+                try:
+                    _lock_file(self._lock_file)
+                except BaseException:
+                    self._lock_file.close()
+                    raise
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    _unlock_file(self._lock_file)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _handle(self):
+        """
+        File object of the record file, reopened in forked processes.
+        :return: Binary file object opened for reading and appending
+        """
+        if self._file is None or self._file_pid != os.getpid():
+            self._file = open(self._pack_path, "r+b")
+            self._file_pid = os.getpid()
+            if os.fstat(self._file.fileno()).st_ino != self._inode:
+                # Compacted meanwhile, the offsets refer to the replaced file
+                self._open()
+        return self._file
+
+    def _open(self) -> None:
+        """
+        Open the record file, load the offset table and scan records
+        appended after it was stored.
+        """
+        if self._file is not None and self._file_pid == os.getpid():
+            self._file.close()
+        self._file = open(self._pack_path, "r+b")
+        self._file_pid = os.getpid()
+        file_pointer = self._file
+        if file_pointer.read(len(self.FILE_HEADER)) != self.FILE_HEADER:
+            msg: str = f"'{self._pack_path}' is not an annotation pack."
+            raise ValueError(msg)
+        self._inode = os.fstat(file_pointer.fileno()).st_ino
+        self._offsets = {}
+        self._end = len(self.FILE_HEADER)
+        self._dead_bytes = 0
+        size: int = os.fstat(file_pointer.fileno()).st_size
+        self._load_index(size)
+        scanned_from: int = self._end
+        self._scan(file_pointer, size)
+        if self._end != scanned_from:
+            self._store_index()
+
+    def _refresh(self) -> None:
+        """
+        Catch up with records appended and compactions done by other
+        stores. Called with the lock held.
+        """
+        file_pointer = self._handle()
+        if os.stat(self._pack_path).st_ino != self._inode:
+            self._open()
+            return
+        self._scan(file_pointer, os.fstat(file_pointer.fileno()).st_size)
+
+    def _scan(self, file_pointer, size: int) -> None:
+        """
+        Read record headers from the end of the known records. Invalid
+        bytes left by an interrupted append are skipped if valid records
+        follow, otherwise the scan stops before them, an append of another
+        process may still be in progress.
+        :param file_pointer: Record file
+        :param size: Size of the record file
+        """
+        offset: int = self._end
+        while offset + self.RECORD_HEADER.size <= size:
+            record: Optional[tuple[int, str, int]] = self._record_at(file_pointer, offset, size)
+            if record is None:
+                following: Optional[int] = self._next_record(file_pointer, offset, size)
+                if following is None:
+                    break
+                print(f"Skipping {following - offset} bytes of incomplete records in '{self._pack_path}'.")
+                self._dead_bytes += following - offset
+                offset = following
+                continue
+            flags, name, record_size = record
+            self._register(name, flags, offset, record_size)
+            offset += record_size
+        self._end = offset
+
+    def _record_at(self, file_pointer, offset: int, size: int) -> Optional[tuple[int, str, int]]:
+        """
+        Read a record header and verify the record.
+        :param file_pointer: Record file
+        :param offset: Offset of the record
+        :param size: Size of the record file
+        :return: Flags, scene name and record size, None if there is no
+            complete valid record
+        """
+        if offset + self.RECORD_HEADER.size > size:
+            return None
+        file_pointer.seek(offset)
+        header: bytes = file_pointer.read(self.RECORD_HEADER.size)
+        magic, flags, name_length, payload_length, crc = self.RECORD_HEADER.unpack(header)
+        record_size: int = self.RECORD_HEADER.size + name_length + payload_length
+        if magic != self.MAGIC or offset + record_size > size:
+            return None
+        body: bytes = file_pointer.read(name_length + payload_length)
+        if zlib.crc32(body) != crc:
+            return None
+        try:
+            return flags, body[:name_length].decode(), record_size
+        except UnicodeDecodeError:
+            return None
+
+    def _next_record(self, file_pointer, offset: int, size: int) -> Optional[int]:
+        """
+        Search the next valid record after invalid bytes.
+        :param file_pointer: Record file
+        :param offset: Offset of the invalid bytes
+        :param size: Size of the record file
+        :return: Offset of the record, None if there is none
+        """
+        position: int = offset + 1
+        while position + self.RECORD_HEADER.size <= size:
+            file_pointer.seek(position)
+            chunk: bytes = file_pointer.read(min(_RESYNC_CHUNK, size - position))
+            found: int = chunk.find(self.MAGIC)
+            if found < 0:
+                # A magic may start in the last bytes of the chunk
+                position += max(1, len(chunk) - len(self.MAGIC) + 1)
+                continue
+            if self._record_at(file_pointer, position + found, size) is not None:
+                return position + found
+            position += found + 1
+        return None
+
+    def _register(self, name: str, flags: int, offset: int, record_size: int) -> None:
+        """
+        Update offset table with a record.
+        :param name: Scene name
+        :param flags: Record flags
+        :param offset: Offset of the record
+        :param record_size: Size of the record
+        """
+        previous: Optional[tuple[int, int]] = self._offsets.pop(name, None)
+        if previous is not None:
+            self._dead_bytes += previous[1]
+        if flags & self.TOMBSTONE:
+            self._dead_bytes += record_size
+        else:
+            self._offsets[name] = (offset, record_size)
+
+    def _append(self, name: str, payload: bytes, flags: int, compact: bool = True) -> None:
+        """
+        Append record at the end of the file, after the records of other
+        processes. Called with the lock held, '_sync' makes it durable.
+        :param name: Scene name
+        :param payload: Serialized scene
+        :param flags: Record flags
+        :param compact: Compact if superseded records exceed the share
+            given by 'auto_compact'
+        """
+        name_bytes: bytes = name.encode()
+        body: bytes = name_bytes + payload
+        header: bytes = self.RECORD_HEADER.pack(
+            self.MAGIC, flags, len(name_bytes), len(payload), zlib.crc32(body)
+        )
+        self._refresh()
+        file_pointer = self._handle()
+        offset: int = file_pointer.seek(0, os.SEEK_END)
+        # Bytes after the last valid record are left by an interrupted append
+        self._dead_bytes += offset - self._end
+        file_pointer.write(header + body)
+        record_size: int = len(header) + len(body)
+        self._register(name, flags, offset, record_size)
+        self._end = offset + record_size
+        if compact and self._auto_compact and self._dead_bytes > self._auto_compact * self._end:
+            self._sync()
+            self.compact()
+
+    def _sync(self) -> None:
+        """
+        Write appended records to disk.
+        """
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _serialize(annotation: dict) -> bytes:
+        return json.dumps(annotation, sort_keys=True, separators=(",", ":")).encode()
+
+    def _decode(self, record: bytes) -> tuple[int, str, bytes]:
+        """
+        Split and verify a record.
+        :param record: Record including header
+        :return: Flags, scene name and payload
+        """
+        magic, flags, name_length, payload_length, crc = self.RECORD_HEADER.unpack_from(record)
+        body: bytes = record[self.RECORD_HEADER.size:]
+        if magic != self.MAGIC or zlib.crc32(body) != crc:
+            msg: str = f"Corrupt record in '{self._pack_path}'."
+            raise ValueError(msg)
+        return flags, body[:name_length].decode(), body[name_length:]
+
+    def _load_index(self, size: int) -> None:
+        """
+        Read persisted offset table if it matches the record file.
+        :param size: Size of the record file
+        """
+        try:
+            with open(self._index_path) as file_pointer:
+                index = json.load(file_pointer)
+        except (OSError, ValueError):
+            return
+        if not isinstance(index, dict) or index.get("end", size + 1) > size:
+            return
+        # Compaction replaces the record file and with it the inode
+        if index.get("inode") != self._inode:
+            return
+        self._offsets = {name: tuple(location) for name, location in index["offsets"].items()}
+        self._end = index["end"]
+        self._dead_bytes = index["dead_bytes"]
+
+    def _store_index(self) -> None:
+        """
+        Persist offset table. Failing to write is not an error, the records
+        are scanned next time.
+        """
+        index: dict = {
+            "inode": self._inode,
+            "end": self._end,
+            "dead_bytes": self._dead_bytes,
+            "offsets": self._offsets,
+        }
+        tmp_path: pathlib.Path = self._index_path.with_name(
+            f"{self._index_path.name}.{os.getpid()}.tmp"
+        )
+        try:
+            with open(tmp_path, "w") as file_pointer:
+                json.dump(index, file_pointer)
+            os.replace(tmp_path, self._index_path)
+        except OSError:
+            pass
+
+
+def _lock_file(file_pointer) -> None:
+    """
+    Wait for an exclusive lock of a file.
+    :param file_pointer: Open file
+    """
+    if fcntl is not None:
+        fcntl.flock(file_pointer.fileno(), fcntl.LOCK_EX)
+        return
+    file_pointer.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file_pointer.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # Gives up after 10 seconds, keep waiting
+            pass
+
+
+def _unlock_file(file_pointer) -> None:
+    """
+    Release the lock of a file.
+    :param file_pointer: Open file
+    """
+    if fcntl is not None:
+        fcntl.flock(file_pointer.fileno(), fcntl.LOCK_UN)
+        return
+    file_pointer.seek(0)
+    msvcrt.locking(file_pointer.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def open_annotation_store(annotations_path: Union[pathlib.Path, str]) -> IAnnotationStore:
+    """
+    Open the annotations of a chunk in the layout found on disk.
+    :param annotations_path: Annotations directory
+    :return: Packed store if the directory contains a pack, otherwise one
+        JSON file per scene
+    """
+    annotations_path = pathlib.Path(annotations_path)
+    pack_path: pathlib.Path = annotations_path / PACK_NAME
+    if pack_path.is_file():
+        return PackedAnnotationStore(pack_path)
+    return DirectoryAnnotationStore(annotations_path)
+
+
+def pack_annotations(annotations_path: Union[pathlib.Path, str], remove: bool = False) -> None:
+    """
+    Convert one JSON file per scene into a pack inside the same directory.
+    :param annotations_path: Annotations directory
+    :param remove: Delete the JSON files after packing
+    """
+    annotations_path = pathlib.Path(annotations_path)
+    directory_store = DirectoryAnnotationStore(annotations_path)
+    packed_store = PackedAnnotationStore(annotations_path / PACK_NAME, auto_compact=0)
+    names: list[str] = directory_store.names()
+    packed_store.write_many(directory_store.items())
+    packed_store.compact()
+    packed_store.close()
+    if remove:
+        for name in names:
+            directory_store.delete(name)
+
+
+def unpack_annotations(annotations_path: Union[pathlib.Path, str], remove: bool = False) -> None:
+    """
+    Convert a pack into one JSON file per scene inside the same directory.
+    :param annotations_path: Annotations directory
+    :param remove: Delete the pack after unpacking
+    """
+    annotations_path = pathlib.Path(annotations_path)
+    pack_path: pathlib.Path = annotations_path / PACK_NAME
+    if not pack_path.is_file():
+        msg: str = f"Could not find annotation pack in '{annotations_path}'."
+        raise FileNotFoundError(msg)
+    directory_store = DirectoryAnnotationStore(annotations_path)
+    packed_store = PackedAnnotationStore(pack_path)
+    for name, annotation in packed_store.items():
+        directory_store.write(name, annotation)
+    packed_store.close()
+    if remove:
+        os.remove(pack_path)
+        for path in (packed_store.index_path, packed_store.lock_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,14 +1,14 @@
-from typing import Union
+from typing import Optional, Union
 import abc
+import dataclasses
+import hashlib
 import pathlib
+import threading
 import cv2
 import numpy as np
 import numpy.typing as npt
 
 
-# replace cv2.FileStorage in _read_camera
-
-
 class ICameraReader(metaclass=abc.ABCMeta):
     """
     Read camera intrinsics.
@@ -67,84 +67,151 @@ class ICameraReader(metaclass=abc.ABCMeta):
         pass
 
 
+@dataclasses.dataclass(frozen=True)
+class CameraCalibration:
+    """
+    Parsed content of a camera calibration file. Arrays are read-only
+    because instances are shared between all readers of the same content.
+    """
+
+    digest: str
+    roll: float
+    pitch: float
+    yaw: float
+    width: float
+    height: float
+    f: float
+    tvec: npt.NDArray[np.float_]
+    camera_matrix: npt.NDArray[np.float_]
+    distortion_coefficients: npt.NDArray[np.float_]
+
+
+# (resolved path, modification time, size) -> content digest
+_calibration_digests: dict[tuple[str, int, int], str] = {}
+# content digest -> parsed calibration
+_calibrations: dict[str, CameraCalibration] = {}
+_calibrations_lock = threading.Lock()
+
+
+def _parse_calibration(content: str, digest: str) -> CameraCalibration:
+    """
+    Parse OpenCV style yaml.
+    :param content: Content of the calibration file
+    :param digest: Hash of the content
+    :return: Parsed calibration
+    """
+    calibration_file = cv2.FileStorage(
+        content, cv2.FileStorage_READ | cv2.FileStorage_MEMORY
+    )
+    numbers = calibration_file.getNode("distortion_coefficients")
+    dest_coef = []
+    for i in range(0, numbers.size()):
+        dest_coef.append(numbers.at(i).real())
+    dest_coef = np.array(dest_coef)
+
+    arrays: list[Optional[np.ndarray]] = [
+        calibration_file.getNode("tvec").mat(),
+        calibration_file.getNode("camera_matrix").mat(),
+        dest_coef,
+    ]
+    for array in arrays:
+        if array is not None:
+            array.setflags(write=False)
+
+    calibration = CameraCalibration(
+        digest,
+        calibration_file.getNode("roll").real(),
+        calibration_file.getNode("pitch").real(),
+        calibration_file.getNode("yaw").real(),
+        calibration_file.getNode("width").real(),
+        calibration_file.getNode("height").real(),
+        calibration_file.getNode("f").real(),
+        *arrays,
+    )
+    calibration_file.release()
+    return calibration
+
+
+def read_calibration(yaml_path: Union[pathlib.Path, str]) -> CameraCalibration:
+    """
+    Read camera calibration file. Files are parsed once per process and
+    modification. Files with identical content share one calibration.
+    :param yaml_path: Path to camera file
+    :return: Parsed calibration
+    """
+    path = pathlib.Path(yaml_path)
+    if not path.is_file():
+        msg: str = "Could not find camera calibration file."
+        raise FileNotFoundError(msg)
+
+    stat = path.stat()
+    key: tuple[str, int, int] = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _calibrations_lock:
+        digest: Optional[str] = _calibration_digests.get(key)
+        if digest is not None:
+            return _calibrations[digest]
+
+    content: bytes = path.read_bytes()
+    digest = hashlib.sha1(content).hexdigest()
+    with _calibrations_lock:
+        if digest not in _calibrations:
+            _calibrations[digest] = _parse_calibration(content.decode(), digest)
+        _calibration_digests[key] = digest
+        return _calibrations[digest]
+
+
 class OpenCVCameraReader(ICameraReader):
     """
     Read camera intrinsics from OpenCV style yaml.
     """
 
     def __init__(self, yaml_path: Union[pathlib.Path, str]) -> None:
-        self._path: Union[pathlib.Path, str] = yaml_path
-        self._read_camera()
-        self._roll = None
-        self._pitch = None
-        self._yaw = None
-        self._width = None
-        self._height = None
-        self._f = None
-        self._tvec = None
-        self._camera_matrix = None
-        self._distortion_coefficients = None
+        self._path: pathlib.Path = pathlib.Path(yaml_path)
+        self._calibration: CameraCalibration
         self._read_camera()
 
     def _read_camera(self) -> None:
         """
         Read in data from OpenCV style yaml.
         """
-        if not self._path.is_file():
-        # if not self._path:
-            msg: str = "Could not find camera calibration file."
-            raise FileNotFoundError(msg)
-
-        calibration_file = cv2.FileStorage(str(self._path), cv2.FileStorage_READ)
-        numbers = calibration_file.getNode("distortion_coefficients")
-        dest_coef = []
-        for i in range(0, numbers.size()):
-            dest_coef.append(numbers.at(i).real())
-        dest_coef = np.array(dest_coef)
-
-        self._roll = calibration_file.getNode("roll").real()
-        self._pitch = calibration_file.getNode("pitch").real()
-        self._yaw = calibration_file.getNode("yaw").real()
-        self._width = calibration_file.getNode("width").real()
-        self._height = calibration_file.getNode("height").real()
-        self._f = calibration_file.getNode("f").real()
-        self._tvec = calibration_file.getNode("tvec").mat()
-        self._camera_matrix = calibration_file.getNode("camera_matrix").mat()
-        self._distortion_coefficients = dest_coef
-        calibration_file.release()
+        self._calibration = read_calibration(self._path)
+
+    @property
+    def digest(self) -> str:
+        return self._calibration.digest
 
     @property
     def roll(self) -> npt.NDArray[np.float_]:
-        return self._roll
+        return self._calibration.roll
 
     @property
     def pitch(self) -> npt.NDArray[np.float_]:
-        return self._pitch
+        return self._calibration.pitch
 
     @property
     def yaw(self) -> npt.NDArray[np.float_]:
-        return self._yaw
+        return self._calibration.yaw
 
     @property
     def width(self) -> npt.NDArray[np.float_]:
-        return self._width
+        return self._calibration.width
 
     @property
     def height(self) -> npt.NDArray[np.float_]:
-        return self._height
+        return self._calibration.height
 
     @property
     def f(self) -> npt.NDArray[np.float_]:
-        return self._f
+        return self._calibration.f
 
     @property
     def tvec(self) -> npt.NDArray[np.float_]:
-        return self._tvec
+        return self._calibration.tvec
 
     @property
     def camera_matrix(self) -> npt.NDArray[np.float_]:
-        return self._camera_matrix
+        return self._calibration.camera_matrix
 
     @property
     def distortion_coefficients(self) -> npt.NDArray[np.float_]:
-        return self._distortion_coefficients
+        return self._calibration.distortion_coefficients
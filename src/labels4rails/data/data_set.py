@@ -1,14 +1,17 @@
-from typing import Union, Optional
+from typing import Iterable, Iterator, Union, Optional
 import abc
+import collections
+import concurrent.futures
 import dataclasses
-import json
 import pathlib
-from natsort import natsorted, ns
 from labels4rails.utils import config
 import numpy as np
 import numpy.typing as npt
 import cv2
+from . import annotation_store
 from . import camera_config
+from .frame_cache import FrameCache
+from . import listing
 from labels4rails.utils.config import Labels4RailsConfig
 
 
@@ -26,7 +29,7 @@ class Data:
     Data describing one scene
     """
 
-    image: npt.NDArray[np.uint8]
+    image: Optional[npt.NDArray[np.uint8]]
     name: str
     annotation: dict
     camera_cfg: camera_config.ICameraReader
@@ -48,6 +51,53 @@ class IDataSet(metaclass=abc.ABCMeta):
     def __getitem__(self, item) -> Data:
         pass
 
+    @property
+    @abc.abstractmethod
+    def camera_cfg(self) -> camera_config.ICameraReader:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def names(self) -> list[str]:
+        pass
+
+    def iter(
+        self,
+        workers: int = 1,
+        ordered: bool = True,
+        load_images: bool = True,
+        prefetch: Optional[int] = None,
+        processes: bool = False,
+        items: Optional[Iterable[int]] = None,
+    ) -> Iterator[Data]:
+        """
+        Iterate over the dataset.
+        :param workers: Number of workers loading scenes
+        :param ordered: Yield scenes in dataset order, otherwise as soon as
+            they are loaded
+        :param load_images: Decode images, otherwise 'image' is None
+        :param prefetch: Maximum number of scenes loaded ahead
+        :param processes: Load in worker processes instead of threads
+        :param items: Indices to load, all by default
+        :return: Iterator over scenes
+        """
+        items = range(len(self)) if items is None else items
+        for item in items:
+            yield self[item]
+
+    def read_annotation_keys(self, item: int, keys: Iterable[str]) -> Optional[dict]:
+        """
+        Read top-level keys of the annotation of a scene without loading
+        the image.
+        :param item: Index of scene
+        :param keys: Top-level keys to read, like 'tag groups'
+        :return: Values by key, None if the scene is not annotated
+        """
+        annotation: Optional[dict] = self[item].annotation
+        if annotation is None:
+            return None
+        return {key: annotation[key] for key in keys if key in annotation}
+
     def write_annotations(self, annotations, item, cfg) -> None:
         """
         Write serialized scenes to dedicated JSON file.
@@ -61,11 +111,19 @@ class DataSet(IDataSet):
     Loads images and annotations.
     """
 
-    def __init__(self, cfg: config.Paths, dataset_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        cfg: config.Paths,
+        dataset_path: Optional[str] = None,
+        frame_cache: Optional[FrameCache] = None,
+    ) -> None:
         """
         Initialize the data loader.
         :param cfg: Configuration data class
+        :param frame_cache: Cache serving decoded images, None to decode
+            every time
         """
+        self._frame_cache: Optional[FrameCache] = frame_cache
         if cfg:
             images_path: Union[pathlib.Path, str]
             images_path = pathlib.Path(cfg.images.path)
@@ -74,16 +132,14 @@ class DataSet(IDataSet):
                 msg: str = "Expected 'images_path' to be a directory."
                 raise NotADirectoryError(msg)
             extensions = set(cfg.images.extensions)
-            self._images_paths = []
-            for extension in extensions:
-                for image_path in images_path.glob(f"*.{extension}"):
-                    self._images_paths.append(image_path)
-            self._images_paths = natsorted(self._images_paths, alg=ns.IGNORECASE)
+            self._images_paths = listing.ImageListing(images_path, extensions).paths
 
             self._annotations_path: Union[pathlib.Path, str]
             self._annotations_path = pathlib.Path(cfg.annotations)
             self._annotations_path.mkdir(parents=True, exist_ok=True)
             self._annotation_path: Optional[pathlib.Path] = None
+            self._annotation_store: annotation_store.IAnnotationStore
+            self._annotation_store = annotation_store.open_annotation_store(self._annotations_path)
 
             camera_config_path: Union[pathlib.Path, str]
             camera_config_path = pathlib.Path(cfg.camera_extrinsic)
@@ -95,17 +151,16 @@ class DataSet(IDataSet):
             if not images_path.is_dir():
                 msg: str = "Expected 'images_path' to be a directory."
                 raise NotADirectoryError(msg)
-            extensions: set = {"jpg", "jepg", "png"}
-            self._images_paths = []
-            for extension in extensions:
-                for image_path in images_path.glob(f"*.{extension}"):
-                    self._images_paths.append(image_path)
-            self._images_paths = sorted(self._images_paths)
+            self._images_paths = listing.ImageListing(
+                images_path, listing.IMAGE_EXTENSIONS, natural=False
+            ).paths
 
             self._annotations_path: Union[pathlib.Path, str]
             self._annotations_path = pathlib.Path(dataset_path).joinpath("annotations")
             self._annotations_path.mkdir(parents=True, exist_ok=True)
             self._annotation_path: Optional[pathlib.Path] = None
+            self._annotation_store: annotation_store.IAnnotationStore
+            self._annotation_store = annotation_store.open_annotation_store(self._annotations_path)
 
             camera_config_path: Union[pathlib.Path, str]
             camera_config_path = pathlib.Path(dataset_path).joinpath("camera/camera.yaml")
@@ -118,35 +173,134 @@ class DataSet(IDataSet):
         return len(self._images_paths)
 
     def __getitem__(self, item) -> Data:
-        image_path = self._images_paths[item]
-        image = cv2.imread(str(image_path))
+        return self._load(item, True)
+
+    def _load(self, item: int, load_images: bool) -> Data:
+        """
+        Load scene.
+        :param item: Index of scene
+        :param load_images: Decode image
+        :return: Scene
+        """
+        name: str = self._name(item)
+        image = self._read_image(item) if load_images else None
         # Try to get annotations file.
-        annotation_path = self._annotations_path / (image_path.stem + ".json")
-        try:
-            with open(annotation_path) as file_pointer:
-                annotation = json.load(file_pointer)
-        except FileNotFoundError:
-            annotation = None
-        data = Data(image, image_path.stem, annotation, self._camera_reader)
+        annotation = self._annotation_store.read(name)
+        data = Data(image, name, annotation, self._camera_reader)
         return data
 
+    def read_annotation_keys(self, item: int, keys: Iterable[str]) -> Optional[dict]:
+        return self._annotation_store.read_keys(self._name(item), keys)
+
+    def _name(self, item: int) -> str:
+        """
+        Name of scene, also names its annotation file.
+        :param item: Index of scene
+        :return: Scene name
+        """
+        return self._images_paths[item].stem
+
+    def _read_image(self, item: int) -> npt.NDArray[np.uint8]:
+        """
+        Decode image of scene.
+        :param item: Index of scene
+        :return: BGR image
+        """
+        image_path: pathlib.Path = self._images_paths[item]
+        if self._frame_cache is not None:
+            return self._frame_cache.load(image_path, lambda: cv2.imread(str(image_path)))
+        return cv2.imread(str(image_path))
+
+    @property
+    def camera_cfg(self) -> camera_config.ICameraReader:
+        return self._camera_reader
+
+    @property
+    def names(self) -> list[str]:
+        return [self._name(item) for item in range(len(self))]
+
+    def iter(
+        self,
+        workers: int = 1,
+        ordered: bool = True,
+        load_images: bool = True,
+        prefetch: Optional[int] = None,
+        processes: bool = False,
+        items: Optional[Iterable[int]] = None,
+    ) -> Iterator[Data]:
+        """
+        Iterate over the dataset while loading scenes in a pool of workers.
+        Images get decoded and annotations parsed while the consumer is
+        still processing earlier scenes. At most 'prefetch' scenes are held
+        in memory ahead of the consumer.
+        :param workers: Number of workers loading scenes
+        :param ordered: Yield scenes in dataset order, otherwise as soon as
+            they are loaded
+        :param load_images: Decode images, otherwise 'image' is None
+        :param prefetch: Maximum number of scenes loaded ahead, defaults to
+            twice the number of workers
+        :param processes: Load in worker processes instead of threads
+        :param items: Indices to load, all by default
+        :return: Iterator over scenes
+        """
+        items = range(len(self)) if items is None else items
+        if workers <= 1:
+            for item in items:
+                yield self._load(item, load_images)
+            return
+
+        prefetch = 2 * workers if prefetch is None else max(1, prefetch)
+        executor: concurrent.futures.Executor
+        if processes:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(self,)
+            )
+            load = _load_in_worker
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+            load = self._load
+
+        items_iter: Iterator[int] = iter(items)
+        pending: collections.deque = collections.deque()
+        try:
+            for item in items_iter:
+                pending.append(executor.submit(load, item, load_images))
+                if len(pending) >= prefetch:
+                    break
+            while pending:
+                future: concurrent.futures.Future
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    yield future.result()
+                    # Keep the number of scenes in flight constant
+                    for item in items_iter:
+                        pending.append(executor.submit(load, item, load_images))
+                        break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def write_annotations(self, annotations, item, cfg: Labels4RailsConfig) -> None:
         """
-        Write serialized scenes to dedicated JSON file.
+        Write serialized scenes to the annotation store.
         :param annotations: Serialized scene to write
         """
-        image_path = self._images_paths[item]
-        annotation_path = self._annotations_path / (image_path.stem + ".json")
-        annotations = self.__check_unknown_tags(annotations, annotation_path, cfg)
-        with open(annotation_path, "w") as file_pointer:
-            json.dump(annotations, file_pointer, indent=4, sort_keys=True)
+        name: str = self._name(item)
+        annotations = self.__check_unknown_tags(annotations, name, cfg)
+        self._annotation_store.write(name, annotations)
 
-    def __check_unknown_tags(self, annotations, annotation_path, cfg: Labels4RailsConfig):
+    def __check_unknown_tags(self, annotations, name, cfg: Labels4RailsConfig):
         """
         Method that checks if annotation has any unknown tags that are not specified in the config.
         Any unknown tags will be added to the annotations dictionary
         :param annotations: annotation that is supposed to get saved
-        :param annotation_path: path to the annotation
+        :param name: name of the scene
         :param cfg: config file with the target tags
 
         """
@@ -160,34 +314,55 @@ class DataSet(IDataSet):
         cfg_tags["additional_attributes"] = cfg_tags.pop("additional")
 
         cfg_group = list(cfg_tags.keys())
-        if pathlib.Path(annotation_path).is_file():
-            with open(annotation_path, "r") as file:
-                data = json.load(file)
-                if "tag groups" in data:
-                    data = data["tag groups"]
+        data = self._annotation_store.read_keys(name, ("tag groups",))
+        if data is not None:
+            if "tag groups" in data:
+                data = data["tag groups"]
+                if data == annotations["tag groups"]:
+                    return annotations
+                else:
+                    file_group = list(data.keys())
+                    difference_groups = list(set(file_group) - set(cfg_group))
+                    if len(difference_groups) != 0:
+                        for additionalGroups in difference_groups:
+                            annotations["tag groups"][additionalGroups] = data[additionalGroups]
                     if data == annotations["tag groups"]:
                         return annotations
-                    else:
-                        file_group = list(data.keys())
-                        difference_groups = list(set(file_group) - set(cfg_group))
-                        if len(difference_groups) != 0:
-                            for additionalGroups in difference_groups:
-                                annotations["tag groups"][additionalGroups] = data[additionalGroups]
-                        if data == annotations["tag groups"]:
-                            return annotations
 
-                        for group, tags in data.items():
-                            if group not in difference_groups:
-                                difference_tags = list(set(tags) - set(cfg_tags[group]))
-                                if len(difference_tags) != 0:
-                                    for unknown_tag in difference_tags:
-                                        if unknown_tag not in annotations["tag groups"][group]:
-                                            annotations["tag groups"][group] = annotations["tag groups"][group] + [unknown_tag]
+                    for group, tags in data.items():
+                        if group not in difference_groups:
+                            difference_tags = list(set(tags) - set(cfg_tags[group]))
+                            if len(difference_tags) != 0:
+                                for unknown_tag in difference_tags:
+                                    if unknown_tag not in annotations["tag groups"][group]:
+                                        annotations["tag groups"][group] = annotations["tag groups"][group] + [unknown_tag]
 
 
 
-                return annotations
+            return annotations
 
 
         else:
             return annotations
+
+
+_worker_dataset: Optional[DataSet] = None
+
+
+def _init_worker(dataset: DataSet) -> None:
+    """
+    Store dataset once per worker process.
+    :param dataset: Dataset to load from
+    """
+    global _worker_dataset
+    _worker_dataset = dataset
+
+
+def _load_in_worker(item: int, load_images: bool) -> Data:
+    """
+    Load scene in worker process.
+    :param item: Index of scene
+    :param load_images: Decode image
+    :return: Scene
+    """
+    return _worker_dataset._load(item, load_images)
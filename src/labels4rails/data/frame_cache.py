@@ -0,0 +1,200 @@
+from typing import Callable, Optional, Union
+import hashlib
+import os
+import pathlib
+import threading
+import numpy as np
+import numpy.typing as npt
+
+
+def default_cache_dir() -> pathlib.Path:
+    """
+    Directory to store decoded frames between runs.
+    :return: Path inside the user cache directory
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")
+    return pathlib.Path(cache_home) / "labels4rails" / "frames"
+
+
+class FrameCache:
+    """
+    Decoded frames stored as '.npy' files on local disk. Frames are keyed by
+    their source file, its modification time and size, so edited sources
+    are decoded again. Cached frames are memory-mapped copy-on-write, which
+    lets processes reading the same chunk share pages through the page
+    cache. The total size is capped, least recently used frames are evicted
+    first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[pathlib.Path, str]] = None,
+        max_bytes: int = 16 * 1024 ** 3,
+    ) -> None:
+        """
+        :param cache_dir: Directory to store frames, None to use the user
+            cache directory
+        :param max_bytes: Maximum total size of all cached frames
+        """
+        self._cache_dir: pathlib.Path
+        self._cache_dir = default_cache_dir() if cache_dir is None else pathlib.Path(cache_dir)
+        self._max_bytes: int = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state: dict = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        return self._cache_dir
+
+    def load(
+        self,
+        source_path: Union[pathlib.Path, str],
+        decode: Callable[[], Optional[npt.NDArray[np.uint8]]],
+        frame: Optional[int] = None,
+    ) -> Optional[npt.NDArray[np.uint8]]:
+        """
+        Get frame from the cache or decode and store it.
+        :param source_path: File the frame is decoded from
+        :param decode: Decodes the frame if it is not cached
+        :param frame: Frame number for sources holding several frames
+        :return: Frame, None if decoding failed
+        """
+        cache_path: pathlib.Path = self._cache_path(pathlib.Path(source_path), frame)
+        image: Optional[npt.NDArray[np.uint8]] = self._read(cache_path)
+        if image is not None:
+            return image
+        image = decode()
+        if image is not None:
+            self._write(cache_path, image)
+        return image
+
+    def clear(self) -> None:
+        """
+        Remove all cached frames.
+        """
+        with self._lock:
+            for path, _, _ in self._scan():
+                self._remove(path)
+            self._size = 0
+
+    def _cache_path(self, source_path: pathlib.Path, frame: Optional[int]) -> pathlib.Path:
+        """
+        Location of a cached frame. Frames are grouped by source directory,
+        i.e. per chunk.
+        :param source_path: File the frame is decoded from
+        :param frame: Frame number for sources holding several frames
+        :return: Path of the '.npy' file
+        """
+        source_path = source_path.resolve()
+        stat = os.stat(source_path)
+        chunk: str = hashlib.sha1(str(source_path.parent).encode()).hexdigest()[:16]
+        key: str = f"{source_path.name}|{stat.st_mtime_ns}|{stat.st_size}|{frame}"
+        name: str = hashlib.sha1(key.encode()).hexdigest()
+        return self._cache_dir / chunk / f"{name}.npy"
+
+    def _read(self, cache_path: pathlib.Path) -> Optional[npt.NDArray[np.uint8]]:
+        """
+        Map a cached frame and mark it as recently used.
+        :param cache_path: Path of the '.npy' file
+        :return: Frame or None if not cached
+        """
+        try:
+            image = np.load(cache_path, mmap_mode="c", allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Truncated or foreign file
+            self._remove(cache_path)
+            return None
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return image
+
+    def _write(self, cache_path: pathlib.Path, image: npt.NDArray[np.uint8]) -> None:
+        """
+        Store frame and evict frames if the cache grew too large. Failing to
+        write (e.g. full disk) is not an error, the frame is decoded again
+        next time.
+        :param cache_path: Path of the '.npy' file
+        :param image: Decoded frame
+        """
+        tmp_path: pathlib.Path = cache_path.with_name(
+            f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as file_pointer:
+                np.save(file_pointer, np.ascontiguousarray(image), allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as error:
+            print("Could not store frame in cache:", error)
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += cache_path.stat().st_size
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used frames until the cache is below 90% of
+        its maximum size. The cache directory is rescanned, as other
+        processes may have added or removed frames.
+        """
+        entries: list[tuple[pathlib.Path, int, int]] = sorted(
+            self._scan(), key=lambda entry: entry[2]
+        )
+        self._size = sum(size for _, size, _ in entries)
+        target: int = int(self._max_bytes * 0.9)
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            self._remove(path)
+            self._size -= size
+
+    def _scan(self) -> list[tuple[pathlib.Path, int, int]]:
+        """
+        List cached frames.
+        :return: Path, size and time of last use of every cached frame
+        """
+        entries: list[tuple[pathlib.Path, int, int]] = []
+        if not self._cache_dir.is_dir():
+            return entries
+        for chunk_dir in os.scandir(self._cache_dir):
+            if not chunk_dir.is_dir():
+                continue
+            for entry in os.scandir(chunk_dir.path):
+                if not entry.name.endswith(".npy"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((pathlib.Path(entry.path), stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    @staticmethod
+    def _remove(path: pathlib.Path) -> None:
+        """
+        Delete file, ignore if it is already gone.
+        :param path: File to delete
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,227 @@
+from typing import Any, Iterable, Optional, Union
+import concurrent.futures
+import pathlib
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from . import listing
+from . import stamp_cache
+
+# Hamming distance up to which frames count as near-duplicates, out of 64
+# bits. Sensor noise of a standing train stays well below, a moving train
+# changes about half of the bits between frames.
+DEFAULT_THRESHOLD: int = 6
+# Additional attribute of duplicate frames, exporters skip tagged frames
+# without tracks
+DUPLICATE_TAG: str = "duplicate"
+
+# Files modified this recently may still change within the same timestamp
+# tick of coarse grained (network) file systems.
+_MTIME_SETTLE_SECONDS: float = 2.0
+
+
+def perceptual_hash(image: npt.NDArray[np.uint8]) -> int:
+    """
+    64 bit DCT hash of an image. Every bit tells whether one of the lowest
+    8x8 frequencies of the 32x32 downscaled image is above their median,
+    so similar images differ in few bits.
+    :param image: BGR or grayscale image of any size
+    :return: Hash as integer
+    """
+    gray: npt.NDArray[np.uint8] = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small: npt.NDArray[np.float32] = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low: npt.NDArray[np.float32] = cv2.dct(small)[:8, :8].flatten()
+    # The DC term only carries the brightness
+    bits: npt.NDArray[np.bool_] = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_file(image_path: Union[pathlib.Path, str]) -> int:
+    """
+    Hash of an image file. JPEGs are decoded at an eighth of their
+    resolution, which is plenty for the 32x32 hash input.
+    :param image_path: Image file
+    :return: Hash as integer
+    """
+    image: Optional[npt.NDArray[np.uint8]] = cv2.imread(str(image_path), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        msg: str = f"Could not read image '{image_path}'."
+        raise ValueError(msg)
+    return perceptual_hash(image)
+
+
+def hamming(hash_1: int, hash_2: int) -> int:
+    """
+    Number of differing bits.
+    """
+    return bin(hash_1 ^ hash_2).count("1")
+
+
+class HashIndex:
+    """
+    Multi-index hashing for the search of hashes within a fixed Hamming
+    distance. Hashes are split into one more part than the distance, by
+    the pigeonhole principle a match equals the query in at least one part.
+    Every part indexes the hashes by its value, a search only compares the
+    hashes sharing a part with the query.
+    """
+
+    def __init__(self, radius: int, bits: int = 64) -> None:
+        """
+        :param radius: Maximum Hamming distance of matches
+        :param bits: Length of the hashes
+        """
+        count: int = radius + 1
+        bounds: list[int] = [bits * part // count for part in range(count + 1)]
+        self._radius: int = radius
+        # shift and mask of every part
+        self._parts: list[tuple[int, int]] = [
+            (start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])
+        ]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._parts]
+        self._items: list[tuple[int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, hash_: int, value: Any) -> None:
+        """
+        Insert a hash.
+        :param hash_: Hash
+        :param value: Value returned by searches, like the frame name
+        """
+        item: int = len(self._items)
+        self._items.append((hash_, value))
+        for (shift, mask), table in zip(self._parts, self._tables):
+            table.setdefault((hash_ >> shift) & mask, []).append(item)
+
+    def search(self, hash_: int) -> list[tuple[int, Any]]:
+        """
+        Find all hashes within the distance of the index.
+        :param hash_: Hash to search
+        :return: Distance and value of every match, nearest first
+        """
+        compared: set[int] = set()
+        matches: list[tuple[int, Any]] = []
+        for (shift, mask), table in zip(self._parts, self._tables):
+            for item in table.get((hash_ >> shift) & mask, ()):
+                if item in compared:
+                    continue
+                compared.add(item)
+                distance: int = hamming(hash_, self._items[item][0])
+                if distance <= self._radius:
+                    matches.append((distance, self._items[item][1]))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class FrameHashes:
+    """
+    Perceptual hashes of the images of a chunk. Hashes are persisted next
+    to the images together with modification time and size of every file,
+    only added or changed images are decoded.
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        images_path: Union[pathlib.Path, str],
+        extensions: Iterable[str] = listing.IMAGE_EXTENSIONS,
+        natural: bool = False,
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        :param images_path: Directory containing the images
+        :param extensions: File extensions to hash
+        :param natural: Order images like 'ImageListing'
+        :param cache_path: File to persist the hashes, None to store them
+            as hidden file in the parent directory of the images
+        :param workers: Threads decoding images
+        """
+        self._images_path: pathlib.Path = pathlib.Path(images_path)
+        self._cache_path: pathlib.Path
+        if cache_path is None:
+            name: str = f".{self._images_path.name}.hashes.json"
+            self._cache_path = self._images_path.parent / name
+        else:
+            self._cache_path = pathlib.Path(cache_path)
+        self._paths: list[pathlib.Path] = listing.ImageListing(self._images_path, extensions, natural).paths
+        self._files: dict[str, str] = {path.stem: path.name for path in self._paths}
+        # file name -> hash
+        self._cache: stamp_cache.StampCache = stamp_cache.StampCache(self._cache_path, self.VERSION)
+        self.hashed: int = 0
+        self._update(workers)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __getitem__(self, name: str) -> int:
+        """
+        :param name: Scene name, the image file name without extension
+        :return: Hash of the image
+        """
+        return self._cache[self._files[name]]
+
+    @property
+    def names(self) -> list[str]:
+        return [path.stem for path in self._paths]
+
+    @property
+    def hashes(self) -> list[int]:
+        """
+        Hash of every image in listing order.
+        """
+        return [self._cache[path.name] for path in self._paths]
+
+    def duplicates(self, threshold: int = DEFAULT_THRESHOLD) -> dict[str, str]:
+        """
+        Find near-duplicate frames. Frames are visited in listing order, a
+        frame within the threshold of an earlier kept frame is a duplicate
+        of the nearest one, otherwise it is kept. Slowly changing sequences
+        therefore keep a frame whenever the view drifted far enough.
+        :param threshold: Maximum Hamming distance of duplicates
+        :return: Name of the kept frame by name of every duplicate
+        """
+        kept: HashIndex = HashIndex(threshold)
+        duplicates: dict[str, str] = {}
+        name: str
+        for name, hash_ in zip(self.names, self.hashes):
+            matches: list[tuple[int, Any]] = kept.search(hash_)
+            if matches:
+                duplicates[name] = matches[0][1]
+            else:
+                kept.add(hash_, name)
+        return duplicates
+
+    def unique_names(self, threshold: int = DEFAULT_THRESHOLD) -> list[str]:
+        """
+        Frames without earlier near-duplicate, e.g. as 'names' of exporters.
+        :param threshold: Maximum Hamming distance of duplicates
+        :return: Scene names in listing order
+        """
+        duplicates: dict[str, str] = self.duplicates(threshold)
+        return [name for name in self.names if name not in duplicates]
+
+    def _update(self, workers: int) -> None:
+        """
+        Load the persisted hashes and hash added or changed images.
+        :param workers: Threads decoding images
+        """
+        settled: int = int((time.time() - _MTIME_SETTLE_SECONDS) * 1e9)
+        stale: list[tuple[pathlib.Path, Optional[list]]] = []
+        path: pathlib.Path
+        for path in self._paths:
+            stat = path.stat()
+            stamp: Optional[list] = [stat.st_mtime_ns, stat.st_size] if stat.st_mtime_ns < settled else None
+            if not self._cache.reuse(path.name, stamp):
+                stale.append((path, stamp))
+        if stale:
+            with concurrent.futures.ThreadPoolExecutor(max(1, workers)) as executor:
+                hashes: list[int] = list(executor.map(hash_file, [path for path, _ in stale]))
+            for (path, stamp), hash_ in zip(stale, hashes):
+                self._cache.set(path.name, stamp, hash_)
+            self.hashed = len(stale)
+        self._cache.store()
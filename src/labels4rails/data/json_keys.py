@@ -0,0 +1,133 @@
+from typing import Any, Iterable, TextIO
+import json
+import re
+
+
+BLOCK_SIZE: int = 1 << 16
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Complete strings and brackets, a lone quote marks a string cut off by the
+# end of the buffer.
+_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["\[\]{}]')
+
+
+class _Incomplete(Exception):
+    """
+    Text read so far ends before the requested keys have been read.
+    """
+
+
+def loads_keys(text: str, keys: Iterable[str]) -> dict[str, Any]:
+    """
+    Parse selected top-level keys of a JSON object. Values of other keys
+    are skipped without being decoded, parsing stops as soon as all
+    requested keys have been read.
+    :param text: JSON object
+    :param keys: Top-level keys to read
+    :return: Values by key, keys missing in the object are left out
+    """
+    return _parse(text, frozenset(keys), True)
+
+
+def load_keys(file_pointer: TextIO, keys: Iterable[str], block_size: int = BLOCK_SIZE) -> dict[str, Any]:
+    """
+    Parse selected top-level keys of a JSON file. The file is read in
+    blocks until all requested keys have been read, so keys stored before
+    large values are read without reading the remainder of the file.
+    :param file_pointer: File opened in text mode
+    :param keys: Top-level keys to read
+    :param block_size: Number of characters read at once
+    :return: Values by key, keys missing in the object are left out
+    """
+    keys = frozenset(keys)
+    text: str = file_pointer.read(block_size)
+    final: bool = len(text) < block_size
+    while True:
+        try:
+            return _parse(text, keys, final)
+        except _Incomplete:
+            block_size *= 2
+            block: str = file_pointer.read(block_size)
+            final = len(block) < block_size
+            text += block
+
+
+def _parse(text: str, keys: frozenset, final: bool) -> dict[str, Any]:
+    """
+    Walk the top-level object and decode the values of requested keys.
+    :param text: JSON object, possibly cut off if not final
+    :param keys: Top-level keys to read
+    :param final: Text is complete, otherwise errors may stem from the cut
+    :return: Values by key
+    :raises _Incomplete: Text is not final and ends or fails to parse
+        before all keys have been read
+    """
+    try:
+        values: dict[str, Any] = {}
+        position: int = _skip_whitespace(text, 0)
+        _expect(text, position, "{")
+        position = _skip_whitespace(text, position + 1)
+        if text[position:position + 1] == "}":
+            return values
+        while len(values) < len(keys):
+            _expect(text, position, '"')
+            key, position = json.decoder.scanstring(text, position + 1)
+            position = _skip_whitespace(text, position)
+            _expect(text, position, ":")
+            position = _skip_whitespace(text, position + 1)
+            if key in keys:
+                values[key], position = _DECODER.raw_decode(text, position)
+            else:
+                position = _skip_value(text, position)
+            position = _skip_whitespace(text, position)
+            _expect(text, position, ",}")
+            if text[position] == "}":
+                break
+            position = _skip_whitespace(text, position + 1)
+        return values
+    except json.JSONDecodeError:
+        if final:
+            raise
+        raise _Incomplete() from None
+
+
+def _skip_value(text: str, position: int) -> int:
+    """
+    Find the end of a value without decoding it. Only brackets and strings
+    are matched, the value is expected to be valid JSON.
+    :param text: JSON text
+    :param position: Start of the value
+    :return: Position after the value
+    """
+    if text[position:position + 1] not in ("{", "["):
+        return _DECODER.raw_decode(text, position)[1]
+    depth: int = 0
+    for token in _TOKENS.finditer(text, position):
+        char: str = token.group()
+        if char in ("{", "["):
+            depth += 1
+        elif char in ("}", "]"):
+            depth -= 1
+            if depth == 0:
+                return token.end()
+        elif char == '"':
+            break
+    msg: str = "Unterminated value"
+    raise json.JSONDecodeError(msg, text, position)
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    return _WHITESPACE.match(text, position).end()
+
+
+def _expect(text: str, position: int, chars: str) -> None:
+    """
+    Check the character at a position.
+    :param text: JSON text
+    :param position: Position to check
+    :param chars: Allowed characters
+    """
+    if position >= len(text) or text[position] not in chars:
+        msg: str = f"Expecting one of {chars!r}"
+        raise json.JSONDecodeError(msg, text, position)
@@ -0,0 +1,160 @@
+from typing import Callable, Iterable, Optional, Union
+import heapq
+import json
+import os
+import pathlib
+import time
+from natsort import natsort_keygen, ns
+
+
+ListingEntry = tuple[str, int, int]  # name, size, modification time in ns
+
+# Extensions of the frames of a chunk
+IMAGE_EXTENSIONS: set[str] = {"jpg", "jpeg", "png"}
+
+# Directories modified this recently may still change within the same
+# timestamp tick of coarse grained (network) file systems.
+_MTIME_SETTLE_SECONDS: float = 2.0
+
+
+class ImageListing:
+    """
+    Sorted listing of the image files in a directory. The listing is
+    persisted next to the directory and only rescanned when the directory
+    modification time changed. On a rescan only added files are stat-ed
+    and sorted in, removed files are dropped.
+    """
+
+    # 2: hidden files are listed, like 'Path.glob' did before
+    VERSION: int = 2
+
+    def __init__(
+        self,
+        images_path: Union[pathlib.Path, str],
+        extensions: Iterable[str],
+        natural: bool = True,
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param images_path: Directory containing the images
+        :param extensions: File extensions to list
+        :param natural: Sort natural and case-insensitive, otherwise by path
+        :param cache_path: File to persist the listing, None to store it as
+            hidden file in the parent directory of the images
+        """
+        self._images_path: pathlib.Path = pathlib.Path(images_path)
+        self._extensions: list[str] = sorted(set(extensions))
+        self._natural: bool = natural
+        self._cache_path: pathlib.Path
+        if cache_path is None:
+            name: str = f".{self._images_path.name}.listing.json"
+            self._cache_path = self._images_path.parent / name
+        else:
+            self._cache_path = pathlib.Path(cache_path)
+        self._entries: list[ListingEntry] = []
+        self._update()
+
+    @property
+    def paths(self) -> list[pathlib.Path]:
+        return [self._images_path / entry[0] for entry in self._entries]
+
+    @property
+    def entries(self) -> list[ListingEntry]:
+        return list(self._entries)
+
+    def _sort_key(self) -> Callable:
+        """
+        Key function defining the order of the listing.
+        :return: Key function for listing entries
+        """
+        images_path = self._images_path
+        if self._natural:
+            natural_key = natsort_keygen(alg=ns.IGNORECASE)
+            return lambda entry: natural_key(images_path / entry[0])
+        return lambda entry: images_path / entry[0]
+
+    def _update(self) -> None:
+        """
+        Load the persisted listing and rescan the directory if it changed.
+        """
+        directory_mtime: int = os.stat(self._images_path).st_mtime_ns
+        cached: Optional[dict] = self._load_cache()
+        if cached is not None and cached["directory_mtime"] == directory_mtime:
+            self._entries = [tuple(entry) for entry in cached["entries"]]
+            return
+
+        known: dict[str, ListingEntry] = {}
+        if cached is not None:
+            known = {entry[0]: tuple(entry) for entry in cached["entries"]}
+        self._rescan(known)
+
+        # Do not trust a timestamp that may not have settled yet
+        if time.time() - directory_mtime / 1e9 < _MTIME_SETTLE_SECONDS:
+            directory_mtime = -1
+        self._store_cache(directory_mtime)
+
+    def _rescan(self, known: dict[str, ListingEntry]) -> None:
+        """
+        List directory and merge added files into the known sorted entries.
+        :param known: Entries of the previous listing in sorted order
+        """
+        suffixes: tuple[str, ...] = tuple(f".{ext}" for ext in self._extensions)
+        names: set[str] = set()
+        added: list[ListingEntry] = []
+        with os.scandir(self._images_path) as directory:
+            for dir_entry in directory:
+                name: str = dir_entry.name
+                # Like 'Path.glob', hidden files are listed too
+                if not name.endswith(suffixes):
+                    continue
+                names.add(name)
+                if name not in known and dir_entry.is_file():
+                    stat = dir_entry.stat()
+                    added.append((name, stat.st_size, stat.st_mtime_ns))
+
+        key: Callable = self._sort_key()
+        kept: list[ListingEntry] = [entry for entry in known.values() if entry[0] in names]
+        added.sort(key=key)
+        self._entries = list(heapq.merge(kept, added, key=key))
+
+    def _load_cache(self) -> Optional[dict]:
+        """
+        Read persisted listing if it matches the listing options.
+        :return: Persisted listing or None
+        """
+        try:
+            with open(self._cache_path) as file_pointer:
+                cached = json.load(file_pointer)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(cached, dict)
+            or cached.get("version") != self.VERSION
+            or cached.get("extensions") != self._extensions
+            or cached.get("natural") != self._natural
+        ):
+            return None
+        return cached
+
+    def _store_cache(self, directory_mtime: int) -> None:
+        """
+        Persist listing. Failing to write (e.g. read-only mounts) is not an
+        error, the directory is rescanned next time.
+        :param directory_mtime: Modification time the listing is valid for
+        """
+        cached: dict = {
+            "version": self.VERSION,
+            "extensions": self._extensions,
+            "natural": self._natural,
+            "directory_mtime": directory_mtime,
+            "entries": self._entries,
+        }
+        tmp_path: pathlib.Path = self._cache_path.with_name(
+            f"{self._cache_path.name}.{os.getpid()}.tmp"
+        )
+        try:
+            with open(tmp_path, "w") as file_pointer:
+                json.dump(cached, file_pointer)
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Iterable, Optional, Union
+import json
+import os
+import pathlib
+
+
+class StampCache:
+    """
+    Values derived from the scenes of a chunk, persisted in a JSON file
+    together with a version token (stamp) of every source, e.g. from
+    'IAnnotationStore.stamps'. A value is reused while the stamp of its
+    source is unchanged. Unsettled sources have no stamp (None) and are
+    evaluated again every time.
+    """
+
+    def __init__(
+        self,
+        path: Union[pathlib.Path, str],
+        version: int,
+        settings: Any = None,
+    ) -> None:
+        """
+        :param path: File to persist the values
+        :param version: Format of the values, files of other versions are
+            ignored
+        :param settings: JSON compatible options the values depend on,
+            files written with other settings are ignored
+        """
+        self._path: pathlib.Path = pathlib.Path(path)
+        self._version: int = version
+        self._settings: Any = json.loads(json.dumps(settings))
+        # name -> [stamp, value]
+        self._cached: dict[str, list] = self._load()
+        self._entries: dict[str, list] = {}
+        self._changed: bool = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __getitem__(self, name: str) -> Any:
+        """
+        :param name: Scene name
+        :return: Value of the scene
+        """
+        return self._entries[name][1]
+
+    @property
+    def names(self) -> list[str]:
+        return sorted(self._entries)
+
+    def reuse(self, name: str, stamp: Optional[Iterable[int]]) -> bool:
+        """
+        Take over the persisted value of a scene if its stamp did not
+        change.
+        :param name: Scene name
+        :param stamp: Current stamp of the source, None if not settled
+        :return: Whether the value was taken over
+        """
+        entry: Optional[list] = self._cached.get(name)
+        if entry is None or stamp is None or entry[0] != list(stamp):
+            return False
+        self._entries[name] = entry
+        return True
+
+    def previous(self, name: str) -> Any:
+        """
+        Persisted value of a scene regardless of its stamp, e.g. to compare
+        content hashes of touched sources.
+        :param name: Scene name
+        :return: Value, None if none was persisted
+        """
+        entry: Optional[list] = self._cached.get(name)
+        return None if entry is None else entry[1]
+
+    def set(self, name: str, stamp: Optional[Iterable[int]], value: Any) -> None:
+        """
+        :param name: Scene name
+        :param stamp: Stamp of the source the value was derived from
+        :param value: JSON compatible value
+        """
+        self._entries[name] = [None if stamp is None else list(stamp), value]
+        self._changed = True
+
+    def update(
+        self,
+        stamps: dict[str, Optional[tuple[int, ...]]],
+        evaluate: Callable[[str], Any],
+    ) -> int:
+        """
+        Reuse persisted values, evaluate added or changed scenes and
+        persist the result. Scenes missing in 'stamps' are dropped.
+        :param stamps: Current stamp by name of every scene
+        :param evaluate: Value of a scene, None to leave it out (e.g.
+            removed meanwhile)
+        :return: Number of evaluated scenes
+        """
+        evaluated: int = 0
+        name: str
+        for name, stamp in stamps.items():
+            if self.reuse(name, stamp):
+                continue
+            value: Any = evaluate(name)
+            if value is None:
+                continue
+            self.set(name, stamp, value)
+            evaluated += 1
+        self.store()
+        return evaluated
+
+    def store(self) -> None:
+        """
+        Persist the values if any was added, changed or dropped. Failing to
+        write (e.g. read-only mounts) is not an error, the scenes are
+        evaluated again next time.
+        """
+        if not self._changed and len(self._entries) == len(self._cached):
+            return
+        cached: dict = {"version": self._version, "settings": self._settings, "entries": self._entries}
+        tmp_path: pathlib.Path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as file_pointer:
+                json.dump(cached, file_pointer)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            return
+        self._cached = dict(self._entries)
+        self._changed = False
+
+    def _load(self) -> dict[str, list]:
+        """
+        Read persisted values.
+        :return: Entries by scene name, empty if there are no valid ones
+        """
+        try:
+            with open(self._path) as file_pointer:
+                cached = json.load(file_pointer)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(cached, dict)
+            or cached.get("version") != self._version
+            or cached.get("settings") != self._settings
+        ):
+            return {}
+        return cached.get("entries", {})
@@ -0,0 +1,168 @@
+from typing import Iterable, Optional, Union
+import pathlib
+import numpy as np
+import numpy.typing as npt
+from . import annotation_store
+from . import stamp_cache
+
+
+class TagIndex:
+    """
+    Inverted index from tag to the scenes of a chunk carrying it. Scenes
+    are numbered in name order, the scenes of a tag are a bitset stored as
+    Python integer, so boolean queries are integer operations.
+
+    The tags of every scene are persisted next to the annotations together
+    with a version token of the annotation. On open only added or changed
+    annotations are read, removed ones are dropped.
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        annotations_path: Union[pathlib.Path, str],
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param annotations_path: Annotations directory, JSON files or pack
+        :param cache_path: File to persist the index, None to store it as
+            hidden file in the parent directory of the annotations
+        """
+        self._annotations_path: pathlib.Path = pathlib.Path(annotations_path)
+        self._cache_path: pathlib.Path
+        if cache_path is None:
+            name: str = f".{self._annotations_path.name}.tags.json"
+            self._cache_path = self._annotations_path.parent / name
+        else:
+            self._cache_path = pathlib.Path(cache_path)
+        # name -> {group: tags}
+        self._cache: stamp_cache.StampCache = stamp_cache.StampCache(self._cache_path, self.VERSION)
+        self._names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._bits: dict[tuple[str, str], int] = {}
+        self._update()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    @property
+    def tags(self) -> list[tuple[str, str]]:
+        """
+        All tags of the chunk.
+        :return: Sorted tag group and tag pairs
+        """
+        return sorted(self._bits)
+
+    @property
+    def all(self) -> int:
+        """
+        Bitset of all scenes.
+        """
+        return (1 << len(self._names)) - 1
+
+    def tags_of(self, name: str) -> dict[str, list[str]]:
+        """
+        Tags of a scene.
+        :param name: Scene name
+        :return: Tags by tag group
+        """
+        return self._cache[name]
+
+    def bits(self, tag: str, group: Optional[str] = None) -> int:
+        """
+        Scenes carrying a tag.
+        :param tag: Tag, compared case-sensitive
+        :param group: Tag group, None for the tag in any group
+        :return: Bitset of scenes
+        """
+        if group is not None:
+            return self._bits.get((group, tag), 0)
+        bits: int = 0
+        for (group_, tag_), group_bits in self._bits.items():
+            if tag_ == tag:
+                bits |= group_bits
+        return bits
+
+    def select(
+        self,
+        included: dict[str, Iterable[Optional[str]]],
+        excluded: dict[str, Iterable[Optional[str]]],
+    ) -> int:
+        """
+        Scenes carrying all included and none of the excluded tags. Tags
+        are lower-cased, None entries are ignored like in the config.
+        :param included: Required tags by tag group
+        :param excluded: Forbidden tags by tag group
+        :return: Bitset of scenes
+        """
+        bits: int = self.all
+        group: str
+        for group, tags in included.items():
+            for tag in filter(None, tags):
+                bits &= self.bits(tag.lower(), group)
+        for group, tags in excluded.items():
+            for tag in filter(None, tags):
+                bits &= ~self.bits(tag.lower(), group)
+        return bits
+
+    def names_of(self, bits: int) -> list[str]:
+        """
+        Names of the scenes in a bitset.
+        :param bits: Bitset of scenes
+        :return: Scene names in name order
+        """
+        flags: npt.NDArray[np.uint8] = np.unpackbits(
+            np.frombuffer(bits.to_bytes((len(self._names) + 7) // 8, "little"), dtype=np.uint8),
+            count=len(self._names),
+            bitorder="little",
+        )
+        return [self._names[item] for item in np.flatnonzero(flags)]
+
+    @staticmethod
+    def count(bits: int) -> int:
+        """
+        Number of scenes in a bitset.
+        :param bits: Bitset of scenes
+        :return: Number of scenes
+        """
+        return bin(bits).count("1")
+
+    def _update(self) -> None:
+        """
+        Load the persisted index, read changed annotations and build the
+        bitsets.
+        """
+        store: annotation_store.IAnnotationStore = annotation_store.open_annotation_store(
+            self._annotations_path
+        )
+
+        def tags(name: str) -> Optional[dict[str, list[str]]]:
+            annotation: Optional[dict] = store.read_keys(name, ("tag groups",))
+            if annotation is None:
+                return None
+            return {group: list(tags) for group, tags in annotation.get("tag groups", {}).items()}
+
+        self._cache.update(store.stamps(), tags)
+        self._build()
+
+    def _build(self) -> None:
+        """
+        Number scenes and collect the bitset of every tag.
+        """
+        self._names = self._cache.names
+        self._ids = {name: item for item, name in enumerate(self._names)}
+        members: dict[tuple[str, str], list[int]] = {}
+        for name in self._names:
+            for group, tags in self._cache[name].items():
+                for tag in tags:
+                    members.setdefault((group, tag), []).append(self._ids[name])
+        self._bits = {}
+        for key, items in members.items():
+            flags: npt.NDArray[np.bool_] = np.zeros(len(self._names), dtype=bool)
+            flags[items] = True
+            self._bits[key] = int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
@@ -0,0 +1,287 @@
+from typing import Optional, Union
+import os
+import pathlib
+import threading
+import cv2
+import numpy as np
+import numpy.typing as npt
+from . import annotation_store
+from . import camera_config
+from . import data_set
+from .frame_cache import FrameCache
+
+
+class VideoIndex:
+    """
+    Frame index of a video file. Stores the presentation timestamp of every
+    frame and the frames decoding can start from. The index is built once
+    from the compressed packets without decoding and persisted next to the
+    video.
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        video_path: Union[pathlib.Path, str],
+        checkpoint_interval: int = 250,
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param video_path: Video file
+        :param checkpoint_interval: Distance of seek points if the container
+            does not report keyframes
+        :param cache_path: File to persist the index, None to store it as
+            hidden file next to the video
+        """
+        self._video_path: pathlib.Path = pathlib.Path(video_path)
+        if not self._video_path.is_file():
+            msg: str = f"Could not find video file '{self._video_path}'."
+            raise FileNotFoundError(msg)
+        self._checkpoint_interval: int = max(1, checkpoint_interval)
+        self._cache_path: pathlib.Path
+        if cache_path is None:
+            name: str = f".{self._video_path.name}.index.npz"
+            self._cache_path = self._video_path.parent / name
+        else:
+            self._cache_path = pathlib.Path(cache_path)
+
+        self._fps: float = 0.0
+        self._timestamps: npt.NDArray[np.float64] = np.empty(0, dtype=np.float64)
+        self._keyframes: npt.NDArray[np.int64] = np.zeros(1, dtype=np.int64)
+        self._has_keyframes: bool = False
+
+        stat = os.stat(self._video_path)
+        self._signature: npt.NDArray[np.int64] = np.array(
+            [self.VERSION, stat.st_size, stat.st_mtime_ns, self._checkpoint_interval],
+            dtype=np.int64,
+        )
+        if not self._load_cache():
+            self._build()
+            self._store_cache()
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def timestamps(self) -> npt.NDArray[np.float64]:
+        """
+        Timestamp of every frame in milliseconds.
+        """
+        return self._timestamps
+
+    @property
+    def keyframes(self) -> npt.NDArray[np.int64]:
+        """
+        Sorted frame numbers decoding can start from.
+        """
+        return self._keyframes
+
+    @property
+    def has_keyframes(self) -> bool:
+        """
+        Whether the seek points are keyframes reported by the container or
+        evenly spaced checkpoints.
+        """
+        return self._has_keyframes
+
+    def seek_frame(self, frame: int) -> int:
+        """
+        Closest seek point at or before a frame.
+        :param frame: Frame number
+        :return: Frame number to start decoding from
+        """
+        position: int = int(np.searchsorted(self._keyframes, frame, side="right"))
+        return int(self._keyframes[max(0, position - 1)])
+
+    def _build(self) -> None:
+        """
+        Read all packets of the video stream. Raw packets are grabbed without
+        decoding where the backend supports it. Otherwise every frame gets
+        decoded once and seek points fall back to checkpoints.
+        """
+        capture = cv2.VideoCapture(str(self._video_path))
+        if not capture.isOpened():
+            msg: str = f"Could not open video file '{self._video_path}'."
+            raise ValueError(msg)
+        self._fps = capture.get(cv2.CAP_PROP_FPS)
+        raw: bool = capture.set(cv2.CAP_PROP_FORMAT, -1)
+
+        timestamps: list[float] = []
+        keyframes: list[int] = [0]
+        while capture.grab():
+            if raw and capture.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME) > 0 and timestamps:
+                keyframes.append(len(timestamps))
+            timestamps.append(capture.get(cv2.CAP_PROP_POS_MSEC))
+        capture.release()
+
+        self._timestamps = np.array(timestamps, dtype=np.float64)
+        self._has_keyframes = len(keyframes) > 1
+        if not self._has_keyframes:
+            keyframes = list(range(0, max(1, len(timestamps)), self._checkpoint_interval))
+        self._keyframes = np.array(keyframes, dtype=np.int64)
+
+    def _load_cache(self) -> bool:
+        """
+        Read persisted index if it belongs to the current video file.
+        :return: Whether the index was loaded
+        """
+        try:
+            with np.load(self._cache_path) as cached:
+                if not np.array_equal(cached["signature"], self._signature):
+                    return False
+                self._fps = float(cached["fps"])
+                self._timestamps = cached["timestamps"]
+                self._keyframes = cached["keyframes"]
+                self._has_keyframes = bool(cached["has_keyframes"])
+        except (OSError, KeyError, ValueError):
+            return False
+        return True
+
+    def _store_cache(self) -> None:
+        """
+        Persist index. Failing to write (e.g. read-only mounts) is not an
+        error, the index is rebuilt next time.
+        """
+        tmp_path: pathlib.Path = self._cache_path.with_name(
+            f"{self._cache_path.name}.{os.getpid()}.tmp.npz"
+        )
+        try:
+            np.savez(
+                tmp_path,
+                signature=self._signature,
+                fps=self._fps,
+                timestamps=self._timestamps,
+                keyframes=self._keyframes,
+                has_keyframes=self._has_keyframes,
+            )
+            os.replace(tmp_path, self._cache_path)
+        except OSError as error:
+            print("Could not store video index:", error)
+
+
+class VideoDataSet(data_set.DataSet):
+    """
+    Loads frames of a video file and their annotations. Scenes are named
+    '<video name>_<frame number>', so annotations of several videos can
+    share one directory.
+    """
+
+    def __init__(
+        self,
+        video_path: Union[pathlib.Path, str],
+        annotations_path: Optional[Union[pathlib.Path, str]] = None,
+        camera_config_path: Optional[Union[pathlib.Path, str]] = None,
+        checkpoint_interval: int = 250,
+        frame_cache: Optional[FrameCache] = None,
+    ) -> None:
+        """
+        Initialize the data loader. Without explicit paths the video is
+        expected in the place of the images directory of a dataset.
+        :param video_path: Video file
+        :param annotations_path: Directory of the annotations, defaults to
+            'annotations' next to the video
+        :param camera_config_path: Camera calibration, defaults to
+            'camera/camera.yaml' next to the video
+        :param checkpoint_interval: Distance of seek points if the container
+            does not report keyframes
+        :param frame_cache: Cache serving decoded frames, None to decode
+            every time
+        """
+        self._frame_cache: Optional[FrameCache] = frame_cache
+        self._video_path: pathlib.Path = pathlib.Path(video_path)
+        self._index: VideoIndex = VideoIndex(self._video_path, checkpoint_interval)
+
+        self._annotations_path: pathlib.Path
+        if annotations_path is None:
+            self._annotations_path = self._video_path.parent.joinpath("annotations")
+        else:
+            self._annotations_path = pathlib.Path(annotations_path)
+        self._annotations_path.mkdir(parents=True, exist_ok=True)
+        self._annotation_path: Optional[pathlib.Path] = None
+        self._annotation_store: annotation_store.IAnnotationStore
+        self._annotation_store = annotation_store.open_annotation_store(self._annotations_path)
+
+        if camera_config_path is None:
+            camera_config_path = self._video_path.parent.joinpath("camera/camera.yaml")
+        self._camera_reader = camera_config.OpenCVCameraReader(pathlib.Path(camera_config_path))
+
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._capture_pid: Optional[int] = None
+        self._position: Optional[int] = None
+        self._capture_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getstate__(self) -> dict:
+        # Worker processes open their own capture.
+        state: dict = self.__dict__.copy()
+        state["_capture"] = None
+        state["_capture_pid"] = None
+        state["_position"] = None
+        del state["_capture_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._capture_lock = threading.Lock()
+
+    @property
+    def index(self) -> VideoIndex:
+        return self._index
+
+    def timestamp(self, item: int) -> float:
+        """
+        Presentation time of a frame.
+        :param item: Frame number
+        :return: Timestamp in milliseconds
+        """
+        return float(self._index.timestamps[item])
+
+    def _name(self, item: int) -> str:
+        if not 0 <= item < len(self):
+            msg: str = f"Frame {item} out of range for {len(self)} frames."
+            raise IndexError(msg)
+        return f"{self._video_path.stem}_{item:06d}"
+
+    def _read_image(self, item: int) -> npt.NDArray[np.uint8]:
+        if self._frame_cache is not None:
+            return self._frame_cache.load(
+                self._video_path, lambda: self._decode_frame(item), frame=item
+            )
+        return self._decode_frame(item)
+
+    def _decode_frame(self, item: int) -> npt.NDArray[np.uint8]:
+        """
+        Decode frame. Sequential reads continue decoding, frames shortly
+        ahead are reached by skipping without a seek. Only if a seek point
+        lies between the current position and the frame a seek is cheaper.
+        :param item: Frame number
+        :return: BGR image
+        """
+        with self._capture_lock:
+            # A forked worker must not share the file offset of its parent.
+            if self._capture is None or self._capture_pid != os.getpid():
+                self._capture = cv2.VideoCapture(str(self._video_path))
+                self._capture_pid = os.getpid()
+                self._position = 0
+            if self._position is None or not (
+                self._index.seek_frame(item) <= self._position <= item
+            ):
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, item)
+                self._position = item
+            while self._position < item:
+                self._capture.grab()
+                self._position += 1
+            success, image = self._capture.read()
+            if not success:
+                self._position = None
+                msg: str = f"Could not read frame {item} of '{self._video_path}'."
+                raise OSError(msg)
+            self._position = item + 1
+            return image
@@ -432,7 +432,7 @@ class QtGUI(QtWidgets.QMainWindow, Ui_MainWindow):
             self.label_info_status_active.setText(f'Filedialog: all paths {self._PATHS_SET}')
 
     def setup_camera(self):
-        self._camera = utils.camera.Camera(self._dataset[0].camera_cfg)
+        self._camera = utils.camera.shared_camera(self._dataset.camera_cfg)
 
     def setup_annotator(self):
         self._annotator = QtAnnotator(self._cfg, self._dataset, self._camera, self._gui_events,
@@ -1,4 +1,12 @@
 from .switch import ISwitchLabelConverter, SwitchLabelConverterYOLO
-from .tracks import ITrackLabelConverter, TrackLabelConverterPixelmask
+from .tracks import ITrackLabelConverter, TrackLabelConverterPixelmask, TrackLabelConverterRLE
 from .label_converter import ILabelConverter, LabelConverterYOLO
 from .label_converter_segmentation import ILabelConverter, LabelConverterYOLO
+from .frame_pool import IFrameWriter, write_frames, map_frames
+from .export import IExportSink, ManifestSink, ImageSink, MetadataSink, ExportFrame, LabelExporter
+from .manifest import ExportManifest
+from .mask_writer import IMaskWriter, OpenCVMaskWriter, PaletteMaskWriter, PngStrategy, mask_palette
+from .rle import RleMaskReader
+from .mask_volume import MaskVolumeConverter, MaskVolume
+from .row_anchors import RowAnchorConverter, RowAnchorSink
+from .mask_dataset import MaskDataset
@@ -0,0 +1,478 @@
+from typing import Any, Iterable, Optional, Union
+import abc
+import csv
+import dataclasses
+import os
+import pathlib
+import cv2
+import numpy as np
+import numpy.typing as npt
+from labels4rails import data
+from labels4rails import scene
+from labels4rails import utils
+from labels4rails.utils import config
+from .TagFilter import TagFilter
+from . import frame_pool
+from . import manifest
+
+TAG_GROUPS: tuple[str, ...] = (
+    "additional_attributes",
+    "environment",
+    "light",
+    "time_of_day",
+    "track_layout",
+    "weather",
+)
+
+
+@dataclasses.dataclass
+class ExportFrame:
+    """
+    Scene prepared once for all sinks of an export.
+    """
+
+    name: str
+    image: npt.NDArray[np.uint8]
+    annotation: dict
+    scene: scene.IScene
+    camera: utils.camera.ICamera
+
+
+class IExportSink(metaclass=abc.ABCMeta):
+    """
+    Output format of 'LabelExporter'. Sinks are sent to worker processes,
+    state that is expensive to build or cannot be pickled is created in
+    'setup'.
+    """
+
+    @abc.abstractmethod
+    def begin(self, sources: dict[str, str], incremental: bool, scope: str) -> list[str]:
+        """
+        Prepare the export, called once in the main process.
+        :param sources: Hash of the annotation by name of every scene to
+            export, in dataset order
+        :param incremental: Skip scenes whose outputs are up to date
+        :param scope: Key of the exported chunk, outputs of other chunks in
+            the same place are kept
+        :return: Names of the scenes to write
+        """
+        pass
+
+    @abc.abstractmethod
+    def setup(self) -> None:
+        """
+        Build per-process state, called once per process before writing.
+        """
+        pass
+
+    @abc.abstractmethod
+    def write(self, frame: ExportFrame) -> Any:
+        """
+        Write outputs of a scene.
+        :param frame: Scene to write
+        :return: Result passed to 'finish', None if there is nothing to pass
+        """
+        pass
+
+    @abc.abstractmethod
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Complete the export, called once in the main process.
+        :param results: Result of 'write' by name of every written scene
+        """
+        pass
+
+
+class ManifestSink(IExportSink):
+    """
+    Sink writing files per scene into one directory. Outputs are tracked by
+    an 'ExportManifest', unchanged scenes are skipped and outputs of
+    removed scenes are deleted.
+    """
+
+    def __init__(self, output_path: pathlib.Path, noun: str) -> None:
+        """
+        :param output_path: Path to store outputs
+        :param noun: Name of the outputs in the summary, e.g. 'masks'
+        """
+        self._output_path: pathlib.Path = pathlib.Path(output_path)
+        self._noun: str = noun
+        self._manifest: Optional[manifest.ExportManifest] = None
+        self._sources: dict[str, str] = {}
+
+    @property
+    def output_path(self) -> pathlib.Path:
+        return self._output_path
+
+    @abc.abstractmethod
+    def settings(self) -> Any:
+        """
+        Everything besides the annotation the outputs depend on.
+        :return: Data hashed with 'manifest.digest'
+        """
+        pass
+
+    @abc.abstractmethod
+    def output_names(self, name: str) -> list[str]:
+        """
+        Files written for a scene.
+        :param name: Name of scene
+        :return: File names relative to the output path
+        """
+        pass
+
+    def begin(self, sources: dict[str, str], incremental: bool, scope: str) -> list[str]:
+        """
+        Create output path and read the manifest of the last export.
+        :param sources: Hash of the annotation by name of every scene to
+            export, in dataset order
+        :param incremental: Skip scenes whose outputs are up to date
+        :param scope: Key of the exported chunk in the manifest
+        :return: Names of the scenes to write
+        """
+        self._output_path.mkdir(parents=True, exist_ok=True)
+        self._manifest = manifest.ExportManifest(self._output_path, manifest.digest(self.settings()), scope)
+        self._sources = sources
+        return [
+            name for name, source in sources.items()
+            if not (
+                incremental
+                and all(self._manifest.is_current(output_name, source) for output_name in self.output_names(name))
+            )
+        ]
+
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Record outputs in the manifest and delete stale ones.
+        :param results: Result of 'write' by name of every written scene
+        """
+        removed: list[str] = self._manifest.update({
+            output_name: source
+            for name, source in self._sources.items()
+            for output_name in self.output_names(name)
+            if self._output_path.joinpath(output_name).is_file()
+        })
+        self._manifest.save()
+        print(
+            f"Wrote {len(results)} {self._noun}, skipped {len(self._sources) - len(results)} unchanged, "
+            f"removed {len(removed)} stale."
+        )
+
+
+class ImageSink(ManifestSink):
+    """
+    Store copies of the frames as JPEG, optionally undistorted and resized
+    like the pixelmasks.
+    """
+
+    def __init__(
+        self,
+        output_path: pathlib.Path,
+        camera_cfg: data.ICameraReader,
+        undistort: bool = False,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+    ) -> None:
+        """
+        :param output_path: Path to store frames
+        :param camera_cfg: Information about camera
+        :param undistort: Remove lens distortion from the frames
+        :param output_size: Width and height of the frames
+        :param scale: Factor from camera to frame resolution, alternative to
+            'output_size'
+        """
+        if output_size is not None and scale is not None:
+            msg: str = "Expected either output size or scale, got both."
+            raise ValueError(msg)
+        super().__init__(output_path, "images")
+        self._camera_cfg: data.ICameraReader = camera_cfg
+        self._undistort: bool = undistort
+        self._output_size: Optional[tuple[int, int]] = None if output_size is None else tuple(output_size)
+        self._scale: Optional[float] = scale
+        self._undistorter: Optional[utils.camera.IUndistorter] = None
+
+    def settings(self) -> Any:
+        return [
+            "image",
+            self._undistort,
+            manifest.camera_digest(self._camera_cfg),
+            self._output_size,
+            self._scale,
+        ]
+
+    def output_names(self, name: str) -> list[str]:
+        return [name + ".jpg"]
+
+    def setup(self) -> None:
+        if self._undistort:
+            self._undistorter = utils.camera.get_undistorter(self._camera_cfg)
+
+    def write(self, frame: ExportFrame) -> None:
+        """
+        Store frame.
+        :param frame: Scene to write
+        """
+        image: npt.NDArray[np.uint8] = frame.image
+        resolution: tuple[int, int] = image.shape[:2]
+        target: tuple[int, int] = output_resolution(resolution, self._output_size, self._scale)
+        if self._undistorter is not None:
+            image = self._undistorter.undistort_image(image)
+        if target != resolution:
+            image = cv2.resize(image, target[::-1], interpolation=cv2.INTER_AREA)
+        cv2.imwrite(str(self._output_path.joinpath(frame.name + ".jpg")), image)
+
+
+class MetadataSink(IExportSink):
+    """
+    Store one CSV row per scene with resolution, number of tracks and
+    switches and the tags of every tag group. Rows of unchanged scenes are
+    taken from the last export, rows of other chunks are kept.
+    """
+
+    def __init__(self, path: Union[pathlib.Path, str]) -> None:
+        """
+        :param path: CSV file to write
+        """
+        self._path: pathlib.Path = pathlib.Path(path)
+        self._columns: list[str] = [
+            "chunk", "name", "source", "width", "height", "tracks", "switches", *TAG_GROUPS
+        ]
+        self._sources: dict[str, str] = {}
+        self._scope: str = ""
+        self._rows: dict[str, dict[str, str]] = {}
+        self._other_rows: list[dict[str, str]] = []
+
+    def begin(self, sources: dict[str, str], incremental: bool, scope: str) -> list[str]:
+        """
+        Read rows of the last export.
+        :param sources: Hash of the annotation by name of every scene to
+            export, in dataset order
+        :param incremental: Reuse rows of scenes whose annotation did not
+            change
+        :param scope: Key of the exported chunk, stored as 'chunk' column
+        :return: Names of the scenes to write
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._sources = sources
+        self._scope = scope
+        self._rows = {}
+        self._other_rows = []
+        if self._path.is_file():
+            with open(self._path, newline="") as file_pointer:
+                reader: csv.DictReader = csv.DictReader(file_pointer)
+                if reader.fieldnames == self._columns:
+                    for row in reader:
+                        if row["chunk"] != scope:
+                            self._other_rows.append(row)
+                        elif incremental and sources.get(row["name"]) == row["source"]:
+                            self._rows[row["name"]] = row
+        return [name for name in sources if name not in self._rows]
+
+    def setup(self) -> None:
+        pass
+
+    def write(self, frame: ExportFrame) -> dict[str, Any]:
+        """
+        Describe scene.
+        :param frame: Scene to describe
+        :return: Row without source hash
+        """
+        tag_groups: dict = frame.annotation.get("tag groups", {})
+        row: dict[str, Any] = {
+            "name": frame.name,
+            "width": frame.image.shape[1],
+            "height": frame.image.shape[0],
+            "tracks": len(frame.scene.tracks),
+            "switches": len(frame.scene.switches),
+        }
+        for group in TAG_GROUPS:
+            row[group] = ";".join(tag_groups.get(group, []))
+        return row
+
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Write rows of other chunks followed by the rows of all scenes in
+        dataset order.
+        :param results: Row by name of every written scene
+        """
+        tmp_path: pathlib.Path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", newline="") as file_pointer:
+            writer: csv.DictWriter = csv.DictWriter(file_pointer, self._columns)
+            writer.writeheader()
+            writer.writerows(self._other_rows)
+            for name, source in self._sources.items():
+                if name in results:
+                    writer.writerow({**results[name], "chunk": self._scope, "source": source})
+                elif name in self._rows:
+                    writer.writerow(self._rows[name])
+        os.replace(tmp_path, self._path)
+        print(f"Wrote {len(results)} metadata rows, kept {len(self._rows)} unchanged.")
+
+
+class LabelExporter:
+    """
+    Write several output formats in a single pass over a chunk. Every scene
+    is loaded, decoded and parsed once and handed to all sinks that need
+    it, so another sink only adds its own encoding time.
+    """
+
+    def __init__(
+        self,
+        dataset: data.IDataSet,
+        cfg: config.Labels4RailsConfig,
+        io_workers: int = 2,
+        workers: int = 1,
+        incremental: bool = True,
+        names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration, selects scenes by tags
+        :param io_workers: Threads loading scenes ahead of writing
+        :param workers: Processes writing scenes, outputs are identical for
+            any number of processes
+        :param incremental: Skip scenes whose outputs are up to date in
+            every sink
+        :param names: Scenes to export, selected before any frame is
+            loaded, None for all selected by the configuration. Outputs of
+            other scenes of the chunk are removed.
+        """
+        self._dataset: data.IDataSet = dataset
+        self._cfg = cfg
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+        self._incremental: bool = incremental
+        self._names: Optional[set[str]] = None if names is None else set(names)
+
+    def __call__(self, sinks: list[IExportSink]) -> None:
+        """
+        Write all scenes selected by the configuration to all sinks.
+        :param sinks: Output formats
+        """
+        tag_filter: TagFilter = TagFilter(self._dataset._annotations_path, self._cfg)
+        filtered_list = set(tag_filter.annotationList)
+        if self._names is not None:
+            filtered_list &= self._names
+        dataset_names: list[str] = self._dataset.names
+        self._drop_empty_duplicates(tag_filter.index, dataset_names, filtered_list)
+        # Only annotations changed since the last export are read
+        hashes: data.AnnotationHashes = data.AnnotationHashes(self._dataset._annotations_path)
+        sources: dict[str, str] = {
+            name: hashes[name] for name in dataset_names if name in filtered_list and name in hashes
+        }
+        scope: str = str(pathlib.Path(self._dataset._annotations_path).resolve())
+
+        pending: dict[str, list[int]] = {}
+        index: int
+        sink: IExportSink
+        for index, sink in enumerate(sinks):
+            for name in sink.begin(sources, self._incremental, scope):
+                pending.setdefault(name, []).append(index)
+        items: list[int] = [item for item, name in enumerate(dataset_names) if name in pending]
+
+        writer: frame_pool.IFrameWriter = _SceneWriter(sinks, pending, self._dataset.camera_cfg)
+        results: list[dict[str, Any]] = [{} for _ in sinks]
+        name: str
+        message: Optional[str]
+        sink_results: dict[int, Any]
+        for name, message, sink_results in frame_pool.map_frames(
+            writer, self._dataset, items, self._workers, self._io_workers
+        ):
+            if message is not None:
+                print(message)
+            for index, result in sink_results.items():
+                results[index][name] = result
+        for sink, sink_result in zip(sinks, results):
+            sink.finish(sink_result)
+
+    def _drop_empty_duplicates(
+        self,
+        index: data.TagIndex,
+        dataset_names: list[str],
+        selected: set[str],
+    ) -> None:
+        """
+        Remove duplicate frames without tracks from the selection, e.g.
+        tagged by 'find_duplicates --tag' before they were annotated. Only
+        the tracks of tagged scenes are read.
+        :param index: Tags of the chunk
+        :param dataset_names: Scene names in dataset order
+        :param selected: Selected scene names, changed in place
+        """
+        tagged: list[str] = index.names_of(index.bits(data.DUPLICATE_TAG, "additional_attributes"))
+        items: dict[str, int] = {name: item for item, name in enumerate(dataset_names)}
+        name: str
+        for name in tagged:
+            if name not in selected or name not in items:
+                continue
+            annotation: Optional[dict] = self._dataset.read_annotation_keys(items[name], ("tracks",))
+            if annotation is not None and not annotation.get("tracks"):
+                selected.discard(name)
+
+
+class _SceneWriter(frame_pool.IFrameWriter):
+    """
+    Parse the scene of a single frame and hand it to the sinks that need
+    it.
+    """
+
+    def __init__(
+        self,
+        sinks: list[IExportSink],
+        pending: dict[str, list[int]],
+        camera_cfg: data.ICameraReader,
+    ) -> None:
+        """
+        :param sinks: Output formats
+        :param pending: Indices of the sinks to write by scene name
+        :param camera_cfg: Information about camera
+        """
+        self._sinks: list[IExportSink] = sinks
+        self._pending: dict[str, list[int]] = pending
+        self._camera_cfg: data.ICameraReader = camera_cfg
+        self._scene_deserializer: Optional[scene.ISceneSerializer] = None
+        self._camera: Optional[utils.camera.ICamera] = None
+
+    def setup(self) -> None:
+        self._scene_deserializer = scene.DictSceneSerializer()
+        self._camera = utils.camera.shared_camera(self._camera_cfg)
+        sink: IExportSink
+        for sink in self._sinks:
+            sink.setup()
+
+    def __call__(self, data_: data.Data) -> tuple[str, Optional[str], dict[int, Any]]:
+        """
+        Write a frame to its pending sinks.
+        :param data_: Item of RailLabel dataset
+        :return: Name of scene, message if there is no annotation for the
+            frame and result by sink index
+        """
+        if not data_.annotation:
+            return data_.name, f"No labels created for {data_.name} . No corresponding annotation file found.", {}
+        frame: ExportFrame = ExportFrame(
+            data_.name,
+            data_.image,
+            data_.annotation,
+            self._scene_deserializer.de_serialize(data_.annotation),
+            self._camera,
+        )
+        return data_.name, None, {index: self._sinks[index].write(frame) for index in self._pending[data_.name]}
+
+
+def output_resolution(
+    resolution: tuple[int, int],
+    output_size: Optional[tuple[int, int]] = None,
+    scale: Optional[float] = None,
+) -> tuple[int, int]:
+    """
+    Resolution of stored masks and frames.
+    :param resolution: Height and width of the camera image
+    :param output_size: Width and height of the outputs
+    :param scale: Factor from camera to output resolution
+    :return: Height and width of the outputs
+    """
+    if output_size is not None:
+        return output_size[1], output_size[0]
+    if scale is not None:
+        return round(resolution[0] * scale), round(resolution[1] * scale)
+    return resolution
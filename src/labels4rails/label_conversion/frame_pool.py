@@ -0,0 +1,132 @@
+from typing import Any, Iterator, Optional
+import abc
+import concurrent.futures
+from labels4rails import data
+
+
+class IFrameWriter(metaclass=abc.ABCMeta):
+    """
+    Write the labels of single frames. Writers are sent to worker
+    processes, state that is expensive to build or cannot be pickled is
+    created in 'setup'.
+    """
+
+    @abc.abstractmethod
+    def setup(self) -> None:
+        """
+        Build per-process state, called once per process before writing.
+        """
+        pass
+
+    @abc.abstractmethod
+    def __call__(self, data_: data.Data) -> Any:
+        """
+        Write labels of a frame.
+        :param data_: Item of RailLabel dataset
+        :return: Message to report for 'write_frames', None if there is
+            nothing to report, any result for 'map_frames'
+        """
+        pass
+
+
+def write_frames(
+    writer: IFrameWriter,
+    dataset: data.IDataSet,
+    items: list[int],
+    workers: int = 1,
+    io_workers: int = 2,
+) -> None:
+    """
+    Write labels of given frames, optionally sharded across worker
+    processes. Every frame is written by exactly one worker into its own
+    files, so the output does not depend on the number of workers.
+    Messages are reported in frame order.
+    :param writer: Writes the labels of one frame
+    :param dataset: RailLabel dataset
+    :param items: Indices of frames to write
+    :param workers: Number of worker processes, 1 to write in this process
+    :param io_workers: Threads per process loading frames ahead
+    """
+    message: Optional[str]
+    for message in map_frames(writer, dataset, items, workers, io_workers):
+        if message is not None:
+            print(message)
+
+
+def map_frames(
+    writer: IFrameWriter,
+    dataset: data.IDataSet,
+    items: list[int],
+    workers: int = 1,
+    io_workers: int = 2,
+) -> Iterator[Any]:
+    """
+    Call writer on given frames like 'write_frames' and pass its results
+    back to this process.
+    :param writer: Writes the labels of one frame
+    :param dataset: RailLabel dataset
+    :param items: Indices of frames to write
+    :param workers: Number of worker processes, 1 to write in this process
+    :param io_workers: Threads per process loading frames ahead
+    :return: Results of the writer in frame order
+    """
+    if workers <= 1 or len(items) <= 1:
+        writer.setup()
+        for data_ in dataset.iter(workers=io_workers, items=items):
+            yield writer(data_)
+        return
+
+    # Several shards per worker balance uneven frames
+    shard_size: int = max(1, -(-len(items) // (workers * 4)))
+    shards: list[list[int]] = [
+        items[start:start + shard_size] for start in range(0, len(items), shard_size)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(writer, dataset, io_workers)
+    ) as executor:
+        results: list[Any]
+        for results in executor.map(_write_shard_in_worker, shards):
+            yield from results
+
+
+def _write_shard(
+    writer: IFrameWriter,
+    dataset: data.IDataSet,
+    items: list[int],
+    io_workers: int,
+) -> list[Any]:
+    """
+    Write labels of consecutive frames.
+    :param writer: Writes the labels of one frame
+    :param dataset: RailLabel dataset
+    :param items: Indices of frames to write
+    :param io_workers: Threads loading frames ahead
+    :return: Results of the writer
+    """
+    return [writer(data_) for data_ in dataset.iter(workers=io_workers, items=items)]
+
+
+_worker_state: Optional[tuple[IFrameWriter, data.IDataSet, int]] = None
+
+
+def _init_worker(writer: IFrameWriter, dataset: data.IDataSet, io_workers: int) -> None:
+    """
+    Store writer and dataset once per worker process and build the writer
+    state.
+    :param writer: Writes the labels of one frame
+    :param dataset: RailLabel dataset
+    :param io_workers: Threads loading frames ahead
+    """
+    global _worker_state
+    writer.setup()
+    _worker_state = (writer, dataset, io_workers)
+
+
+def _write_shard_in_worker(items: list[int]) -> list[Any]:
+    """
+    Write labels of consecutive frames in worker process.
+    :param items: Indices of frames to write
+    :return: Results of the writer
+    """
+    writer, dataset, io_workers = _worker_state
+    return _write_shard(writer, dataset, items, io_workers)
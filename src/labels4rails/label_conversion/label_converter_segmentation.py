@@ -6,6 +6,52 @@ from labels4rails import data
 from labels4rails import scene
 from . import switch
 from . import tracks
+from . import mask_writer
+from . import export
+from . import row_anchors
+
+
+TRACK_SEGMENTATION: dict = {
+    'ego_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
+    'left_neighbor_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
+    'right_neighbor_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
+}
+
+
+def default_config(track_segmentation: dict = TRACK_SEGMENTATION) -> config.Labels4RailsConfig:
+    """
+    Configuration of 'LabelConverterPixelmask' created without one. No
+    scenes are filtered by tags.
+    :param track_segmentation: Class value of track bed and rails per track
+    :return: RailLabel configuration without data paths
+    """
+    ego_trackbed: config.Trackbed = config.TrackBed(track_segmentation['ego_track']['track_bed'], 3*[track_segmentation['ego_track']['track_bed']], None, 15)
+    ego_left_rail: config.Rail = config.Rail(track_segmentation['ego_track']['left_rail'], None, None, None, 3*[track_segmentation['ego_track']['left_rail']], 15)
+    ego_right_rail: config.Rail = config.Rail(track_segmentation['ego_track']['right_rail'], None, None, None, 3*[track_segmentation['ego_track']['right_rail']], 15)
+    ego_track: config.Track = config.Track(0,0,0,1, ego_trackbed, ego_left_rail, ego_right_rail)
+
+    left_trackbed: config.Trackbed = config.TrackBed(track_segmentation['left_neighbor_track']['track_bed'], 3*[track_segmentation['left_neighbor_track']['track_bed']], None, 15)
+    left_left_rail: config.Rail = config.Rail(track_segmentation['left_neighbor_track']['left_rail'], None, None, None, 3*[track_segmentation['left_neighbor_track']['left_rail']], 15)
+    left_right_rail: config.Rail = config.Rail(track_segmentation['left_neighbor_track']['right_rail'], None, None, None, 3*[track_segmentation['left_neighbor_track']['right_rail']], 15)
+    left_track: config.Track = config.Track(0,0,0,1, left_trackbed, left_left_rail, left_right_rail)
+
+    right_trackbed: config.Trackbed = config.TrackBed(track_segmentation['right_neighbor_track']['track_bed'], 3*[track_segmentation['right_neighbor_track']['track_bed']], None, 15)
+    right_left_rail: config.Rail = config.Rail(track_segmentation['right_neighbor_track']['left_rail'], None, None, None, 3*[track_segmentation['right_neighbor_track']['left_rail']], 15)
+    right_right_rail: config.Rail = config.Rail(track_segmentation['right_neighbor_track']['right_rail'], None, None, None, 3*[track_segmentation['right_neighbor_track']['right_rail']], 15)
+    right_track: config.Track = config.Track(0,0,0,1, right_trackbed, right_left_rail, right_right_rail)
+    
+    selected_trackbed: config.Trackbed = config.TrackBed(0, [0,0,0], None, 15)
+    selected_rail: config.Rail = config.Rail(0, None, None, None, [0,0,0], 15)
+    selected_track: config.Track = config.Track(0,0,0,1, selected_trackbed, selected_rail, selected_rail)
+
+    drawing_order = (("left", "track_bed"),("left", "rails"),("right", "track_bed"),("right", "rails"),("ego","track_bed"),("ego", "rails"))
+
+    tracks_cfg: config.Tracks = config.Tracks(ego_track, left_track, right_track, drawing_order, selected_track)
+    targets: config.Targets = config.Targets(tracks_cfg, None, None)
+    cfg_data: config.Data = config.Data(None, [], 1100, 67)
+    included: config.Included = config.Included([None],[None],[None],[None],[None],[None])
+    excluded: config.Excluded = config.Excluded([None],[None],[None],[None],[None],[None])
+    return config.Labels4RailsConfig(cfg_data, targets, None, None,included, excluded)
 
 
 class ILabelConverter(metaclass=abc.ABCMeta):
@@ -33,19 +79,22 @@ class ILabelConverter(metaclass=abc.ABCMeta):
         output_path: pathlib.Path,
         kinds: Optional[tuple[scene.target.SwitchKind]],
         directions: Optional[tuple[scene.target.SwitchDirection]],
+        workers: int = 1,
     ) -> None:
         """
         Create labels for switches in given scene.
         :param output_path: Path to store labels
         :param kinds: List of desired switch kinds
         :param directions: List of desired directions
+        :param workers: Number of processes writing labels
         """
         pass
 
     @abc.abstractmethod
     def generate_track_labels(
         self,
-        output_path: pathlib.Path
+        output_path: pathlib.Path,
+        workers: int = 1,
     ) -> None:
         pass
 
@@ -112,6 +161,8 @@ class LabelConverterYOLO(ILabelConverter):
         output_path: pathlib.Path,
         kinds: Optional[tuple[scene.target.SwitchKind]],
         directions: Optional[tuple[scene.target.SwitchDirection]],
+        workers: int = 1,
+        names: Optional[list[str]] = None,
     ) -> None:
         """
         Create bounding box labels in yolo format for switches in
@@ -119,15 +170,21 @@ class LabelConverterYOLO(ILabelConverter):
         :param output_path: Path to store labels
         :param kinds: List of desired switch kinds
         :param directions: List of desired directions
+        :param workers: Number of processes writing labels
+        :param names: Scenes to export, None for all selected by the
+            configuration
         """
         kinds = tuple() if kinds is None else kinds
         directions = tuple() if directions is None else directions
-        switch_label: switch.ISwitchLabel = switch.SwitchLabelConverterYOLO(self._dataset, self._cfg)
+        switch_label: switch.ISwitchLabel = switch.SwitchLabelConverterYOLO(
+            self._dataset, self._cfg, workers=workers, names=names
+        )
         switch_label(output_path, kinds, directions)
 
     def generate_track_labels(
         self,
-        output_path: pathlib.Path
+        output_path: pathlib.Path,
+        workers: int = 1,
     ) -> None:
         pass
 
@@ -141,11 +198,7 @@ class LabelConverterPixelmask(ILabelConverter):
         dataset: Optional[data.IDataSet] = None,
         cfg: Optional[config.Labels4RailsConfig] = None,
         path_to_chunk: Optional[str] = None,
-        track_segmentation: Optional[dict] = {
-            'ego_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
-            'left_neighbor_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
-            'right_neighbor_track' : {'left_rail' : 255, 'right_rail' : 255, 'track_bed' : 255},
-        }
+        track_segmentation: Optional[dict] = TRACK_SEGMENTATION,
     ) -> None:
         """
         Ether dataset or configuration is needed.
@@ -156,73 +209,10 @@ class LabelConverterPixelmask(ILabelConverter):
             msg: str = "Expected ether configuration, dataset or path to data chunk, got none of them."
             raise ValueError(msg)
         if cfg is not None:
-            ego_color = cfg.targets.tracks.ego.track_bed.export_mask_color
-            cfg.targets.tracks.ego.track_bed.fill_color = [ego_color, ego_color, ego_color]
-            ego_color_left_rail = cfg.targets.tracks.ego.left_rail.export_mask_color
-            cfg.targets.tracks.ego.left_rail.fill_color = [ego_color_left_rail,ego_color_left_rail,ego_color_left_rail]
-            ego_color_right_rail = cfg.targets.tracks.ego.right_rail.export_mask_color
-            cfg.targets.tracks.ego.right_rail.fill_color = [ego_color_right_rail,ego_color_right_rail,ego_color_right_rail]
-
-            left_color = cfg.targets.tracks.left.track_bed.export_mask_color
-            cfg.targets.tracks.left.track_bed.fill_color = [left_color, left_color, left_color]
-            left_color_left_rail = cfg.targets.tracks.left.left_rail.export_mask_color
-            cfg.targets.tracks.left.left_rail.fill_color = [left_color_left_rail,left_color_left_rail,left_color_left_rail]
-            left_color_right_rail = cfg.targets.tracks.left.right_rail.export_mask_color
-            cfg.targets.tracks.left.right_rail.fill_color = [left_color_right_rail,left_color_right_rail,left_color_right_rail]
-            
-            right_color = cfg.targets.tracks.right.track_bed.export_mask_color
-            cfg.targets.tracks.right.track_bed.fill_color = [right_color, right_color, right_color]
-            right_color_left_rail = cfg.targets.tracks.right.left_rail.export_mask_color
-            cfg.targets.tracks.right.left_rail.fill_color = [right_color_left_rail,right_color_left_rail,right_color_left_rail]
-            right_color_right_rail = cfg.targets.tracks.right.right_rail.export_mask_color
-            cfg.targets.tracks.right.right_rail.fill_color = [right_color_right_rail,right_color_right_rail,right_color_right_rail]
-
+            # Masks take the class values, see 'tracks.mask_classes'
             self._cfg: config.Labels4RailsConfig = cfg
         else:
-            # ego_trackbed: config.Trackbed = config.TrackBed(255, [255,255,255], None, 15)
-            # ego_rail: config.Rail = config.Rail(255, None, None, None, [255,255,255], 15)
-            # ego_track: config.Track = config.Track(0,0,0,1, ego_trackbed, ego_rail, ego_rail)
-
-            # left_trackbed: config.Trackbed = config.TrackBed(85, [85,85,85], None, 15)
-            # left_rail: config.Rail = config.Rail(85, None, None, None, [85,85,85], 15)
-            # left_track: config.Track = config.Track(0,0,0,1, left_trackbed, left_rail, left_rail)
-
-            # right_trackbed: config.Trackbed = config.TrackBed(170, [170,170,170], None, 15)
-            # right_rail: config.Rail = config.Rail(170, None, None, None, [170,170,170], 15)
-            # right_track: config.Track = config.Track(0,0,0,1, right_trackbed, right_rail, right_rail)
-            
-            ego_trackbed: config.Trackbed = config.TrackBed(track_segmentation['ego_track']['track_bed'], 3*[track_segmentation['ego_track']['track_bed']], None, 15)
-            ego_left_rail: config.Rail = config.Rail(track_segmentation['ego_track']['left_rail'], None, None, None, 3*[track_segmentation['ego_track']['left_rail']], 15)
-            ego_right_rail: config.Rail = config.Rail(track_segmentation['ego_track']['right_rail'], None, None, None, 3*[track_segmentation['ego_track']['right_rail']], 15)
-            ego_track: config.Track = config.Track(0,0,0,1, ego_trackbed, ego_left_rail, ego_right_rail)
-
-            left_trackbed: config.Trackbed = config.TrackBed(track_segmentation['left_neighbor_track']['track_bed'], 3*[track_segmentation['left_neighbor_track']['track_bed']], None, 15)
-            left_left_rail: config.Rail = config.Rail(track_segmentation['left_neighbor_track']['left_rail'], None, None, None, 3*[track_segmentation['left_neighbor_track']['left_rail']], 15)
-            left_right_rail: config.Rail = config.Rail(track_segmentation['left_neighbor_track']['right_rail'], None, None, None, 3*[track_segmentation['left_neighbor_track']['right_rail']], 15)
-            left_track: config.Track = config.Track(0,0,0,1, left_trackbed, left_left_rail, left_right_rail)
-
-            right_trackbed: config.Trackbed = config.TrackBed(track_segmentation['right_neighbor_track']['track_bed'], 3*[track_segmentation['right_neighbor_track']['track_bed']], None, 15)
-            right_left_rail: config.Rail = config.Rail(track_segmentation['right_neighbor_track']['left_rail'], None, None, None, 3*[track_segmentation['right_neighbor_track']['left_rail']], 15)
-            right_right_rail: config.Rail = config.Rail(track_segmentation['right_neighbor_track']['right_rail'], None, None, None, 3*[track_segmentation['right_neighbor_track']['right_rail']], 15)
-            right_track: config.Track = config.Track(0,0,0,1, right_trackbed, right_left_rail, right_right_rail)
-            
-            selected_trackbed: config.Trackbed = config.TrackBed(0, [0,0,0], None, 15)
-            selected_rail: config.Rail = config.Rail(0, None, None, None, [0,0,0], 15)
-            selected_track: config.Track = config.Track(0,0,0,1, selected_trackbed, selected_rail, selected_rail)
-
-            drawing_order = (("left", "track_bed"),("left", "rails"),("right", "track_bed"),("right", "rails"),("ego","track_bed"),("ego", "rails"))
-
-            tracks: config.Tracks = config.Tracks(ego_track, left_track, right_track, drawing_order, selected_track)
-            targets: config.Targets = config.Targets(tracks, None, None)
-            cfg_data: config.Data = config.Data(None, [], 1100, 67)
-            included: config.Included = config.Included([None],[None],[None],[None],[None],[None])
-            excluded: config.Excluded = config.Excluded([None],[None],[None],[None],[None],[None])
-            # print(cfg_data)
-            # print(targets)
-            # print(included)
-            # print(excluded)
-            # exit()
-            self._cfg: config.Labels4RailsConfig = config.Labels4RailsConfig(cfg_data, targets, None, None,included, excluded)
+            self._cfg: config.Labels4RailsConfig = default_config(track_segmentation)
         if path_to_chunk is not None:
             images = config.Images(str(pathlib.Path(path_to_chunk).joinpath("images")), ["jpg", "jpeg", "png"])
             self._cfg.data.paths = config.Paths(str(pathlib.Path(path_to_chunk).joinpath("camera").joinpath("camera.yaml")),
@@ -240,13 +230,131 @@ class LabelConverterPixelmask(ILabelConverter):
         output_path: pathlib.Path,
         kinds: Optional[tuple[scene.target.SwitchKind]],
         directions: Optional[tuple[scene.target.SwitchDirection]],
+        workers: int = 1,
     ) -> None:
         pass
 
     def generate_track_labels(
         self,
-        output_path: pathlib.Path
+        output_path: pathlib.Path,
+        workers: int = 1,
+        mask_writer_: Optional[mask_writer.IMaskWriter] = None,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        image_output_path: Optional[pathlib.Path] = None,
+        names: Optional[list[str]] = None,
+        undistort: bool = False,
     ) -> None:
+        """
+        Create pixelmasks for tracks in given scene.
+        :param output_path: Path to store labels
+        :param workers: Number of processes writing labels
+        :param mask_writer_: Stores masks, greyscale PNGs by default
+        :param output_size: Width and height of the masks, e.g. the training
+            resolution
+        :param scale: Factor from camera to mask resolution, alternative to
+            'output_size'
+        :param image_output_path: Path to store the frames resized to the
+            mask resolution, None to not store frames
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        :param undistort: Remove lens distortion from masks and frames
+        """
         track_label: tracks.ITrackLabelConverter 
-        track_label = tracks.TrackLabelConverterPixelmask(self._dataset, self._cfg)
-        track_label(output_path)
\ No newline at end of file
+        track_label = tracks.TrackLabelConverterPixelmask(
+            self._dataset,
+            self._cfg,
+            undistort=undistort,
+            workers=workers,
+            mask_writer_=mask_writer_,
+            output_size=output_size,
+            scale=scale,
+            image_output_path=image_output_path,
+            names=names,
+        )
+        track_label(output_path)
+
+    def generate_labels(
+        self,
+        mask_output_path: Optional[pathlib.Path] = None,
+        yolo_output_path: Optional[pathlib.Path] = None,
+        image_output_path: Optional[pathlib.Path] = None,
+        metadata_path: Optional[pathlib.Path] = None,
+        kinds: Optional[tuple[scene.target.SwitchKind]] = None,
+        directions: Optional[tuple[scene.target.SwitchDirection]] = None,
+        workers: int = 1,
+        mask_writer_: Optional[mask_writer.IMaskWriter] = None,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        names: Optional[list[str]] = None,
+        undistort: bool = False,
+    ) -> None:
+        """
+        Create pixelmasks, switch labels, resized frames and metadata in a
+        single pass over the scenes. Outputs without path are not created.
+        :param mask_output_path: Path to store pixelmasks
+        :param yolo_output_path: Path to store yolo-format switch labels
+        :param image_output_path: Path to store the frames resized to the
+            mask resolution
+        :param metadata_path: CSV file to store one row per scene
+        :param kinds: List of desired switch kinds
+        :param directions: List of desired directions
+        :param workers: Number of processes writing labels
+        :param mask_writer_: Stores masks, greyscale PNGs by default
+        :param output_size: Width and height of masks and frames
+        :param scale: Factor from camera to mask resolution, alternative to
+            'output_size'
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        :param undistort: Remove lens distortion from masks and frames,
+            switch labels keep the distorted coordinates
+        """
+        sinks: list[export.IExportSink] = []
+        if mask_output_path is not None:
+            track_label: tracks.TrackLabelConverterPixelmask = tracks.TrackLabelConverterPixelmask(
+                self._dataset,
+                self._cfg,
+                undistort=undistort,
+                mask_writer_=mask_writer_,
+                output_size=output_size,
+                scale=scale,
+            )
+            sinks.append(track_label.sink(mask_output_path))
+        if yolo_output_path is not None:
+            kinds = tuple() if kinds is None else kinds
+            directions = tuple() if directions is None else directions
+            switch_label: switch.SwitchLabelConverterYOLO = switch.SwitchLabelConverterYOLO(self._dataset, self._cfg)
+            sinks.append(switch_label.sink(yolo_output_path, kinds, directions))
+        if image_output_path is not None:
+            sinks.append(
+                export.ImageSink(image_output_path, self._dataset.camera_cfg, undistort, output_size, scale)
+            )
+        if metadata_path is not None:
+            sinks.append(export.MetadataSink(metadata_path))
+        exporter: export.LabelExporter = export.LabelExporter(self._dataset, self._cfg, workers=workers, names=names)
+        exporter(sinks)
+
+    def generate_row_anchor_labels(
+        self,
+        output_path: pathlib.Path,
+        image_output_path: Optional[pathlib.Path] = None,
+        workers: int = 1,
+        crop: Optional[tuple[int, int, int, int]] = None,
+        names: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Create row-anchor targets of the track detector from the rail
+        splines, without rendering masks.
+        :param output_path: Path to store the targets of the chunk
+        :param image_output_path: Path to store the frames resized to the
+            model input
+        :param workers: Number of processes writing targets
+        :param crop: Left, top, right and bottom pixel of the image region
+            the model sees, None for the whole image
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        """
+        converter: row_anchors.RowAnchorConverter = row_anchors.RowAnchorConverter(
+            self._dataset, self._cfg, crop=crop, workers=workers
+        )
+        converter(output_path, image_output_path, names)
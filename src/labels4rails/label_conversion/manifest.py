@@ -0,0 +1,188 @@
+from typing import Any, Iterable, Optional
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import pathlib
+import numpy as np
+import omegaconf
+from labels4rails import data
+
+MANIFEST_NAME = ".export_manifest.json"
+# 3: rails are filled with the configuration of the opposite rail again, like
+# the track drawer, masks written by version 2 are recreated
+# 4: polygons are filled with cv2.fillPoly again unless the drawer order is
+# requested, masks written by version 3 are recreated
+VERSION = 4
+
+
+def digest(value: Any) -> str:
+    """
+    Stable hash of annotations, configuration sections and other plain
+    data, independent of key order.
+    :param value: Dictionaries, lists, dataclasses, configs, enums, arrays
+    :return: Hex digest
+    """
+    content: str = json.dumps(_plain(value), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def camera_digest(camera_cfg: data.ICameraReader) -> str:
+    """
+    Hash of a camera calibration.
+    :param camera_cfg: Information about camera
+    :return: Hex digest
+    """
+    return digest([
+        camera_cfg.roll,
+        camera_cfg.pitch,
+        camera_cfg.yaw,
+        camera_cfg.width,
+        camera_cfg.height,
+        camera_cfg.f,
+        camera_cfg.tvec,
+        camera_cfg.camera_matrix,
+        camera_cfg.distortion_coefficients,
+    ])
+
+
+def _plain(value: Any) -> Any:
+    """
+    Convert value into JSON serializable data.
+    :param value: Value to convert
+    :return: Data made of dictionaries, lists, strings and numbers
+    """
+    if isinstance(value, (omegaconf.DictConfig, omegaconf.ListConfig)):
+        return _plain(omegaconf.OmegaConf.to_container(value, resolve=True))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: _plain(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, enum.Enum):
+        return _plain(value.value)
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ExportManifest:
+    """
+    Record of the outputs of an exporter in its output directory. Every
+    output is stored with the hash of its source annotation, the settings
+    (configuration section, camera) are stored once. Outputs whose source
+    and settings did not change are skipped on the next run, outputs whose
+    source disappeared are deleted. Only outputs listed in the manifest are
+    ever deleted. Remove the manifest file to regenerate all outputs.
+
+    Several chunks may export into the same directory, every chunk keeps
+    its own record under its scope and never deletes outputs of another.
+    """
+
+    def __init__(self, output_path: pathlib.Path, settings: str, scope: str = "") -> None:
+        """
+        :param output_path: Directory the exporter writes to
+        :param settings: Hash of everything besides the source annotation
+            that the outputs depend on
+        :param scope: Key of the exported chunk, e.g. its annotations path
+        """
+        self._path: pathlib.Path = pathlib.Path(output_path) / MANIFEST_NAME
+        self._settings: str = settings
+        self._scope: str = scope
+        # output name -> source hash, None if it has to be written again
+        self._outputs: dict[str, Optional[str]] = {}
+        # Records of other chunks, written back unchanged
+        self._other_scopes: dict[str, dict] = {}
+        self._load()
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._path
+
+    def is_current(self, output_name: str, source: str) -> bool:
+        """
+        Check if an output is up to date.
+        :param output_name: File name of the output
+        :param source: Hash of the source annotation
+        :return: True if output exists and was written from the same source
+            with the same settings
+        """
+        if self._outputs.get(output_name) != source:
+            return False
+        return (self._path.parent / output_name).is_file()
+
+    def record(self, output_name: str, source: str) -> None:
+        """
+        Register a written output.
+        :param output_name: File name of the output
+        :param source: Hash of the source annotation
+        """
+        self._outputs[output_name] = source
+
+    def update(self, outputs: dict[str, str]) -> list[str]:
+        """
+        Register all outputs of a run and delete recorded outputs that are
+        no longer produced.
+        :param outputs: Source hash by file name of every existing output
+        :return: File names of deleted outputs
+        """
+        for output_name, source in outputs.items():
+            self.record(output_name, source)
+        return self.remove_stale(outputs)
+
+    def remove_stale(self, output_names: Iterable[str]) -> list[str]:
+        """
+        Delete recorded outputs that are no longer produced.
+        :param output_names: File names of all outputs of this run
+        :return: File names of deleted outputs
+        """
+        current: set[str] = set(output_names)
+        stale: list[str] = sorted(name for name in self._outputs if name not in current)
+        for name in stale:
+            try:
+                os.remove(self._path.parent / name)
+            except FileNotFoundError:
+                pass
+            del self._outputs[name]
+        return stale
+
+    def save(self) -> None:
+        """
+        Write manifest atomically, an interrupted run leaves the previous
+        manifest in place.
+        """
+        scopes: dict[str, dict] = dict(self._other_scopes)
+        scopes[self._scope] = {"settings": self._settings, "outputs": self._outputs}
+        content: dict = {"version": VERSION, "scopes": scopes}
+        tmp_path: pathlib.Path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as file_pointer:
+            json.dump(content, file_pointer, indent=4, sort_keys=True)
+        os.replace(tmp_path, self._path)
+
+    def _load(self) -> None:
+        """
+        Read manifest of the last run. With changed settings all outputs
+        are kept on record, so they are still deleted once stale, but none
+        is current.
+        """
+        try:
+            with open(self._path) as file_pointer:
+                content: dict = json.load(file_pointer)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            print("Ignoring unreadable export manifest", self._path)
+            return
+        if not isinstance(content, dict) or content.get("version") != VERSION:
+            return
+        self._other_scopes = dict(content.get("scopes", {}))
+        record: dict = self._other_scopes.pop(self._scope, {})
+        outputs: dict = record.get("outputs", {})
+        if record.get("settings") == self._settings:
+            self._outputs = dict(outputs)
+        else:
+            self._outputs = dict.fromkeys(outputs)
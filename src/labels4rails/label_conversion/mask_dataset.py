@@ -0,0 +1,114 @@
+from typing import Iterable, Optional
+import os
+import cv2
+import numpy as np
+import numpy.typing as npt
+from labels4rails import data
+from labels4rails import scene
+from labels4rails import utils
+from labels4rails.utils import config
+from .TagFilter import TagFilter
+from . import export
+from . import tracks
+
+
+class MaskDataset:
+    """
+    Annotated scenes of a chunk as frames and pixelmasks, masks are
+    rendered on access instead of being read from disk. Frames and masks
+    equal those of the PNG export with the same size. Safe to use in worker
+    processes, rasterizer and undistorter are built once per process.
+    """
+
+    def __init__(
+        self,
+        dataset: data.DataSet,
+        cfg: config.Labels4RailsConfig,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        undistort: bool = False,
+        names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration, selects scenes by tags
+        :param output_size: Width and height of frames and masks
+        :param scale: Factor from camera to mask resolution, alternative to
+            'output_size'
+        :param undistort: Remove lens distortion from frames and masks
+        :param names: Scenes to use, None for all selected by the
+            configuration
+        """
+        if output_size is not None and scale is not None:
+            msg: str = "Expected either output size or scale, got both."
+            raise ValueError(msg)
+        selected: set[str] = set(TagFilter(dataset._annotations_path, cfg).annotationList)
+        if names is not None:
+            selected &= set(names)
+        self._dataset: data.DataSet = dataset
+        self._cfg: config.Labels4RailsConfig = cfg
+        self._output_size: Optional[tuple[int, int]] = None if output_size is None else tuple(output_size)
+        self._scale: Optional[float] = scale
+        self._undistort: bool = undistort
+        self._items: list[int] = [item for item, name in enumerate(dataset.names) if name in selected]
+        self._pid: Optional[int] = None
+        self._scene_deserializer: Optional[scene.ISceneSerializer] = None
+        self._rasterizer: Optional[scene.IRasterizer] = None
+        self._camera: Optional[utils.camera.ICamera] = None
+        self._undistorter: Optional[utils.camera.IUndistorter] = None
+
+    def __getstate__(self) -> dict:
+        # Worker processes build their own rasterizer and undistorter.
+        state: dict = self.__dict__.copy()
+        state["_pid"] = None
+        state["_scene_deserializer"] = None
+        state["_rasterizer"] = None
+        state["_camera"] = None
+        state["_undistorter"] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
+        """
+        Load frame and render its pixelmask.
+        :param index: Index among the selected scenes
+        :return: BGR frame and mask of class values at the output resolution
+        """
+        if self._pid != os.getpid():
+            self._setup()
+        data_: data.Data = self._dataset[self._items[index]]
+        image: npt.NDArray[np.uint8] = data_.image
+        resolution: tuple[int, int] = image.shape[:2]
+        target: tuple[int, int] = export.output_resolution(resolution, self._output_size, self._scale)
+        mask: npt.NDArray[np.uint8] = tracks.render_mask(
+            self._rasterizer,
+            self._scene_deserializer.de_serialize(data_.annotation),
+            self._cfg,
+            self._camera,
+            resolution,
+            target,
+            self._undistorter,
+        )
+        if self._undistorter is not None:
+            image = self._undistorter.undistort_image(image)
+        if target != resolution:
+            image = cv2.resize(image, target[::-1], interpolation=cv2.INTER_AREA)
+        return image, mask
+
+    @property
+    def names(self) -> list[str]:
+        dataset_names: list[str] = self._dataset.names
+        return [dataset_names[item] for item in self._items]
+
+    def _setup(self) -> None:
+        """
+        Build per-process state.
+        """
+        self._scene_deserializer = scene.DictSceneSerializer()
+        self._rasterizer = scene.OpenCVRasterizer()
+        self._camera = utils.camera.shared_camera(self._dataset.camera_cfg)
+        if self._undistort:
+            self._undistorter = utils.camera.get_undistorter(self._dataset.camera_cfg)
+        self._pid = os.getpid()
@@ -0,0 +1,309 @@
+from typing import Optional, Union
+import json
+import pathlib
+import cv2
+import numpy as np
+import numpy.typing as npt
+from labels4rails import data
+from labels4rails import scene
+from labels4rails import utils
+from labels4rails.utils import config
+from .TagFilter import TagFilter
+from . import frame_pool
+
+VOLUME_NAME = "masks_volume.npy"
+INDEX_NAME = "masks_volume.json"
+VERSION = 1
+SWITCH_PREFIX = "switch"
+DEFAULT_CHANNELS: tuple[str, ...] = (
+    "track_bed",
+    "left_rail",
+    "right_rail",
+    "switch_fork",
+    "switch_merge",
+)
+
+
+class MaskVolumeConverter:
+    """
+    Render binary masks per class into one memory-mapped array per chunk of
+    shape (frames, channels, height, width), optionally bit-packed along the
+    width. Channels may overlap. An index file lists frame names and
+    channels, read both with 'MaskVolume'.
+
+    Channels are named after track elements 'track_bed', 'left_rail',
+    'right_rail' or 'rails', optionally restricted to a track position like
+    'ego/track_bed', or after switches 'switch' or 'switch_<kind>' like
+    'switch_fork'. Switches are filled boxes.
+    """
+
+    def __init__(
+        self,
+        dataset: data.IDataSet,
+        cfg: config.Labels4RailsConfig,
+        channels: tuple[str, ...] = DEFAULT_CHANNELS,
+        packed: bool = False,
+        undistort: bool = False,
+        io_workers: int = 2,
+        workers: int = 1,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration
+        :param channels: Names of the channels
+        :param packed: Store 8 pixels per byte along the width
+        :param undistort: Remove lens distortion from the masks
+        :param io_workers: Threads loading scenes ahead of rendering
+        :param workers: Processes rendering masks into the array
+        """
+        for channel in channels:
+            _parse_channel(channel)
+        self._dataset: data.IDataSet = dataset
+        self._cfg = cfg
+        self._channels: tuple[str, ...] = tuple(channels)
+        self._packed: bool = packed
+        self._undistort: bool = undistort
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+
+    def __call__(self, output_path: pathlib.Path) -> None:
+        """
+        Store mask volume and index in given path.
+        :param output_path: Path to store labels
+        """
+        filtered_list = set(TagFilter(self._dataset._annotations_path, self._cfg).annotationList)
+        dataset_names: list[str] = self._dataset.names
+        items: list[int] = [
+            item for item, name in enumerate(dataset_names) if name in filtered_list
+        ]
+        if not items:
+            print("No annotated scenes found, no mask volume created.")
+            return
+        names: list[str] = [dataset_names[item] for item in items]
+        first: data.Data = next(iter(self._dataset.iter(items=items[:1])))
+        height, width = first.image.shape[:2]
+        shape: tuple[int, int, int, int] = (
+            len(items),
+            len(self._channels),
+            height,
+            (width + 7) // 8 if self._packed else width,
+        )
+
+        volume_path: pathlib.Path = output_path / VOLUME_NAME
+        # Allocated sparse on disk, frames are written by the workers
+        volume = np.lib.format.open_memmap(volume_path, mode="w+", dtype=np.uint8, shape=shape)
+        del volume
+        index: dict = {
+            "version": VERSION,
+            "names": names,
+            "channels": list(self._channels),
+            "height": height,
+            "width": width,
+            "packed": self._packed,
+        }
+        with open(output_path / INDEX_NAME, "w") as file_pointer:
+            json.dump(index, file_pointer, indent=4)
+
+        writer: frame_pool.IFrameWriter = _VolumeFrameWriter(
+            volume_path,
+            {name: row for row, name in enumerate(names)},
+            self._channels,
+            self._packed,
+            self._dataset.camera_cfg,
+            self._cfg,
+            self._undistort,
+        )
+        frame_pool.write_frames(writer, self._dataset, items, self._workers, self._io_workers)
+
+
+class _VolumeFrameWriter(frame_pool.IFrameWriter):
+    """
+    Render the channels of a single frame into its row of the mask volume.
+    Every process maps the volume once, rows are disjoint.
+    """
+
+    def __init__(
+        self,
+        volume_path: pathlib.Path,
+        rows: dict[str, int],
+        channels: tuple[str, ...],
+        packed: bool,
+        camera_cfg: data.ICameraReader,
+        cfg: config.Labels4RailsConfig,
+        undistort: bool,
+    ) -> None:
+        """
+        :param volume_path: '.npy' file of the volume
+        :param rows: Row in the volume by scene name
+        :param channels: Names of the channels
+        :param packed: Volume stores 8 pixels per byte along the width
+        :param camera_cfg: Information about camera
+        :param cfg: RailLabel configuration
+        :param undistort: Remove lens distortion from the masks
+        """
+        self._volume_path: pathlib.Path = volume_path
+        self._rows: dict[str, int] = rows
+        self._channels: tuple[str, ...] = channels
+        self._packed: bool = packed
+        self._camera_cfg: data.ICameraReader = camera_cfg
+        self._cfg: config.Labels4RailsConfig = cfg
+        self._undistort: bool = undistort
+        self._volume: Optional[np.memmap] = None
+        self._scene_deserializer: Optional[scene.ISceneSerializer] = None
+        self._rasterizer: Optional[scene.IRasterizer] = None
+        self._camera: Optional[utils.camera.ICamera] = None
+        self._undistorter: Optional[utils.camera.IUndistorter] = None
+
+    def setup(self) -> None:
+        self._volume = np.load(self._volume_path, mmap_mode="r+")
+        self._scene_deserializer = scene.DictSceneSerializer()
+        self._rasterizer = scene.OpenCVRasterizer()
+        self._camera = utils.camera.shared_camera(self._camera_cfg)
+        if self._undistort:
+            self._undistorter = utils.camera.get_undistorter(self._camera_cfg)
+
+    def __call__(self, data_: data.Data) -> Optional[str]:
+        """
+        Render channels of a frame into the volume.
+        :param data_: Item of RailLabel dataset
+        :return: Message if the frame could not be rendered
+        """
+        if not data_.annotation:
+            return f"No mask created for {data_.name} . No corresponding annotation file found."
+        resolution: tuple[int, int] = data_.image.shape[:2]
+        width: int = resolution[1]
+        if self._packed:
+            width = (width + 7) // 8
+        if (resolution[0], width) != self._volume.shape[2:]:
+            return f"No mask created for {data_.name} . Resolution differs from first scene of chunk."
+        scene_: scene.IScene = self._scene_deserializer.de_serialize(data_.annotation)
+
+        layers: list[scene.MaskLayer] = []
+        if self._cfg.targets.tracks:
+            layers = self._rasterizer.layers(
+                scene_, self._cfg.targets.tracks, self._camera, resolution, instances=True
+            )
+        masks: npt.NDArray[np.uint8] = np.zeros((len(self._channels), *resolution), dtype=np.uint8)
+        index: int
+        channel: str
+        for index, channel in enumerate(self._channels):
+            position, element = _parse_channel(channel)
+            if element.startswith(SWITCH_PREFIX):
+                self.__fill_switches(masks[index], scene_, element)
+            else:
+                selected: list[scene.MaskLayer] = [
+                    layer for layer in layers
+                    if (position is None or layer.position == position)
+                    and (layer.element == element or (element == "rails" and layer.element.endswith("_rail")))
+                ]
+                self._rasterizer.fill(masks[index], selected, [1] * len(selected))
+            if self._undistorter is not None:
+                masks[index] = self._undistorter.undistort_mask(masks[index])
+
+        if self._packed:
+            masks = np.packbits(masks, axis=-1)
+        self._volume[self._rows[data_.name]] = masks
+        return None
+
+    @staticmethod
+    def __fill_switches(mask: npt.NDArray[np.uint8], scene_: scene.IScene, element: str) -> None:
+        """
+        Fill boxes of switches of a kind.
+        :param mask: Channel to draw on
+        :param scene_: Scene with switches
+        :param element: 'switch' for all kinds or 'switch_<kind>'
+        """
+        kind: Optional[str] = element[len(SWITCH_PREFIX) + 1:] or None
+        switch: scene.target.ISwitch
+        for switch in scene_.switches.values():
+            if len(switch.marks) != 2 or (kind is not None and switch.kind.value != kind):
+                continue
+            corners = [(int(round(mark.x)), int(round(mark.y))) for mark in switch.marks]
+            cv2.rectangle(mask, corners[0], corners[1], color=1, thickness=-1)
+
+
+def _parse_channel(channel: str) -> tuple[Optional[str], str]:
+    """
+    Split channel name into track position and element.
+    :param channel: Name like 'track_bed', 'ego/left_rail' or 'switch_fork'
+    :return: Track position (None for all) and element
+    """
+    position: Optional[str] = None
+    element: str = channel
+    if "/" in channel:
+        position, element = channel.split("/", 1)
+    elements: list[str] = ["track_bed", "left_rail", "right_rail", "rails", SWITCH_PREFIX]
+    elements += [f"{SWITCH_PREFIX}_{kind.value}" for kind in scene.target.SwitchKind]
+    positions: list[str] = [position_.value for position_ in scene.target.TrackPosition]
+    valid: bool = element in elements
+    if position is not None:
+        valid = valid and position in positions and not element.startswith(SWITCH_PREFIX)
+    if not valid:
+        msg: str = f"Expected channel as [<{'|'.join(positions)}>/]<{'|'.join(elements)}>, got {channel}."
+        raise ValueError(msg)
+    return position, element
+
+
+class MaskVolume:
+    """
+    Read a mask volume written by 'MaskVolumeConverter'. Frames are sliced
+    from the memory-mapped array without decoding.
+    """
+
+    def __init__(self, path: Union[pathlib.Path, str]) -> None:
+        """
+        :param path: Directory containing volume and index
+        """
+        path = pathlib.Path(path)
+        with open(path / INDEX_NAME) as file_pointer:
+            index: dict = json.load(file_pointer)
+        if index.get("version") != VERSION:
+            msg: str = f"Expected mask volume version {VERSION}, got {index.get('version')}."
+            raise ValueError(msg)
+        self._names: list[str] = index["names"]
+        self._rows: dict[str, int] = {name: row for row, name in enumerate(self._names)}
+        self._channels: list[str] = index["channels"]
+        self._width: int = index["width"]
+        self._packed: bool = index["packed"]
+        self._volume: np.memmap = np.load(path / VOLUME_NAME, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, item: int) -> npt.NDArray[np.uint8]:
+        """
+        Masks of a frame.
+        :param item: Index of frame
+        :return: Binary masks of shape (channels, height, width)
+        """
+        masks: npt.NDArray[np.uint8] = self._volume[item]
+        if self._packed:
+            return np.unpackbits(masks, axis=-1, count=self._width)
+        return masks
+
+    @property
+    def names(self) -> list[str]:
+        return self._names
+
+    @property
+    def channels(self) -> list[str]:
+        return self._channels
+
+    @property
+    def array(self) -> np.memmap:
+        """
+        Raw volume, bit-packed along the width if 'packed'.
+        """
+        return self._volume
+
+    @property
+    def packed(self) -> bool:
+        return self._packed
+
+    def frame(self, name: str) -> npt.NDArray[np.uint8]:
+        """
+        Masks of a frame by scene name.
+        :param name: Name of scene
+        :return: Binary masks of shape (channels, height, width)
+        """
+        return self[self._rows[name]]
@@ -0,0 +1,128 @@
+from typing import Optional
+import abc
+import enum
+import pathlib
+import cv2
+import numpy as np
+import numpy.typing as npt
+import PIL.Image
+from labels4rails.utils import config
+
+
+class PngStrategy(enum.IntEnum):
+    """
+    zlib strategies, identical in OpenCV and Pillow.
+    """
+
+    DEFAULT = 0
+    FILTERED = 1
+    HUFFMAN_ONLY = 2
+    RLE = 3
+    FIXED = 4
+
+
+class IMaskWriter(metaclass=abc.ABCMeta):
+    """
+    Store single-channel label masks.
+    """
+
+    @abc.abstractmethod
+    def write(self, path: pathlib.Path, mask: npt.NDArray[np.uint8]) -> None:
+        """
+        Store mask as PNG.
+        :param path: File to write
+        :param mask: Single-channel mask of class values
+        """
+        pass
+
+
+class OpenCVMaskWriter(IMaskWriter):
+    """
+    Store masks as greyscale PNGs.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[int] = None,
+        strategy: Optional[PngStrategy] = None,
+    ) -> None:
+        """
+        :param compression: zlib level from 0 (fastest) to 9 (smallest),
+            None for the OpenCV default
+        :param strategy: zlib strategy, None for the OpenCV default (RLE)
+        """
+        self._params: list[int] = []
+        if compression is not None:
+            self._params += [cv2.IMWRITE_PNG_COMPRESSION, compression]
+        if strategy is not None:
+            self._params += [cv2.IMWRITE_PNG_STRATEGY, int(strategy)]
+
+    def write(self, path: pathlib.Path, mask: npt.NDArray[np.uint8]) -> None:
+        """
+        Store mask as greyscale PNG.
+        :param path: File to write
+        :param mask: Single-channel mask of class values
+        """
+        cv2.imwrite(str(path), mask, self._params)
+
+
+class PaletteMaskWriter(IMaskWriter):
+    """
+    Store masks as palette PNGs. Pixels keep their class value as palette
+    index, so readers of the index get the same masks as from greyscale
+    PNGs, while image viewers show the class colours. Read the index with
+    'numpy.array(PIL.Image.open(path))', OpenCV converts palette PNGs to
+    colour images.
+    """
+
+    def __init__(
+        self,
+        palette: Optional[dict[int, tuple[int, int, int]]] = None,
+        compression: int = 6,
+        strategy: PngStrategy = PngStrategy.DEFAULT,
+    ) -> None:
+        """
+        :param palette: RGB colour by class value, other values are shown as
+            grey
+        :param compression: zlib level from 0 (fastest) to 9 (smallest)
+        :param strategy: zlib strategy
+        """
+        colors: npt.NDArray[np.uint8] = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+        value: int
+        for value, color in ({} if palette is None else palette).items():
+            colors[value] = color
+        self._palette: list[int] = colors.flatten().tolist()
+        self._compression: int = compression
+        self._strategy: PngStrategy = strategy
+
+    def write(self, path: pathlib.Path, mask: npt.NDArray[np.uint8]) -> None:
+        """
+        Store mask as palette PNG.
+        :param path: File to write
+        :param mask: Single-channel mask of class values
+        """
+        image: PIL.Image.Image = PIL.Image.fromarray(np.ascontiguousarray(mask, dtype=np.uint8))
+        image.putpalette(self._palette)
+        image.save(
+            path,
+            format="PNG",
+            compress_level=self._compression,
+            compress_type=int(self._strategy),
+        )
+
+
+def mask_palette(cfg: config.Tracks) -> dict[int, tuple[int, int, int]]:
+    """
+    Colours of the mask classes, the fill colours the GUI draws track beds
+    and rails with. Classes sharing a value get the colour of the first one.
+    :param cfg: Configuration data class
+    :return: RGB colour by class value
+    """
+    palette: dict[int, tuple[int, int, int]] = {}
+    cfg_track: config.Track
+    for cfg_track in (cfg.ego, cfg.left, cfg.right):
+        for cfg_element in (cfg_track.track_bed, cfg_track.left_rail, cfg_track.right_rail):
+            if cfg_element.fill_color is None or cfg_element.export_mask_color in palette:
+                continue
+            palette[cfg_element.export_mask_color] = tuple(cfg_element.fill_color)
+    return palette
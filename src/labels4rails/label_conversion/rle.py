@@ -0,0 +1,189 @@
+from typing import Any, Iterable, Optional, Union
+import json
+import pathlib
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+
+def encode(mask: npt.ArrayLike) -> dict[str, Any]:
+    """
+    Encode binary mask as COCO run-length encoding. Runs are counted in
+    column-major order and start with background, counts are stored as
+    compressed string like 'pycocotools.mask.encode'.
+    :param mask: Binary mask of shape (height, width)
+    :return: Dictionary with 'size' (height, width) and 'counts'
+    """
+    mask = np.asarray(mask, dtype=bool)
+    return {"size": list(mask.shape), "counts": counts_to_string(mask_counts(mask))}
+
+
+def decode(rle: dict[str, Any]) -> npt.NDArray[np.bool_]:
+    """
+    Decode COCO run-length encoding.
+    :param rle: Dictionary with 'size' and compressed string or list 'counts'
+    :return: Binary mask of shape (height, width)
+    """
+    height, width = rle["size"]
+    counts: npt.NDArray[np.int64] = _counts(rle)
+    return _expand(counts, height * width).reshape((height, width), order="F")
+
+
+def mask_counts(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.int64]:
+    """
+    Run lengths of a binary mask in column-major order, starting with
+    background.
+    :param mask: Binary mask of shape (height, width)
+    :return: Alternating background and foreground run lengths
+    """
+    flat: npt.NDArray[np.bool_] = mask.ravel(order="F")
+    if flat.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    changes: npt.NDArray[np.int64] = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts: npt.NDArray[np.int64] = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts
+
+
+def counts_to_string(counts: Iterable[int]) -> str:
+    """
+    Compress run lengths into the ASCII format of the COCO mask API. Counts
+    are delta coded against the count two runs back and stored in 5 bit
+    groups.
+    :param counts: Run lengths
+    :return: Compressed counts
+    """
+    counts = [int(count) for count in counts]
+    chars: list[str] = []
+    index: int
+    for index, count in enumerate(counts):
+        value: int = count - counts[index - 2] if index > 2 else count
+        more: bool = True
+        while more:
+            char: int = value & 0x1F
+            value >>= 5
+            more = value != -1 if char & 0x10 else value != 0
+            if more:
+                char |= 0x20
+            chars.append(chr(char + 48))
+    return "".join(chars)
+
+
+def string_to_counts(string: str) -> npt.NDArray[np.int64]:
+    """
+    Decompress run lengths from the ASCII format of the COCO mask API.
+    :param string: Compressed counts
+    :return: Run lengths
+    """
+    counts: list[int] = []
+    data: bytes = string.encode("ascii")
+    position: int = 0
+    while position < len(data):
+        value: int = 0
+        shift: int = 0
+        more: bool = True
+        while more:
+            char: int = data[position] - 48
+            value |= (char & 0x1F) << shift
+            more = bool(char & 0x20)
+            position += 1
+            shift += 5
+            if not more and char & 0x10:
+                value |= -1 << shift
+        if len(counts) > 2:
+            value += counts[-2]
+        counts.append(value)
+    return np.array(counts, dtype=np.int64)
+
+
+def _counts(rle: dict[str, Any]) -> npt.NDArray[np.int64]:
+    """
+    Run lengths of an encoding with compressed or uncompressed counts.
+    :param rle: Dictionary with 'counts'
+    :return: Run lengths
+    """
+    if isinstance(rle["counts"], str):
+        return string_to_counts(rle["counts"])
+    return np.asarray(rle["counts"], dtype=np.int64)
+
+
+def _expand(counts: npt.NDArray[np.int64], size: int) -> npt.NDArray[np.bool_]:
+    """
+    Expand run lengths into a flat column-major mask.
+    :param counts: Alternating background and foreground run lengths
+    :param size: Number of pixels
+    :return: Flat binary mask
+    """
+    values: npt.NDArray[np.bool_] = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    flat: npt.NDArray[np.bool_] = np.repeat(values, counts)
+    if flat.size != size:
+        msg: str = f"Expected run lengths summing up to {size} pixels, got {flat.size}."
+        raise ValueError(msg)
+    return flat
+
+
+def bounding_box(mask: npt.NDArray[np.bool_]) -> list[int]:
+    """
+    Bounding box of the foreground in COCO format.
+    :param mask: Binary mask
+    :return: x, y, width, height
+    """
+    return list(cv2.boundingRect(mask.astype(np.uint8)))
+
+
+class RleMaskReader:
+    """
+    Read masks exported as COCO style JSON with run-length encoded
+    segmentations, e.g. by 'TrackLabelConverterRLE'.
+    """
+
+    def __init__(self, path: Union[pathlib.Path, str]) -> None:
+        """
+        :param path: COCO style JSON file
+        """
+        with open(path) as file_pointer:
+            content: dict = json.load(file_pointer)
+        self._categories: dict[int, str] = {
+            category["id"]: category["name"] for category in content["categories"]
+        }
+        self._images: dict[str, dict] = {image["file_name"]: image for image in content["images"]}
+        self._annotations: dict[int, list[dict]] = {image["id"]: [] for image in content["images"]}
+        for annotation in content["annotations"]:
+            self._annotations[annotation["image_id"]].append(annotation)
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._images)
+
+    @property
+    def categories(self) -> dict[int, str]:
+        return self._categories
+
+    def mask(self, name: str) -> npt.NDArray[np.uint8]:
+        """
+        Mask of class values like the exported pixelmasks.
+        :param name: Name of scene
+        :return: Mask of shape (height, width)
+        """
+        image: dict = self._images[name]
+        flat: npt.NDArray[np.uint8] = np.zeros(image["height"] * image["width"], dtype=np.uint8)
+        for annotation in self._annotations[image["id"]]:
+            flat[_expand(_counts(annotation["segmentation"]), flat.size)] = annotation["category_id"]
+        return np.ascontiguousarray(flat.reshape((image["height"], image["width"]), order="F"))
+
+    def instances(self, name: str) -> list[tuple[Optional[str], int, npt.NDArray[np.bool_]]]:
+        """
+        Binary masks of all segments of a scene.
+        :param name: Name of scene
+        :return: Instance name (None for class masks), class value and mask
+            per segment
+        """
+        return [
+            (annotation.get("instance"), annotation["category_id"], decode(annotation["segmentation"]))
+            for annotation in self._annotations[self._images[name]["id"]]
+        ]
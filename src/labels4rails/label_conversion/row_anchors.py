@@ -0,0 +1,297 @@
+from typing import Any, Iterable, Optional, Union
+import os
+import pathlib
+import cv2
+import numpy as np
+import numpy.typing as npt
+import yaml
+from labels4rails import data
+from labels4rails import scene
+from labels4rails import utils
+from labels4rails.utils import config
+from . import export
+from . import manifest
+
+TARGETS_NAME = "row_anchors.npz"
+DEFAULT_MODEL_PATH: pathlib.Path = (
+    pathlib.Path(__file__).parents[1] / "autolabel" / "models" / "tracks" / "weights" / "logical-tree-1"
+)
+DEFAULT_INTERPOLATION_STEPS: int = 15
+
+
+class RowAnchorConverter:
+    """
+    Create training targets of the row-anchor track detector ('Detector' in
+    'autolabel.models.tracks') without rendering masks. The rail splines of
+    the ego track are sampled at the anchor rows of the model, the targets
+    of a chunk are stored in one '.npz' file:
+
+    - names: Scene names, shape (frames,)
+    - traj: x coordinate of left and right rail per anchor row, normalized
+      to the (cropped) image width like the model output, shape
+      (frames, 2, anchors). Anchor 0 is the bottom row.
+    - valid: Rail crosses the anchor row, shape (frames, 2, anchors).
+      Invalid rows are interpolated between valid rows or hold the x
+      coordinate of the nearest one.
+    - ylim: Share of anchor rows from the bottom up to the last row both
+      rails cross, the target of the limit output, shape (frames,)
+
+    Frames are optionally stored cropped and resized to the model input.
+    """
+
+    def __init__(
+        self,
+        dataset: data.IDataSet,
+        cfg: config.Labels4RailsConfig,
+        model_path: Union[pathlib.Path, str] = DEFAULT_MODEL_PATH,
+        crop: Optional[tuple[int, int, int, int]] = None,
+        io_workers: int = 2,
+        workers: int = 1,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration, selects scenes by tags
+        :param model_path: Directory containing the 'config.yaml' of the
+            model with 'anchors' and 'input_shape'
+        :param crop: Left, top, right and bottom pixel of the image region
+            the model sees, None for the whole image
+        :param io_workers: Threads loading scenes ahead of writing
+        :param workers: Processes writing scenes
+        """
+        with open(pathlib.Path(model_path) / "config.yaml") as file_pointer:
+            model_cfg: dict = yaml.safe_load(file_pointer)
+        self._dataset: data.IDataSet = dataset
+        self._cfg = cfg
+        self._anchors: int = model_cfg["anchors"]
+        # input_shape is channels, height, width
+        self._input_size: tuple[int, int] = (model_cfg["input_shape"][2], model_cfg["input_shape"][1])
+        self._crop: Optional[tuple[int, int, int, int]] = None if crop is None else tuple(crop)
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+
+    def __call__(
+        self,
+        output_path: pathlib.Path,
+        image_output_path: Optional[pathlib.Path] = None,
+        names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Store targets of a chunk in given path.
+        :param output_path: Path to store the targets
+        :param image_output_path: Path to store the frames resized to the
+            model input, None to skip them
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        """
+        export.LabelExporter(
+            self._dataset, self._cfg, self._io_workers, self._workers, names=names
+        )([self.sink(output_path, image_output_path)])
+
+    def sink(
+        self,
+        output_path: pathlib.Path,
+        image_output_path: Optional[pathlib.Path] = None,
+    ) -> export.IExportSink:
+        """
+        Output format for 'LabelExporter', to write the targets in the same
+        pass as other labels.
+        :param output_path: Path to store the targets
+        :param image_output_path: Path to store the frames resized to the
+            model input, None to skip them
+        :return: Sink writing the targets
+        """
+        steps: int = DEFAULT_INTERPOLATION_STEPS
+        if self._cfg is not None:
+            steps = self._cfg.targets.tracks.ego.left_rail.interpolation_steps
+        return RowAnchorSink(
+            output_path, self._anchors, self._input_size, self._crop, steps, image_output_path
+        )
+
+
+class RowAnchorSink(export.IExportSink):
+    """
+    Collect the row-anchor targets of all scenes of a chunk in one file.
+    Targets of unchanged scenes are taken from the last export.
+    """
+
+    def __init__(
+        self,
+        output_path: pathlib.Path,
+        anchors: int,
+        input_size: tuple[int, int],
+        crop: Optional[tuple[int, int, int, int]] = None,
+        interpolation_steps: int = DEFAULT_INTERPOLATION_STEPS,
+        image_output_path: Optional[pathlib.Path] = None,
+    ) -> None:
+        """
+        :param output_path: Path to store the targets
+        :param anchors: Number of anchor rows
+        :param input_size: Width and height of the model input
+        :param crop: Left, top, right and bottom pixel of the image region
+            the model sees, None for the whole image
+        :param interpolation_steps: Spline points between two marks
+        :param image_output_path: Path to store the frames resized to the
+            model input, None to skip them
+        """
+        if anchors < 2:
+            msg: str = f"Expected at least 2 anchors, got {anchors}."
+            raise ValueError(msg)
+        self._path: pathlib.Path = pathlib.Path(output_path) / TARGETS_NAME
+        self._anchors: int = anchors
+        self._input_size: tuple[int, int] = tuple(input_size)
+        self._crop: Optional[tuple[int, int, int, int]] = crop
+        self._steps: int = interpolation_steps
+        self._image_output_path: Optional[pathlib.Path] = (
+            None if image_output_path is None else pathlib.Path(image_output_path)
+        )
+        self._sources: dict[str, str] = {}
+        self._previous: dict[str, tuple[npt.NDArray, npt.NDArray, float]] = {}
+
+    def begin(self, sources: dict[str, str], incremental: bool, scope: str) -> list[str]:
+        """
+        Read targets of the last export.
+        :param sources: Hash of the annotation by name of every scene to
+            export, in dataset order
+        :param incremental: Reuse targets of scenes whose annotation did not
+            change
+        :param scope: Key of the exported chunk
+        :return: Names of the scenes to write
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        if self._image_output_path is not None:
+            self._image_output_path.mkdir(parents=True, exist_ok=True)
+        self._sources = sources
+        self._previous = {}
+        if incremental and self._path.is_file():
+            with np.load(self._path) as file_:
+                # Every access to an entry decompresses it again
+                targets: dict[str, npt.NDArray] = {key: file_[key] for key in file_.files}
+            if str(targets["settings"]) == manifest.digest(self._settings()):
+                index: int
+                for index, name in enumerate(targets["names"]):
+                    if sources.get(name) == targets["sources"][index] and self._has_image(name):
+                        self._previous[name] = (
+                            targets["traj"][index],
+                            targets["valid"][index],
+                            float(targets["ylim"][index]),
+                        )
+        return [name for name in sources if name not in self._previous]
+
+    def setup(self) -> None:
+        pass
+
+    def write(self, frame: export.ExportFrame) -> tuple[npt.NDArray, npt.NDArray, float]:
+        """
+        Sample the rails of the ego track at the anchor rows.
+        :param frame: Scene to write
+        :return: Normalized x coordinates, validity and limit
+        """
+        height, width = frame.image.shape[:2]
+        left, top, right, bottom = self._crop if self._crop is not None else (0, 0, width - 1, height - 1)
+        # Anchor 0 is the bottom row, like 'regression_to_rails'
+        rows: npt.NDArray[np.float64] = top + np.linspace(1, 0, self._anchors) * (bottom - top)
+
+        traj: npt.NDArray[np.float32] = np.zeros((2, self._anchors), dtype=np.float32)
+        valid: npt.NDArray[np.bool_] = np.zeros((2, self._anchors), dtype=bool)
+        track: Optional[scene.target.ITrack] = _ego_track(frame.scene)
+        if track is not None:
+            for index, rail in enumerate((track.left_rail, track.right_rail)):
+                points: list[utils.geometry.IImagePoint] = utils.geometry.calculate_splines(
+                    tuple(rail.marks), self._steps
+                )
+                x, valid[index] = sample_rows(points, rows)
+                traj[index] = np.clip((x - left) / (right - left), 0, 1)
+        both: npt.NDArray[np.int64] = np.flatnonzero(valid[0] & valid[1])
+        ylim: float = (both[-1] + 1) / self._anchors if both.size else 0.0
+
+        if self._image_output_path is not None:
+            image: npt.NDArray[np.uint8] = frame.image[top:bottom + 1, left:right + 1]
+            image = cv2.resize(image, self._input_size, interpolation=cv2.INTER_AREA)
+            cv2.imwrite(str(self._image_output_path / (frame.name + ".jpg")), image)
+        return traj, valid, ylim
+
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Store targets of all scenes in dataset order.
+        :param results: Targets by name of every written scene
+        """
+        names: list[str] = [name for name in self._sources if name in results or name in self._previous]
+        targets: list[tuple[npt.NDArray, npt.NDArray, float]] = [
+            results[name] if name in results else self._previous[name] for name in names
+        ]
+        tmp_path: pathlib.Path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as file_pointer:
+            np.savez_compressed(
+                file_pointer,
+                names=np.array(names, dtype=str),
+                sources=np.array([self._sources[name] for name in names], dtype=str),
+                traj=np.array([target[0] for target in targets], dtype=np.float32).reshape(-1, 2, self._anchors),
+                valid=np.array([target[1] for target in targets], dtype=bool).reshape(-1, 2, self._anchors),
+                ylim=np.array([target[2] for target in targets], dtype=np.float32),
+                settings=np.array(manifest.digest(self._settings())),
+            )
+        os.replace(tmp_path, self._path)
+        print(f"Wrote {len(results)} row anchor targets, kept {len(self._previous)} unchanged.")
+
+    def _settings(self) -> Any:
+        return [
+            "row_anchors",
+            self._anchors,
+            self._input_size,
+            self._crop,
+            self._steps,
+            self._image_output_path is not None,
+        ]
+
+    def _has_image(self, name: str) -> bool:
+        return self._image_output_path is None or (self._image_output_path / (name + ".jpg")).is_file()
+
+
+def _ego_track(scene_: scene.IScene) -> Optional[scene.target.ITrack]:
+    """
+    Ego track of a scene, the one with the lowest track id if there are
+    several.
+    :param scene_: Scene with tracks
+    :return: Ego track, None if there is none
+    """
+    for track_id in sorted(scene_.tracks):
+        if scene_.tracks[track_id].position == scene.target.TrackPosition.EGO:
+            return scene_.tracks[track_id]
+    return None
+
+
+def sample_rows(
+    points: list[utils.geometry.IImagePoint],
+    rows: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_]]:
+    """
+    x coordinates of a polyline at given rows. Marks are sorted from the
+    bottom, a row crossed several times takes the crossing nearest to the
+    bottom along the rail. Rows not crossed are interpolated between
+    crossed rows or hold the x coordinate of the nearest one.
+    :param points: Points of the polyline
+    :param rows: y coordinates to sample
+    :return: x coordinate and whether the polyline crosses, per row
+    """
+    x: npt.NDArray[np.float64] = np.zeros(len(rows))
+    valid: npt.NDArray[np.bool_] = np.zeros(len(rows), dtype=bool)
+    if len(points) < 2:
+        return x, valid
+    coordinates: npt.NDArray[np.float64] = np.array([point.point for point in points], dtype=np.float64)
+    x0, y0 = coordinates[:-1].T
+    x1, y1 = coordinates[1:].T
+    # crossing[row, segment]
+    crossing: npt.NDArray[np.bool_] = (rows[:, None] - y0) * (rows[:, None] - y1) <= 0
+    valid = crossing.any(axis=1)
+    segment: npt.NDArray[np.int64] = crossing.argmax(axis=1)
+    dy: npt.NDArray[np.float64] = (y1 - y0)[segment]
+    share: npt.NDArray[np.float64] = np.divide(
+        rows - y0[segment], dy, out=np.zeros(len(rows)), where=dy != 0
+    )
+    x = x0[segment] + share * (x1 - x0)[segment]
+    if valid.any() and not valid.all():
+        indices: npt.NDArray[np.int64] = np.arange(len(rows))
+        x[~valid] = np.interp(indices[~valid], indices[valid], x[valid])
+    elif not valid.any():
+        x[:] = 0
+    return x, valid
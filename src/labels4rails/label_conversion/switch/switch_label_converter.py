@@ -1,4 +1,4 @@
-from typing import Iterable, Optional
+from typing import Any, Iterable, Optional
 import abc
 import dataclasses
 import itertools
@@ -6,8 +6,10 @@ import pathlib
 from labels4rails import data
 from labels4rails import scene
 from labels4rails.utils import config
+import numpy as np
+import numpy.typing as npt
 
-from ..TagFilter import TagFilter
+from .. import export
 
 
 @dataclasses.dataclass(frozen=True)
@@ -71,14 +73,30 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
         self,
         dataset: data.IDataSet,
         cfg: config.Labels4RailsConfig,
+        io_workers: int = 2,
+        workers: int = 1,
+        incremental: bool = True,
+        names: Optional[list[str]] = None,
     ) -> None:
         """
         :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration
+        :param io_workers: Threads loading scenes ahead of label calculation
+        :param workers: Processes calculating labels, labels are identical
+            for any number of processes
+        :param incremental: Skip labels whose annotation and classes did
+            not change since the last export
+        :param names: Scenes to export, None for all selected by the
+            configuration
         """
         self._dataset: data.IDataSet = dataset
         self._scene_deserializer: scene.ISceneSerializer
         self._scene_deserializer = scene.DictSceneSerializer()
         self._cfg = cfg
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+        self._incremental: bool = incremental
+        self._names: Optional[list[str]] = names
 
     def __call__(
         self,
@@ -98,6 +116,25 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
         :param kinds: List of desired switch kinds
         :param directions: List of desired switch directions
         """
+        exporter: export.LabelExporter = export.LabelExporter(
+            self._dataset, self._cfg, self._io_workers, self._workers, self._incremental, self._names
+        )
+        exporter([self.sink(output_path, kinds, directions)])
+
+    def sink(
+        self,
+        output_path: pathlib.Path,
+        kinds: Optional[tuple[scene.target.SwitchKind]] = None,
+        directions: Optional[tuple[scene.target.SwitchDirection]] = None,
+    ) -> export.IExportSink:
+        """
+        YOLO output for a combined export with 'export.LabelExporter'. Class
+        ids are generated like in '__call__'.
+        :param output_path: Path to store labels
+        :param kinds: List of desired switch kinds
+        :param directions: List of desired switch directions
+        :return: Sink storing the labels and 'labels.txt'
+        """
         if kinds is None and directions is None:
             msg: str = "Expected at least one switch attribute (kind or direction), "
             msg += "got neither."
@@ -107,36 +144,31 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
 
         combos: tuple[tuple[scene.target.SwitchKind, scene.target.SwitchDirection]]
         combos = self.__calculate_combinations(kinds, directions)
+        class_ids: dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]]
+        class_ids = self.__compile_class_ids(kinds, directions, combos)
+        return _BoxSink(self, output_path, combos, class_ids)
 
-        data_: data.Data
-        filtered_list = TagFilter(self._dataset._annotations_path, self._cfg).annotationList
-        for data_ in self._dataset:
-            if data_.name in filtered_list:
-                switches, resolution = self.__prepare_switches(data_)
-                yolo_switches: list[SwitchYoloLabel]
-                yolo_switches = self.__calculate_box_labels(resolution, switches)
-                selected_switches: list[SwitchYoloLabel]
-                selected_switches = self.__filter_switches(yolo_switches, kinds, directions)
-                switches_with_id: dict[SwitchYoloLabel, int]
-                switches_with_id = self.__calculate_class_ids(selected_switches, combos)
-                self.__save_box_label(switches_with_id, output_path, data_.name)
-
-        self.__save_class_id_text(combos, output_path)
-
-    def __prepare_switches(
+    def _write_scene(
         self,
-        data_: data.Data,
-    ) -> tuple[Iterable[scene.target.ISwitch], tuple[int, int]]:
+        name: str,
+        resolution: tuple[int, int],
+        scene_: scene.IScene,
+        output_path: pathlib.Path,
+        class_ids: dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]],
+    ) -> None:
         """
-        Read switches and image resolution from RailLabel dataset.
-        :param data_: Item of RailLabel dataset
-        :return: Switches on scene, scene image resolution
+        Calculate and store yolo-format labels of a single scene.
+        :param name: Name of scene
+        :param resolution: Resolution of the scene image
+        :param scene_: Scene with switches
+        :param output_path: Path to store labels
+        :param class_ids: Lookup table from '__compile_class_ids'
         """
-        scene_: scene.IScene
-        scene_ = self._scene_deserializer.de_serialize(data_.annotation)
-        resolution: tuple[int, int] = data_.image.shape[:2]
-        switches: Iterable[scene.target.ISwitch] = scene_.switches.values()
-        return switches, resolution
+        yolo_switches: list[SwitchYoloLabel]
+        yolo_switches = self.__calculate_box_labels(resolution, scene_.switches.values())
+        switches_with_id: dict[SwitchYoloLabel, int]
+        switches_with_id = self.__calculate_class_ids(yolo_switches, class_ids)
+        self.__save_box_label(switches_with_id, output_path, name)
 
     @staticmethod
     def __calculate_combinations(
@@ -159,58 +191,63 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
         return combinations
 
     @staticmethod
-    def __filter_switches(
-        switches: list[SwitchYoloLabel],
-        kinds: Optional[tuple[scene.target.SwitchKind]] = None,
-        directions: Optional[tuple[scene.target.SwitchDirection]] = None,
-    ) -> list[SwitchYoloLabel]:
+    def __compile_class_ids(
+        kinds: tuple[scene.target.SwitchKind],
+        directions: tuple[scene.target.SwitchDirection],
+        combinations: tuple[tuple[scene.target.SwitchKind, scene.target.SwitchDirection]],
+    ) -> dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]]:
         """
-        Filter list to only contain switches to contain only switches with
-        attributes given list of kinds and directions.
-        :param switches: Switches in yolo format
+        Calculate label class ids of all switch attribute pairs once. A
+        switch is selected if its kind or its direction is desired. It gets
+        the id of the last matching combination, an empty attribute of a
+        combination matches every value.
         :param kinds: List of desired switch kinds
         :param directions: List of desired switch directions
-        :return: Filtered yolo-format switches with corresponding id
+        :param combinations: Combination of kinds and attributes
+        :return: Index of first matching combination, used to order labels,
+            and class id by kind and direction of selected switches
         """
-        kinds = tuple() if kinds is None else kinds
-        directions = tuple() if directions is None else directions
-
-        selected_switches: list[SwitchYoloLabel] = []
-        switch: SwitchYoloLabel
-        for switch in switches:
-            if switch.kind in kinds or switch.direction in directions:
-                selected_switches.append(switch)
-        return selected_switches
+        class_ids: dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]] = {}
+        kind: scene.target.SwitchKind
+        direction: scene.target.SwitchDirection
+        for kind, direction in itertools.product(scene.target.SwitchKind, scene.target.SwitchDirection):
+            if kind not in kinds and direction not in directions:
+                continue
+            matches: list[int] = [
+                id_
+                for id_, (combo_kind, combo_direction) in enumerate(combinations)
+                if (combo_kind == () and combo_direction == direction)
+                or (combo_direction == () and combo_kind == kind)
+                or (combo_kind == kind and combo_direction == direction)
+            ]
+            if matches:
+                class_ids[(kind, direction)] = (matches[0], matches[-1])
+        return class_ids
 
     @staticmethod
     def __calculate_class_ids(
         switches: list[SwitchYoloLabel],
-        combinations,
+        class_ids: dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]],
     ) -> dict[SwitchYoloLabel, int]:
         """
-        Calculate label class id for given combination of switch attributes.
-        :return: Yolo switches with corresponding class id
+        Look up label class ids of selected switches. Labels are ordered by
+        their first matching combination, then by their order in the scene.
+        :param switches: Switches in yolo format
+        :param class_ids: Lookup table from '__compile_class_ids'
+        :return: Selected yolo switches with corresponding class id
         """
+        matched: list[tuple[int, int, SwitchYoloLabel, int]] = []
+        index: int
+        switch: SwitchYoloLabel
+        for index, switch in enumerate(switches):
+            match: Optional[tuple[int, int]] = class_ids.get((switch.kind, switch.direction))
+            if match is not None:
+                matched.append((match[0], index, switch, match[1]))
+        matched.sort(key=lambda entry: entry[:2])
         id_dict: dict[SwitchYoloLabel, int] = {}
-        combo: list[tuple[scene.target.SwitchKind, scene.target.SwitchDirection]]
-        for id_, combo in enumerate(combinations):
-            kind: scene.target.SwitchKind
-            direction: scene.target.SwitchDirection
-            kind, direction = combo
-            switch: SwitchYoloLabel
-            for switch in switches:
-                # There is no kind attribute
-                if kind == ():
-                    if switch.direction == direction:
-                        id_dict[switch] = id_
-                # There is no direction attribute
-                elif direction == ():
-                    if switch.kind == kind:
-                        id_dict[switch] = id_
-                # There is  at leas one kind and at leas one direction attribute
-                else:
-                    if switch.kind == kind and switch.direction == direction:
-                        id_dict[switch] = id_
+        for _, _, switch, id_ in matched:
+            # Identical labels are written once
+            id_dict.setdefault(switch, id_)
         return id_dict
 
     @staticmethod
@@ -220,31 +257,27 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
     ) -> list[SwitchYoloLabel]:
         """
         Calculate relative yolo-coordinates from absolute RailLabel scene
-        coordinates.
+        coordinates of all switches at once.
         :param resolution: Resolution of the scene image
         :param switches: Switches on the scene
         :return: Switches in relative yolo format
         """
-        yolo_switches: list[SwitchYoloLabel] = []
-        for switch in switches:
-            if len(switch.marks) == 2:
-                center = switch.marks[0].midpoint(switch.marks[1])
-                center_x = center.x / resolution[1]
-                center_y = center.y / resolution[0]
-                width = abs(switch.marks[0].x - switch.marks[1].x) / resolution[1]
-                height = abs(switch.marks[0].y - switch.marks[1].y) / resolution[0]
-
-                label: SwitchYoloLabel
-                label = SwitchYoloLabel(
-                    switch.kind,
-                    switch.direction,
-                    width,
-                    height,
-                    center_x,
-                    center_y,
-                )
-                yolo_switches.append(label)
-        return yolo_switches
+        boxed: list[scene.target.ISwitch] = [switch for switch in switches if len(switch.marks) == 2]
+        if not boxed:
+            return []
+        # Shape (switches, marks, xy)
+        marks: npt.NDArray[np.int64] = np.array(
+            [[mark.point for mark in switch.marks] for switch in boxed], dtype=np.int64
+        )
+        size: npt.NDArray[np.int64] = np.array([resolution[1], resolution[0]])
+        # Pixel centre between both marks, truncated like 'midpoint'
+        centers: npt.NDArray[np.float64] = marks.mean(axis=1).astype(int) / size
+        extents: npt.NDArray[np.float64] = np.abs(marks[:, 0] - marks[:, 1]) / size
+        return [
+            SwitchYoloLabel(switch.kind, switch.direction, width, height, center_x, center_y)
+            for switch, (center_x, center_y), (width, height)
+            in zip(boxed, centers.tolist(), extents.tolist())
+        ]
 
     @staticmethod
     def __save_box_label(
@@ -268,7 +301,7 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
                 file.write(label)
 
     @staticmethod
-    def __save_class_id_text(
+    def _save_class_id_text(
         combinations: tuple[
             tuple[scene.target.SwitchKind, scene.target.SwitchDirection]
         ],
@@ -294,3 +327,54 @@ class SwitchLabelConverterYOLO(ISwitchLabelConverter):
                 else:
                     direction = combo[1].value
                 file.write(f"kind:_{kind},_direction:_{direction}\n")
+
+
+class _BoxSink(export.ManifestSink):
+    """
+    Store the yolo-format labels of a single frame.
+    """
+
+    def __init__(
+        self,
+        converter: SwitchLabelConverterYOLO,
+        output_path: pathlib.Path,
+        combinations: tuple[tuple[scene.target.SwitchKind, scene.target.SwitchDirection]],
+        class_ids: dict[tuple[scene.target.SwitchKind, scene.target.SwitchDirection], tuple[int, int]],
+    ) -> None:
+        """
+        :param converter: Converter calculating the labels
+        :param output_path: Path to store labels
+        :param combinations: Combination of desired switch kinds and directions
+        :param class_ids: Class id lookup table of the converter
+        """
+        super().__init__(output_path, "labels")
+        self._converter: SwitchLabelConverterYOLO = converter
+        self._combinations = combinations
+        self._class_ids = class_ids
+
+    def settings(self) -> list:
+        # Class ids follow from the combinations, widths and colours do not matter
+        return ["yolo", self._combinations]
+
+    def output_names(self, name: str) -> list[str]:
+        return [name + ".txt"]
+
+    def setup(self) -> None:
+        pass
+
+    def write(self, frame: export.ExportFrame) -> None:
+        """
+        Calculate and store yolo-format labels of a frame.
+        :param frame: Scene to write
+        """
+        self._converter._write_scene(
+            frame.name, frame.image.shape[:2], frame.scene, self._output_path, self._class_ids
+        )
+
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Record labels in the manifest and store 'labels.txt'.
+        :param results: Result of 'write' by name of every written scene
+        """
+        super().finish(results)
+        self._converter._save_class_id_text(self._combinations, self._output_path)
@@ -0,0 +1,57 @@
+from typing import Iterable, Optional
+import cv2
+import torch
+import torch.utils.data
+from labels4rails import data
+from labels4rails.utils import config
+from .mask_dataset import MaskDataset
+
+
+class TorchMaskDataset(torch.utils.data.Dataset):
+    """
+    PyTorch dataset of frames and pixelmasks rendered on access, see
+    'MaskDataset'. Runs on the CPU and may be used with 'DataLoader'
+    worker processes. Import it from this module, PyTorch is only required
+    for this adapter.
+    """
+
+    def __init__(
+        self,
+        dataset: data.DataSet,
+        cfg: config.Labels4RailsConfig,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        undistort: bool = False,
+        names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration, selects scenes by tags
+        :param output_size: Width and height of frames and masks, e.g. the
+            training resolution
+        :param scale: Factor from camera to mask resolution, alternative to
+            'output_size'
+        :param undistort: Remove lens distortion from frames and masks
+        :param names: Scenes to use, None for all selected by the
+            configuration
+        """
+        self._scenes: MaskDataset = MaskDataset(dataset, cfg, output_size, scale, undistort, names)
+
+    def __len__(self) -> int:
+        return len(self._scenes)
+
+    def __getitem__(self, index: int) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Frame and pixelmask of a scene.
+        :param index: Index among the selected scenes
+        :return: RGB frame as float tensor in [0, 1] of shape (3, height,
+            width) and mask of class values as uint8 tensor of shape
+            (height, width)
+        """
+        image, mask = self._scenes[index]
+        image_tensor: torch.Tensor = torch.from_numpy(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        return image_tensor.permute(2, 0, 1).float().div(255), torch.from_numpy(mask)
+
+    @property
+    def names(self) -> list[str]:
+        return self._scenes.names
@@ -1 +1 @@
-from .track_label_converter import ITrackLabelConverter, TrackLabelConverterPixelmask
+from .track_label_converter import ITrackLabelConverter, TrackLabelConverterPixelmask, TrackLabelConverterRLE, mask_classes, render_mask
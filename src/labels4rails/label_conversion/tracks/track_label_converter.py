@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 import abc
 from labels4rails import data
 import pathlib
@@ -6,8 +6,17 @@ from labels4rails import scene
 from labels4rails import utils
 from labels4rails.utils import config
 import numpy as np
-from ..TagFilter import TagFilter
+import numpy.typing as npt
 import cv2
+import os
+from .. import export
+from .. import manifest
+from .. import mask_writer
+from .. import rle
+import json
+
+RLE_NAME: str = "masks_rle.json"
+
 
 class ITrackLabelConverter(metaclass=abc.ABCMeta):
     """
@@ -51,12 +60,54 @@ class TrackLabelConverterPixelmask(ITrackLabelConverter):
         self,
         dataset: data.IDataSet,
         cfg: config.Labels4RailsConfig,
+        undistort: bool = False,
+        io_workers: int = 2,
+        workers: int = 1,
+        incremental: bool = True,
+        mask_writer_: Optional[mask_writer.IMaskWriter] = None,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        image_output_path: Optional[pathlib.Path] = None,
+        names: Optional[list[str]] = None,
+        drawer_order: bool = False,
     ) -> None:
         """
         :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration
+        :param undistort: Remove lens distortion from the masks
+        :param io_workers: Threads loading scenes ahead of rendering
+        :param workers: Processes rendering masks, masks are identical for
+            any number of processes
+        :param incremental: Skip masks whose annotation, track
+            configuration and camera did not change since the last export
+        :param mask_writer_: Stores masks, greyscale PNGs by default
+        :param output_size: Width and height of the masks, polygons are
+            scaled before filling
+        :param scale: Factor from camera to mask resolution, alternative to
+            'output_size'
+        :param image_output_path: Path to store the frames resized to the
+            mask resolution, None to not store frames
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        :param drawer_order: Fill polygons like the track drawers, so masks
+            equal drawn ones, see 'scene.OpenCVRasterizer'
         """
+        if output_size is not None and scale is not None:
+            msg: str = "Expected either output size or scale, got both."
+            raise ValueError(msg)
         self._dataset: data.IDataSet = dataset
         self._cfg = cfg
+        self._undistort: bool = undistort
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+        self._incremental: bool = incremental
+        self._mask_writer: mask_writer.IMaskWriter
+        self._mask_writer = mask_writer.OpenCVMaskWriter() if mask_writer_ is None else mask_writer_
+        self._output_size: Optional[tuple[int, int]] = None if output_size is None else tuple(output_size)
+        self._scale: Optional[float] = scale
+        self._image_output_path: Optional[pathlib.Path] = image_output_path
+        self._names: Optional[list[str]] = names
+        self._drawer_order: bool = drawer_order
         self._scene_deserializer: scene.ISceneSerializer
         self._scene_deserializer = scene.DictSceneSerializer()
 
@@ -77,35 +128,481 @@ class TrackLabelConverterPixelmask(ITrackLabelConverter):
         :param output_path: Path to store labels
         :param track_position: List of desired track positions
         """
-        track_position = () if track_position is None else track_position
+        sinks: list[export.IExportSink] = [self.sink(output_path)]
+        if self._image_output_path is not None:
+            sinks.append(
+                export.ImageSink(
+                    self._image_output_path,
+                    self._dataset.camera_cfg,
+                    self._undistort,
+                    self._output_size,
+                    self._scale,
+                )
+            )
+        exporter: export.LabelExporter = export.LabelExporter(
+            self._dataset, self._cfg, self._io_workers, self._workers, self._incremental, self._names
+        )
+        exporter(sinks)
+
+    def sink(self, output_path: pathlib.Path) -> export.IExportSink:
+        """
+        Pixelmask output for a combined export with 'export.LabelExporter'.
+        Frames are not stored, add an 'export.ImageSink' for them.
+        :param output_path: Path to store labels
+        :return: Sink storing the pixelmasks
+        """
+        return _MaskSink(
+            output_path,
+            self._dataset.camera_cfg,
+            self._cfg,
+            self._undistort,
+            self._mask_writer,
+            self._output_size,
+            self._scale,
+            self._drawer_order,
+        )
+
+
+class TrackLabelConverterRLE(ITrackLabelConverter):
+    """
+    Generate run-length encoded masks for tracks, stored as one COCO style
+    JSON file per chunk. Masks are encoded per class value, or per track
+    bed and rail instance, directly from the rasterized polygons.
+    """
+
+    def __init__(
+        self,
+        dataset: data.IDataSet,
+        cfg: config.Labels4RailsConfig,
+        undistort: bool = False,
+        io_workers: int = 2,
+        workers: int = 1,
+        incremental: bool = True,
+        instances: bool = False,
+        names: Optional[list[str]] = None,
+        drawer_order: bool = False,
+    ) -> None:
+        """
+        :param dataset: RailLabel dataset
+        :param cfg: RailLabel configuration
+        :param undistort: Remove lens distortion from the masks
+        :param io_workers: Threads loading scenes ahead of rendering
+        :param workers: Processes rendering masks, the file is identical
+            for any number of processes
+        :param incremental: Keep the masks of scenes whose annotation did
+            not change since the last export
+        :param instances: Encode every track bed and rail on its own instead
+            of one mask per class value
+        :param names: Scenes to export, None for all selected by the
+            configuration
+        :param drawer_order: Fill polygons like the track drawers, so masks
+            equal drawn ones, see 'scene.OpenCVRasterizer'
+        """
+        self._dataset: data.IDataSet = dataset
+        self._cfg = cfg
+        self._undistort: bool = undistort
+        self._io_workers: int = io_workers
+        self._workers: int = workers
+        self._incremental: bool = incremental
+        self._instances: bool = instances
+        self._names: Optional[list[str]] = names
+        self._drawer_order: bool = drawer_order
+
+    def __call__(
+        self,
+        output_path: pathlib.Path,
+        track_position: Optional[list[scene.target.TrackPosition]] = None,
+        separate_rails: Optional[bool] = True,
+    ) -> None:
+        """
+        Store run-length encoded masks of all scenes in 'masks_rle.json' in
+        given path. Read them with 'rle.RleMaskReader'.
+        :param output_path: Path to store labels
+        :param track_position: List of desired track positions
+        """
+        exporter: export.LabelExporter = export.LabelExporter(
+            self._dataset, self._cfg, self._io_workers, self._workers, self._incremental, self._names
+        )
+        exporter([self.sink(output_path)])
+
+    def sink(self, output_path: pathlib.Path) -> export.IExportSink:
+        """
+        Run-length encoded output for a combined export with
+        'export.LabelExporter'.
+        :param output_path: Path to store labels
+        :return: Sink storing the masks of a chunk
+        """
+        return _RleSink(
+            output_path,
+            self._dataset.camera_cfg,
+            self._cfg,
+            self._undistort,
+            self._instances,
+            self._drawer_order,
+        )
+
+
+class _RleSink(export.IExportSink):
+    """
+    Collect the run-length encoded masks of all scenes of a chunk in one
+    COCO style file. Masks of unchanged scenes are taken from the last
+    export.
+    """
+
+    def __init__(
+        self,
+        output_path: pathlib.Path,
+        camera_cfg: data.ICameraReader,
+        cfg: config.Labels4RailsConfig,
+        undistort: bool,
+        instances: bool,
+        drawer_order: bool = False,
+    ) -> None:
+        """
+        :param output_path: Path to store labels
+        :param camera_cfg: Information about camera
+        :param cfg: RailLabel configuration
+        :param undistort: Remove lens distortion from the masks
+        :param instances: Encode every track bed and rail on its own
+        :param drawer_order: Fill polygons like the track drawers
+        """
+        self._path: pathlib.Path = pathlib.Path(output_path) / RLE_NAME
+        self._camera_cfg: data.ICameraReader = camera_cfg
+        self._cfg: config.Labels4RailsConfig = cfg
+        self._undistort: bool = undistort
+        self._instances: bool = instances
+        self._drawer_order: bool = drawer_order
+        self._sources: dict[str, str] = {}
+        # name -> image entry and its annotations
+        self._previous: dict[str, tuple[dict, list[dict]]] = {}
+        self._rasterizer: Optional[scene.IRasterizer] = None
+        self._undistorter: Optional[utils.camera.IUndistorter] = None
+
+    def begin(self, sources: dict[str, str], incremental: bool, scope: str) -> list[str]:
+        """
+        Read masks of the last export.
+        :param sources: Hash of the annotation by name of every scene to
+            export, in dataset order
+        :param incremental: Reuse masks of scenes whose annotation did not
+            change
+        :param scope: Key of the exported chunk
+        :return: Names of the scenes to write
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._sources = sources
+        self._previous = {}
+        if incremental and self._path.is_file():
+            try:
+                with open(self._path) as file_pointer:
+                    content: dict = json.load(file_pointer)
+            except ValueError:
+                content = {}
+            if content.get("settings") == manifest.digest(self._settings()):
+                annotations: dict[int, list[dict]] = {}
+                for annotation in content["annotations"]:
+                    annotations.setdefault(annotation["image_id"], []).append(annotation)
+                image: dict
+                for image in content["images"]:
+                    if sources.get(image["file_name"]) == image.get("source"):
+                        self._previous[image["file_name"]] = (image, annotations.get(image["id"], []))
+        return [name for name in sources if name not in self._previous]
 
-        data_: data.Data
-        scene_drawer_: scene.ISceneDrawer = scene.OpenCVSceneDrawer()
-        camera_: utils.camera.ICamera = utils.camera.Camera(self._dataset[0].camera_cfg)
+    def setup(self) -> None:
+        self._rasterizer = scene.OpenCVRasterizer(self._drawer_order)
+        if self._undistort:
+            self._undistorter = utils.camera.get_undistorter(self._camera_cfg)
 
-        cfg_: config.Labels4RailsConfig = self._cfg
-        draw_options_: list[
-            Union[
-                scene.target.RailDrawOptions,
-                scene.target.TrackBedDrawOptions,
-            ]
+    def write(self, frame: export.ExportFrame) -> tuple[dict, list[dict]]:
+        """
+        Encode the masks of a frame.
+        :param frame: Scene to write
+        :return: Image entry and annotations without ids
+        """
+        resolution: tuple[int, int] = frame.image.shape[:2]
+        image: dict = {"file_name": frame.name, "height": resolution[0], "width": resolution[1]}
+        annotations: list[dict] = []
+        segment: tuple[Optional[str], int, npt.NDArray[np.bool_]]
+        for segment in self._segments(frame.scene, frame.camera, resolution):
+            instance, category, mask = segment
+            if not mask.any():
+                continue
+            annotation: dict = {
+                "category_id": category,
+                "segmentation": rle.encode(mask),
+                "area": int(np.count_nonzero(mask)),
+                "bbox": rle.bounding_box(mask),
+                "iscrowd": 1,
+            }
+            if instance is not None:
+                annotation["instance"] = instance
+            annotations.append(annotation)
+        return image, annotations
+
+    def finish(self, results: dict[str, Any]) -> None:
+        """
+        Store masks of all scenes in dataset order, ids are assigned in
+        this order.
+        :param results: Image entry and annotations by name of every written
+            scene
+        """
+        images: list[dict] = []
+        annotations: list[dict] = []
+        name: str
+        for name, source in self._sources.items():
+            if name in results:
+                image, image_annotations = results[name]
+            elif name in self._previous:
+                image, image_annotations = self._previous[name]
+            else:
+                continue
+            image_id: int = len(images)
+            images.append({**image, "id": image_id, "source": source})
+            for annotation in image_annotations:
+                annotations.append({**annotation, "id": len(annotations), "image_id": image_id})
+        content: dict = {
+            "images": images,
+            "annotations": annotations,
+            "categories": [
+                {"id": value, "name": name}
+                for value, name in sorted(self._category_names(mask_classes(self._cfg.targets.tracks)).items())
+            ],
+            "settings": manifest.digest(self._settings()),
+        }
+        tmp_path: pathlib.Path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as file_pointer:
+            json.dump(content, file_pointer)
+        os.replace(tmp_path, self._path)
+        print(f"Wrote {len(results)} run-length encoded masks, kept {len(self._previous)} unchanged.")
+
+    def _settings(self) -> list:
+        return [
+            "rle",
+            mask_classes(self._cfg.targets.tracks),
+            self._undistort,
+            manifest.camera_digest(self._camera_cfg),
+            self._instances,
+            self._drawer_order,
         ]
-        draw_options_ = [
-            scene.target.RailDrawOptions.FILL,
-            scene.target.TrackBedDrawOptions.FILL,
+
+    def _segments(
+        self,
+        scene_: scene.IScene,
+        camera_: utils.camera.ICamera,
+        resolution: tuple[int, int],
+    ) -> list[tuple[Optional[str], int, npt.NDArray[np.bool_]]]:
+        """
+        Rasterize a scene into binary masks.
+        :param scene_: Scene to rasterize
+        :param camera_: Image to world calculator
+        :param resolution: Image height and width
+        :return: Instance name (None for class masks), class value and mask
+            per segment
+        """
+        if not self._instances:
+            image = render_mask(
+                self._rasterizer, scene_, self._cfg, camera_, resolution, resolution, self._undistorter
+            )
+            return [(None, int(value), image == value) for value in np.unique(image) if value != 0]
+
+        layers: list[scene.MaskLayer] = []
+        if self._cfg.targets.tracks:
+            layers = self._rasterizer.layers(
+                scene_, mask_classes(self._cfg.targets.tracks), camera_, resolution, instances=True
+            )
+        # Layer index + 1 per pixel, later layers cover earlier ones
+        image = np.zeros(resolution, dtype=np.uint16)
+        self._rasterizer.fill(image, layers, list(range(1, len(layers) + 1)))
+        if self._undistorter is not None:
+            image = self._undistorter.undistort_mask(image)
+        # Single-channel masks take the first (blue) component of the colour
+        return [
+            (layer.instance, layer.color[2], image == index)
+            for index, layer in enumerate(layers, 1)
         ]
-        filtered_list = TagFilter(self._dataset._annotations_path, self._cfg).annotationList
-
-        for data_ in self._dataset:
-            if data_.name in filtered_list:
-                scene_: scene.IScene
-                if data_.annotation:
-                    scene_ = self._scene_deserializer.de_serialize(data_.annotation)
-                    resolution: tuple[int, int] = data_.image.shape[:2]
-                    image = np.zeros((resolution[0], resolution[1]), dtype = np.uint8)
-                    scene_drawer_.draw_scene(image, scene_, cfg_, camera_, *draw_options_)
-
-                    mask_path = output_path.joinpath(data_.name + ".png")
-                    cv2.imwrite(str(mask_path), image)
-                else:
-                    print("No mask created for", data_.name, ". No corresponding annotation file found.")
+
+    @staticmethod
+    def _category_names(cfg: config.Tracks) -> dict[int, str]:
+        """
+        Names of the class values, classes sharing a value are named after
+        the first one. Like the rasterizer, the left rail takes the value of
+        the right rail configuration and vice versa.
+        :param cfg: Configuration data class with class values as fill
+            colours, see 'mask_classes'
+        :return: Name by class value
+        """
+        names: dict[int, str] = {}
+        for position in ("ego", "left", "right"):
+            cfg_track: config.Track = getattr(cfg, position)
+            for element, cfg_element in (
+                ("track_bed", "track_bed"),
+                ("left_rail", "right_rail"),
+                ("right_rail", "left_rail"),
+            ):
+                value: int = getattr(cfg_track, cfg_element).fill_color[2]
+                names.setdefault(int(value), f"{position}_{element}")
+        return names
+
+
+class _MaskSink(export.ManifestSink):
+    """
+    Render and store the pixelmask of a single frame. Rasterizer and
+    undistorter are built once per process.
+    """
+
+    def __init__(
+        self,
+        output_path: pathlib.Path,
+        camera_cfg: data.ICameraReader,
+        cfg: config.Labels4RailsConfig,
+        undistort: bool,
+        mask_writer_: mask_writer.IMaskWriter,
+        output_size: Optional[tuple[int, int]] = None,
+        scale: Optional[float] = None,
+        drawer_order: bool = False,
+    ) -> None:
+        """
+        :param output_path: Path to store labels
+        :param camera_cfg: Information about camera
+        :param cfg: RailLabel configuration
+        :param undistort: Remove lens distortion from the masks
+        :param mask_writer_: Stores masks
+        :param output_size: Width and height of the masks
+        :param scale: Factor from camera to mask resolution
+        :param drawer_order: Fill polygons like the track drawers
+        """
+        super().__init__(output_path, "masks")
+        self._camera_cfg: data.ICameraReader = camera_cfg
+        self._cfg: config.Labels4RailsConfig = cfg
+        self._undistort: bool = undistort
+        self._mask_writer: mask_writer.IMaskWriter = mask_writer_
+        self._output_size: Optional[tuple[int, int]] = output_size
+        self._scale: Optional[float] = scale
+        self._drawer_order: bool = drawer_order
+        self._rasterizer: Optional[scene.IRasterizer] = None
+        self._undistorter: Optional[utils.camera.IUndistorter] = None
+
+    def settings(self) -> list:
+        return [
+            "pixelmask",
+            mask_classes(self._cfg.targets.tracks),
+            self._undistort,
+            manifest.camera_digest(self._camera_cfg),
+            type(self._mask_writer).__name__,
+            vars(self._mask_writer),
+            self._output_size,
+            self._scale,
+            self._drawer_order,
+        ]
+
+    def output_names(self, name: str) -> list[str]:
+        return [name + ".png"]
+
+    def setup(self) -> None:
+        self._rasterizer = scene.OpenCVRasterizer(self._drawer_order)
+        if self._undistort:
+            self._undistorter = utils.camera.get_undistorter(self._camera_cfg)
+
+    def write(self, frame: export.ExportFrame) -> None:
+        """
+        Render and store pixelmask of a frame.
+        :param frame: Scene to write
+        """
+        resolution: tuple[int, int] = frame.image.shape[:2]
+        target: tuple[int, int] = export.output_resolution(resolution, self._output_size, self._scale)
+        image = render_mask(
+            self._rasterizer, frame.scene, self._cfg, frame.camera, resolution, target, self._undistorter
+        )
+
+        mask_path = self._output_path.joinpath(frame.name + ".png")
+        self._mask_writer.write(mask_path, image)
+
+
+def mask_classes(cfg: config.Tracks) -> config.Tracks:
+    """
+    Track configuration filling every track bed and rail with its class
+    value. Masks take the 'export_mask_color' of an element, elements
+    without one keep their fill colour. Only what masks depend on is
+    copied, the configuration itself keeps its colours for drawing.
+    :param cfg: Configuration data class
+    :return: Configuration data class with class values as fill colours
+    """
+
+    def track_bed(cfg_bed: config.TrackBed) -> config.TrackBed:
+        return config.TrackBed(
+            cfg_bed.export_mask_color, _class_color(cfg_bed), None, cfg_bed.interpolation_steps
+        )
+
+    def rail(cfg_rail: config.Rail) -> config.Rail:
+        return config.Rail(
+            cfg_rail.export_mask_color, None, None, None, _class_color(cfg_rail), cfg_rail.interpolation_steps
+        )
+
+    def track(cfg_track: Optional[config.Track]) -> Optional[config.Track]:
+        if cfg_track is None:
+            return None
+        return config.Track(
+            None,
+            None,
+            None,
+            None,
+            track_bed(cfg_track.track_bed),
+            rail(cfg_track.left_rail),
+            rail(cfg_track.right_rail),
+        )
+
+    drawing_order = getattr(cfg, "drawing_order", None)
+    return config.Tracks(
+        track(cfg.ego),
+        track(cfg.left),
+        track(cfg.right),
+        None if drawing_order is None else tuple(tuple(step) for step in drawing_order),
+        track(getattr(cfg, "selected", None)),
+    )
+
+
+def _class_color(cfg_element) -> list[int]:
+    """
+    :param cfg_element: Track bed or rail configuration
+    :return: Class value as colour, the fill colour without one
+    """
+    value: Optional[int] = getattr(cfg_element, "export_mask_color", None)
+    if value is None:
+        return list(cfg_element.fill_color)
+    return [value, value, value]
+
+
+def render_mask(
+    rasterizer: scene.IRasterizer,
+    scene_: scene.IScene,
+    cfg: config.Labels4RailsConfig,
+    camera: utils.camera.ICamera,
+    resolution: tuple[int, int],
+    target: tuple[int, int],
+    undistorter: Optional[utils.camera.IUndistorter] = None,
+) -> npt.NDArray[np.uint8]:
+    """
+    Render the pixelmask of a scene like the PNG export.
+    :param rasterizer: Draws track beds and rails
+    :param scene_: Scene to render
+    :param cfg: RailLabel configuration
+    :param camera: Image to world calculator
+    :param resolution: Height and width of the camera image
+    :param target: Height and width of the mask
+    :param undistorter: Removes lens distortion, None to keep it
+    :return: Mask of class values, see 'mask_classes'
+    """
+    layers: list[scene.MaskLayer] = []
+    if cfg.targets.tracks:
+        layers = rasterizer.layers(scene_, mask_classes(cfg.targets.tracks), camera, resolution)
+    if undistorter is None:
+        mask: npt.NDArray[np.uint8] = np.zeros(target, dtype=np.uint8)
+        scale: tuple[float, float] = (target[1] / resolution[1], target[0] / resolution[0])
+        rasterizer.fill(mask, layers, scale=scale)
+        return mask
+    # Undistortion maps are calculated for the camera resolution
+    mask = np.zeros((resolution[0], resolution[1]), dtype=np.uint8)
+    rasterizer.fill(mask, layers)
+    mask = undistorter.undistort_mask(mask)
+    if target != resolution:
+        mask = cv2.resize(mask, target[::-1], interpolation=cv2.INTER_NEAREST)
+    return mask
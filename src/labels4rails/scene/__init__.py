@@ -2,3 +2,4 @@ from . import target
 from .scene import IScene, Scene
 from .serializer import ISceneSerializer, DictSceneSerializer
 from .drawer import ISceneDrawer, OpenCVSceneDrawer, QtSceneDrawer
+from .rasterizer import IRasterizer, OpenCVRasterizer, MaskLayer
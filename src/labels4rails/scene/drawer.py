@@ -167,8 +167,12 @@ class QtSceneDrawer(ISceneDrawer):
     """
 
     def __init__(self) -> None:
-        self._track_drawer: target.ITrackDrawer = target.track.drawer.QtTrackDrawer()
-        self._switch_drawer: target.ISwitchDrawer = target.switch.draw.QtSwitchDrawer()
+        # Qt is only imported when drawing into the GUI, exports run without.
+        from .target.track.qt_drawer import QtTrackDrawer
+        from .target.switch.qt_draw import QtSwitchDrawer
+
+        self._track_drawer: target.ITrackDrawer = QtTrackDrawer()
+        self._switch_drawer: target.ISwitchDrawer = QtSwitchDrawer()
 
     def draw_scene(
         self,
@@ -0,0 +1,410 @@
+from typing import Optional
+import abc
+import dataclasses
+from .scene import IScene
+from labels4rails.utils import camera, config, geometry
+from . import target
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+# Fractional bits of scaled polygon vertices
+_SUBPIXEL_BITS = 4
+
+
+@dataclasses.dataclass
+class MaskLayer:
+    """
+    Polygons filled with the same colour at one step of the drawing order.
+    """
+
+    color: tuple[int, int, int]  # RGB
+    contours: list[npt.NDArray[np.int32]]
+    # Set for layers of single track beds and rails
+    instance: Optional[str] = None  # '<track id>/<element>'
+    position: Optional[str] = None  # 'ego', 'left' or 'right'
+    element: Optional[str] = None  # 'track_bed', 'left_rail' or 'right_rail'
+
+
+class IRasterizer(metaclass=abc.ABCMeta):
+    """
+    Rasterize filled scene polygons, e.g. into label masks.
+    """
+
+    @abc.abstractmethod
+    def layers(
+        self,
+        scene: IScene,
+        cfg: config.Tracks,
+        camera_: camera.ICamera,
+        resolution: tuple[int, int],
+        instances: bool = False,
+    ) -> list[MaskLayer]:
+        """
+        Collect polygons of all tracks per layer in drawing order.
+        :param scene: IScene object
+        :param cfg: Configuration data class
+        :param camera_: Image to world calculator
+        :param resolution: Image height and width
+        :param instances: One layer per track bed and rail instead of
+            merging polygons of the same colour
+        :return: Layers, later layers cover earlier ones
+        """
+        pass
+
+    @abc.abstractmethod
+    def fill(
+        self,
+        image: npt.NDArray,
+        layers: list[MaskLayer],
+        values: Optional[list[int]] = None,
+        scale: Optional[tuple[float, float]] = None,
+    ) -> npt.NDArray:
+        """
+        Fill layers in order.
+        :param image: Image to draw on
+        :param layers: Layers, later layers cover earlier ones
+        :param values: Value per layer for single-channel images, None to
+            fill with the layer colours
+        :param scale: Horizontal and vertical factor from layer coordinates
+            to image coordinates, None if they match
+        :return: Image with filled polygons
+        """
+        pass
+
+    @abc.abstractmethod
+    def rasterize(
+        self,
+        image: npt.NDArray[np.uint8],
+        scene: IScene,
+        cfg: config.Labels4RailsConfig,
+        camera_: camera.ICamera,
+        resolution: Optional[tuple[int, int]] = None,
+    ) -> npt.NDArray[np.uint8]:
+        """
+        Fill all track polygons of a scene.
+        :param image: Image to draw on
+        :param scene: IScene object
+        :param cfg: Configuration data set
+        :param camera_: Image to world calculator
+        :param resolution: Height and width of the camera image the scene
+            was annotated on, None if it matches the image to draw on.
+            Polygons are scaled to the image to draw on.
+        :return: Image with filled polygons
+        """
+        pass
+
+
+class OpenCVRasterizer(IRasterizer):
+    """
+    Rasterize with one cv2.fillPoly call per colour and drawing_order step,
+    which also fills curved, non-convex track beds correctly. Contours of a
+    rail are calculated once and shared by the rail and the track bed
+    polygons.
+    """
+
+    def __init__(self, drawer_order: bool = False) -> None:
+        """
+        :param drawer_order: Fill polygon by polygon with cv2.fillConvexPoly
+            in the order of the track drawers, so masks equal drawn ones
+            (including their artefacts on non-convex polygons)
+        """
+        self._drawer_order: bool = drawer_order
+
+    def layers(
+        self,
+        scene: IScene,
+        cfg: config.Tracks,
+        camera_: camera.ICamera,
+        resolution: tuple[int, int],
+        instances: bool = False,
+    ) -> list[MaskLayer]:
+        """
+        Collect polygons of all tracks per layer in drawing order.
+        :param scene: IScene object
+        :param cfg: Configuration data class
+        :param camera_: Image to world calculator
+        :param resolution: Image height and width
+        :param instances: One layer per track bed and rail instead of
+            merging polygons of the same colour
+        :return: Layers, later layers cover earlier ones
+        """
+        tracks: list[target.ITrack] = list(scene.tracks.values())
+        # Polygons of the same colour share a layer within a step
+        steps: list[list[tuple[target.ITrack, str]]]
+        if "drawing_order" in dir(cfg) and cfg.drawing_order is not None:
+            steps = [
+                [(track, element) for track in tracks if track.position == position]
+                for position, element in cfg.drawing_order
+            ]
+        else:
+            steps = [[(track, "rails") for track in tracks], [(track, "track_bed") for track in tracks]]
+        if self._drawer_order:
+            # Same order as 'OpenCVSceneDrawer.draw_tracks', one step per polygon
+            if "drawing_order" not in dir(cfg) or cfg.drawing_order is None:
+                steps = [[(track, "rails"), (track, "track_bed")] for track in tracks]
+            steps = [[item] for step in steps for item in step]
+
+        contours: dict[int, tuple[list, list, list, list]] = {}
+        layers: list[MaskLayer] = []
+        step: list[tuple[target.ITrack, str]]
+        for step in steps:
+            # Drawn polygon by polygon, a polygon may only join the last layer
+            start: Optional[int] = None if self._drawer_order else max(len(layers) - 1, 0)
+            track: target.ITrack
+            element: str
+            for track, element in step:
+                cfg_track: config.Track = self._track_config(track, cfg)
+                if id(track) not in contours:
+                    contours[id(track)] = self._rail_contours(track, cfg_track, camera_)
+                left_rail, right_rail, bed_left, bed_right = contours[id(track)]
+                track_key: Optional[tuple[str, str]] = None
+                if instances:
+                    track_key = (str(track.id), target.TrackPosition(track.position).value)
+                if element == "rails":
+                    # Like 'OpenCVTrackDrawer.draw_rails', the right rail is
+                    # drawn first and with the configuration of the left rail
+                    self._add(layers, start, cfg_track.left_rail.fill_color, right_rail, track_key, "right_rail")
+                    self._add(layers, start, cfg_track.right_rail.fill_color, left_rail, track_key, "left_rail")
+                elif element == "track_bed":
+                    self._add(
+                        layers,
+                        start,
+                        cfg_track.track_bed.fill_color,
+                        self._track_bed_contour(bed_left, bed_right, resolution),
+                        track_key,
+                        "track_bed",
+                    )
+        return layers
+
+    def fill(
+        self,
+        image: npt.NDArray,
+        layers: list[MaskLayer],
+        values: Optional[list[int]] = None,
+        scale: Optional[tuple[float, float]] = None,
+    ) -> npt.NDArray:
+        """
+        Fill layers in order.
+        :param image: Image to draw on
+        :param layers: Layers, later layers cover earlier ones
+        :param values: Value per layer for single-channel images, None to
+            fill with the layer colours
+        :param scale: Horizontal and vertical factor from layer coordinates
+            to image coordinates, None if they match
+        :return: Image with filled polygons
+        """
+        shift: int = 0
+        factor: Optional[npt.NDArray[np.float64]] = None
+        if scale is not None and tuple(scale) != (1, 1):
+            # Scaled vertices keep sub-pixel precision as fixed point numbers
+            shift = _SUBPIXEL_BITS
+            factor = np.array(scale, dtype=np.float64) * (1 << shift)
+        index: int
+        layer: MaskLayer
+        for index, layer in enumerate(layers):
+            color: list[int]
+            if values is not None:
+                color = [values[index]] * 3
+            else:
+                # Opencv has BGR order
+                color = [layer.color[i] for i in [2, 1, 0]]
+            contours: list[npt.NDArray[np.int32]] = layer.contours
+            if factor is not None:
+                # Pixel centres of the source map onto pixel centres of the image
+                contours = [
+                    np.round((contour + 0.5) * factor - (1 << (shift - 1))).astype(np.int32)
+                    for contour in contours
+                ]
+            if self._drawer_order:
+                for contour in contours:
+                    cv2.fillConvexPoly(image, contour, color=color, shift=shift)
+                continue
+            # fillPoly uses the even-odd rule, overlapping polygons must not
+            # share a call.
+            for polygons in self._disjoint_groups(contours):
+                cv2.fillPoly(image, polygons, color=color, shift=shift)
+        return image
+
+    def rasterize(
+        self,
+        image: npt.NDArray[np.uint8],
+        scene: IScene,
+        cfg: config.Labels4RailsConfig,
+        camera_: camera.ICamera,
+        resolution: Optional[tuple[int, int]] = None,
+    ) -> npt.NDArray[np.uint8]:
+        """
+        Fill all track polygons of a scene.
+        :param image: Image to draw on
+        :param scene: IScene object
+        :param cfg: Configuration data set
+        :param camera_: Image to world calculator
+        :param resolution: Height and width of the camera image the scene
+            was annotated on, None if it matches the image to draw on.
+            Polygons are scaled to the image to draw on.
+        :return: Image with filled polygons
+        """
+        if not cfg.targets.tracks:
+            return image
+        resolution = image.shape[:2] if resolution is None else tuple(resolution)
+        scale: tuple[float, float] = (
+            image.shape[1] / resolution[1],
+            image.shape[0] / resolution[0],
+        )
+        return self.fill(image, self.layers(scene, cfg.targets.tracks, camera_, resolution), scale=scale)
+
+    @staticmethod
+    def _track_config(track: target.ITrack, cfg: config.Tracks) -> config.Track:
+        """
+        Configuration of a track depending on position and selection.
+        :param track: Track object
+        :param cfg: Configuration data class
+        :return: Track configuration
+        """
+        if track.selected:
+            return cfg.selected
+        if track.position == target.TrackPosition.EGO:
+            return cfg.ego
+        if track.position == target.TrackPosition.LEFT:
+            return cfg.left
+        if track.position == target.TrackPosition.RIGHT:
+            return cfg.right
+        raise ValueError("Expected valid TrackPosition.")
+
+    @staticmethod
+    def _rail_contours(
+        track: target.ITrack,
+        cfg: config.Track,
+        camera_: camera.ICamera,
+    ) -> tuple[list, list, list, list]:
+        """
+        Contours of both rails and the inner rail sides bordering the track
+        bed. Inner sides are shared unless the track bed is interpolated
+        with different steps. Like 'OpenCVTrackDrawer.draw_rails', the left
+        rail is interpolated with the steps of the right rail configuration
+        and vice versa.
+        :param track: Track object
+        :param cfg: Configuration data class
+        :param camera_: Image to world calculator
+        :return: Left rail, right rail, right side of the left rail and left
+            side of the right rail
+        """
+        left_steps: int = cfg.right_rail.interpolation_steps
+        right_steps: int = cfg.left_rail.interpolation_steps
+        bed_steps: int = cfg.track_bed.interpolation_steps
+        left_rail_left = track.left_rail.contour_points_splines_left(camera_, left_steps)
+        left_rail_right = track.left_rail.contour_points_splines_right(camera_, left_steps)
+        right_rail_left = track.right_rail.contour_points_splines_left(camera_, right_steps)
+        right_rail_right = track.right_rail.contour_points_splines_right(camera_, right_steps)
+
+        bed_left = left_rail_right
+        if bed_steps != left_steps:
+            bed_left = track.left_rail.contour_points_splines_right(camera_, bed_steps)
+        bed_right = right_rail_left
+        if bed_steps != right_steps:
+            bed_right = track.right_rail.contour_points_splines_left(camera_, bed_steps)
+        return (
+            [*left_rail_left, *left_rail_right[::-1]],
+            [*right_rail_left, *right_rail_right[::-1]],
+            bed_left,
+            bed_right,
+        )
+
+    @staticmethod
+    def _track_bed_contour(
+        left_rail_right: list[geometry.IImagePoint],
+        right_rail_left: list[geometry.IImagePoint],
+        resolution: tuple[int, int],
+    ) -> list[geometry.IImagePoint]:
+        """
+        Contour between the rails, closed along the image border where the
+        track leaves the image at the bottom and a side.
+        :param left_rail_right: Right side of the left rail
+        :param right_rail_left: Left side of the right rail
+        :param resolution: Image height and width
+        :return: Points describing track bed contour
+        """
+        height, width = resolution
+        contour_points: list[geometry.IImagePoint] = [
+            *sorted(left_rail_right, reverse=False),
+            *sorted(right_rail_left, reverse=True),
+        ]
+        if len(contour_points) > 0:
+            if contour_points[0].pointAtImageBottom(height) and contour_points[-1].pointAtImageSide(width):
+                if contour_points[-1].pointAtImageLeftSide():
+                    contour_points.append(geometry.ImagePoint(0, height))
+                else:
+                    contour_points.append(geometry.ImagePoint(width, height))
+            elif contour_points[-1].pointAtImageBottom(height) and contour_points[0].pointAtImageSide(width):
+                if contour_points[0].pointAtImageLeftSide():
+                    contour_points.append(geometry.ImagePoint(0, height))
+                else:
+                    contour_points.append(geometry.ImagePoint(width, height))
+        return contour_points
+
+    @staticmethod
+    def _add(
+        layers: list[MaskLayer],
+        start: Optional[int],
+        color: tuple[int, int, int],
+        contour_points: list[geometry.IImagePoint],
+        track_key: Optional[tuple[str, str]] = None,
+        element: Optional[str] = None,
+    ) -> None:
+        """
+        Add polygon to the layer of its colour and instance since 'start',
+        otherwise start a new layer.
+        :param layers: Layers in drawing order
+        :param start: Index of the first layer the polygon may join, None
+            for the last one only
+        :param color: Fill colour
+        :param contour_points: Points describing the polygon
+        :param track_key: Id and position of the track, None to merge
+            instances of the same colour
+        :param element: Track bed or rail the polygon belongs to
+        """
+        if not contour_points:
+            return
+        contour: npt.NDArray[np.int32]
+        contour = np.array([point.point for point in contour_points], dtype=np.int32)
+        color = tuple(color)
+        instance: Optional[str] = None
+        position: Optional[str] = None
+        if track_key is not None:
+            instance, position = f"{track_key[0]}/{element}", track_key[1]
+        else:
+            element = None
+        layer: MaskLayer
+        for layer in layers[-1:] if start is None else layers[start:]:
+            if layer.color == color and layer.instance == instance:
+                layer.contours.append(contour)
+                return
+        layers.append(MaskLayer(color, [contour], instance, position, element))
+
+    @staticmethod
+    def _disjoint_groups(
+        contours: list[npt.NDArray[np.int32]],
+    ) -> list[list[npt.NDArray[np.int32]]]:
+        """
+        Split polygons into groups without overlapping bounding boxes, in
+        general a single group.
+        :param contours: Polygons
+        :return: Groups of polygons
+        """
+        groups: list[list[npt.NDArray[np.int32]]] = []
+        group_boxes: list[list[npt.NDArray[np.int32]]] = []
+        for contour in contours:
+            box = np.concatenate((contour.min(axis=0), contour.max(axis=0)))
+            for group, boxes in zip(groups, group_boxes):
+                if not any(
+                    box[0] <= other[2] and other[0] <= box[2] and box[1] <= other[3] and other[1] <= box[3]
+                    for other in boxes
+                ):
+                    group.append(contour)
+                    boxes.append(box)
+                    break
+            else:
+                groups.append([contour])
+                group_boxes.append([box])
+        return groups
@@ -4,6 +4,7 @@ from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QListView, QTreeView, QAbstractItemView, QMessageBox, QFileDialog, QTreeWidgetItem
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from labels4rails import data
 from labels4rails.segmentation.filter_gui_init import Ui_MainWindow
 from labels4rails.segmentation.json_helpers import load_dict_from_json, dump_dict_to_json
 # from filter_gui_init import Ui_MainWindow
@@ -11,42 +12,63 @@ from labels4rails.segmentation.json_helpers import load_dict_from_json, dump_dic
 
 json_name = 'user_tags_for_filtering.json'
 
+def annotation_tags(annotation):
+    """
+    Tags of all tag groups of an annotation.
+
+    :param annotation: Annotation of a scene
+    :return: Sorted tags without duplicates
+    """
+    result = []
+    for tags in annotation['tag groups'].values():
+        result += tags
+    return sorted(set(result))
+
+def is_selected(tags, user_tags):
+    """
+    Filter predicate: a scene is selected if it has at least one of the
+    included tags and none of the excluded tags.
+
+    :param tags: Tags of the scene
+    :param user_tags: Dictionary with 'included' and 'excluded' tags
+    :return: True if the scene passes the filter
+    """
+    tags = set(tags)
+    return bool(tags & set(user_tags['included'])) and not tags & set(user_tags['excluded'])
+
+def select_image_names(input_folder):
+    """
+    Names of the scenes of a chunk passing the saved filter settings. Only
+    the tag groups of the annotations are evaluated, images are not read,
+    so masks are rendered for the selected scenes only.
+
+    :param input_folder: Chunk containing the annotations
+    :return: Names of the selected scenes
+    """
+    user_tags = load_dict_from_json(json_name)['user_tags']
+    index = data.TagIndex(os.path.join(input_folder, 'annotations'))
+    included = 0
+    for tag in user_tags['included']:
+        included |= index.bits(tag)
+    excluded = 0
+    for tag in user_tags['excluded']:
+        excluded |= index.bits(tag)
+    return index.names_of(included & ~excluded)
+
 def apply_filter_settings(input_folder, output_folder):
     json_file_data = load_dict_from_json(json_name)
     image_tags = json_file_data['input_image_tags']
     user_tags = json_file_data['user_tags']
-    input_stats = json_file_data['input_stats']
-    # print(input_stats)
     for fname in sorted(os.listdir(output_folder)):
         seg_path = os.path.join(output_folder, fname)
         image_name = fname.split('.png')[0]
         # get image tags
-        if image_name not in image_tags.keys(): break
-        current_image_tags = image_tags[image_name]
-        delete = True # delete flag for deleting undesireable masks at the end of the loop
-        # do not delete if not included by user
-        for tag in user_tags['included']:
-            if tag in current_image_tags:
-                # print(f'found {tag} in {current_image_tags}')
-                delete = False
-                break
-        # delete if excluded by user
-        for tag in user_tags['excluded']:
-            if tag in current_image_tags:
-                # print(f'found {tag} in {current_image_tags}')
-                delete = True
-                break
-        if delete:
-            # print(f'removing {seg_path}')
+        if image_name not in image_tags.keys(): continue
+        if not is_selected(image_tags[image_name], user_tags):
             os.remove(seg_path)
 
 def load_annotation_file(json_fname):
-    result = []
-    tags = load_dict_from_json(json_fname)['tag groups']
-    for k in tags.keys():
-        result += tags[k]
-    result = sorted(list(set(result)) )# remove duplicates
-    return result
+    return annotation_tags(load_dict_from_json(json_fname))
 
 class FilterGui(QtWidgets.QMainWindow):
     def __init__(self, input_folder_list, parent=None):
@@ -91,13 +113,9 @@ class FilterGui(QtWidgets.QMainWindow):
     def load_input_data(self):
         self.input_image_tags = {}
         for folder in self.input_folder_list:
-            annotation_folder = os.path.join(folder, 'annotations')
-            annotation_list = sorted([file for file in os.listdir(annotation_folder) if file.endswith(".json")])
-            # print(f'length of annotation file list in folder "{folder}" = {len(annotation_list)}')
-            for annotation_file in annotation_list:
-                image_name = os.path.splitext(annotation_file)[0]
-                tag_list = load_annotation_file(os.path.join(annotation_folder,annotation_file))
-                self.input_image_tags[image_name] = tag_list
+            index = data.TagIndex(os.path.join(folder, 'annotations'))
+            for image_name in index.names:
+                self.input_image_tags[image_name] = annotation_tags({'tag groups': index.tags_of(image_name)})
         # print(f'total images loaded during input data : {len(self.input_image_tags)}')
         self.populate_input_stats()
         
@@ -117,15 +135,10 @@ class FilterGui(QtWidgets.QMainWindow):
         self.output_image_list = []
         
         user_selections = self.get_user_selection_tags()
-        included_set = set(user_selections['included'])
-        excluded_set = set(user_selections['excluded'])
         
         for image_name, tag_list in self.input_image_tags.items():
-            # check if any of the tag is in the included or excluded list? (using set intersection)
-            tag_needs_2b_included = bool(set(tag_list) & included_set)
-            tag_needs_2b_excluded = bool(set(tag_list) & excluded_set)
             # include image in output list if fulfils criteria
-            if tag_needs_2b_included and not tag_needs_2b_excluded:
+            if is_selected(tag_list, user_selections):
                 self.output_image_list.append(image_name)
             
         self.populate_output_stats()
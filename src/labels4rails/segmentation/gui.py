@@ -6,7 +6,7 @@ from PyQt5.QtCore import QThread, pyqtSignal
 
 from labels4rails.segmentation.gui_init import Ui_SegmentationMainWindow
 from labels4rails.segmentation.raillabel2pixelmask import main as generate_segmentation_masks
-from labels4rails.segmentation.filter_gui import FilterGui, apply_filter_settings
+from labels4rails.segmentation.filter_gui import FilterGui, select_image_names
 
 class GenerateSegmentationThread(QThread):
     progress_updated = pyqtSignal(int)  # Signal to update progress bar
@@ -20,8 +20,9 @@ class GenerateSegmentationThread(QThread):
         total = len(self.input_folders)
         for i, input_folder in enumerate(self.input_folders):
             print(input_folder, self.output_folder)
-            generate_segmentation_masks([input_folder], self.output_folder, None)
-            apply_filter_settings(input_folder, self.output_folder)
+            # Filter on the annotation tags first, only selected scenes are rendered
+            names = select_image_names(input_folder)
+            generate_segmentation_masks([input_folder], self.output_folder, names=names)
             progress = int((i + 1) * 100 / total)
             self.progress_updated.emit(progress)  # Emit progress for each step
 
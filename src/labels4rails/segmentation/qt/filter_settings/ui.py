@@ -7,29 +7,7 @@ from PyQt5.QtCore import QThread, pyqtSignal
 from labels4rails.segmentation.qt.filter_settings.ui_init import Ui_MainWindow
 from labels4rails.segmentation.qt.output_data.ui import Ui as NextWindow
 from labels4rails.segmentation.json_helpers import load_dict_from_json, dump_dict_to_json
-
-def load_annotation_file(json_fname):
-    anno_data = load_dict_from_json(json_fname)
-
-    count = { 'tracks' : 0, 'switches' : 0}
-    if anno_data['tracks'].keys(): count['tracks'] = len(anno_data['tracks'].keys())
-    if anno_data['switches'].keys(): count['switches'] = len(anno_data['switches'].keys())
-
-    tag_list = []
-    for k, v in anno_data['tag groups'].items():
-        tag_list += v
-        if 'unknown' in tag_list: tag_list[tag_list.index('unknown')] = k + '_unknown'
-
-    for k, v in anno_data['switches'].items():
-        tag_list += ['switch_' + v['direction']]
-        tag_list += [v['kind']]
-        
-    for k, v in anno_data['tracks'].items():
-        tag_list += [v['relative position']]
-        
-    tag_list = sorted(list(set(tag_list)))
-        
-    return tag_list, count
+from labels4rails.segmentation.scene_tags import load_scene_tags
 
 class Ui(QtWidgets.QMainWindow):
     def __init__(self, data_dict, previous_window=None, parent=None):
@@ -91,12 +69,9 @@ class Ui(QtWidgets.QMainWindow):
             'switches' : self.ui.spinBox_switches.value()
         }
         for folder in self.data_dict['selected_input_folders']:
-            annotation_folder = os.path.join(folder, 'annotations')
-            annotation_list = sorted([file for file in os.listdir(annotation_folder) if file.endswith(".json")])
-            # print(f'length of annotation file list in folder "{folder}" = {len(annotation_list)}')
-            for annotation_file in annotation_list:
-                image_name = os.path.splitext(annotation_file)[0]
-                tag_list, count = load_annotation_file(os.path.join(annotation_folder,annotation_file))
+            # Annotation directories and packs, only changed annotations are read
+            scenes = load_scene_tags(os.path.join(folder, 'annotations'))
+            for image_name, (tag_list, count) in scenes.items():
                 # print(count, end=' ')
                 if self.count_check(count):
                     self.input_image_tags[image_name] = tag_list
@@ -7,25 +7,7 @@ from PyQt5.QtCore import QThread, pyqtSignal
 from labels4rails.segmentation.qt.filter_settings.ui_init import Ui_MainWindow
 from labels4rails.segmentation.qt.output_data.ui import Ui as NextWindow
 from labels4rails.segmentation.json_helpers import load_dict_from_json, dump_dict_to_json
-
-def load_annotation_file(json_fname):
-    anno_data = load_dict_from_json(json_fname)
-
-    result = []
-    for k, v in anno_data['tag groups'].items():
-        result += v
-        if 'unknown' in result: result[result.index('unknown')] = k + '_unknown'
-
-    for k, v in anno_data['switches'].items():
-        result += ['switch_' + v['direction']]
-        result += [v['kind']]
-        
-    for k, v in anno_data['tracks'].items():
-        result += [v['relative position']]
-        
-    result = sorted(list(set(result)))
-        
-    return result
+from labels4rails.segmentation.scene_tags import load_scene_tags
 
 class Ui(QtWidgets.QMainWindow):
     def __init__(self, data_dict, previous_window=None, parent=None):
@@ -77,12 +59,9 @@ class Ui(QtWidgets.QMainWindow):
     def load_input_data(self):
         self.input_image_tags = {}
         for folder in self.data_dict['selected_input_folders']:
-            annotation_folder = os.path.join(folder, 'annotations')
-            annotation_list = sorted([file for file in os.listdir(annotation_folder) if file.endswith(".json")])
-            # print(f'length of annotation file list in folder "{folder}" = {len(annotation_list)}')
-            for annotation_file in annotation_list:
-                image_name = os.path.splitext(annotation_file)[0]
-                tag_list = load_annotation_file(os.path.join(annotation_folder,annotation_file))
+            # Annotation directories and packs, only changed annotations are read
+            scenes = load_scene_tags(os.path.join(folder, 'annotations'))
+            for image_name, (tag_list, count) in scenes.items():
                 self.input_image_tags[image_name] = tag_list
         # print(f'total images loaded during input data : {len(self.input_image_tags)}')
         self.populate_input_stats()
@@ -14,7 +14,7 @@ seg_folder_name = 'segmentation'
 yolo_folder_name = 'yolo'
 
 
-# for segmentation mask generation and applying filter settings
+# for segmentation mask generation of the scenes selected by the filter settings
 class GenerateSegmentationThread(QThread):
     progress_updated = pyqtSignal(int)  # Signal to update progress bar
 
@@ -44,31 +44,24 @@ class GenerateSegmentationThread(QThread):
             
             if self.generate_segmentation_check:
                 self.ui.label_ProgressBar.setText(f'Generating segmentation masks for {input_folder_name}')
-                generate_segmentation_masks([input_folder], self.segmentation_output_path, self.track_segmentation, None)
+                generate_segmentation_masks(
+                    [input_folder],
+                    self.segmentation_output_path,
+                    self.track_segmentation,
+                    None,
+                    self.data_dict['output_images_list'],
+                )
             
             progress += progress_increment
             self.progress_updated.emit(progress)  # Emit progress for each step
             
             if self.generate_switch_bounding_box_check:
                 self.ui.label_ProgressBar.setText(f'Generating yolo bounding boxes for {input_folder_name}')
-                generate_yolo_masks(input_folder, self.yolo_output_path, None)
+                generate_yolo_masks(input_folder, self.yolo_output_path, None, self.data_dict['output_images_list'])
             
             progress += progress_increment
             self.progress_updated.emit(progress)  # Emit progress for each step
-            
-        self.ui.label_ProgressBar.setText(f'Applying filter settings {input_folder_name} ...')
-        self.apply_filter_settings()
 
-    def apply_filter_settings(self):
-        for fname in sorted(os.listdir(self.segmentation_output_path)):
-            seg_path = os.path.join(self.segmentation_output_path, fname)
-            image_name = fname.split('.png')[0]
-            if image_name not in self.data_dict['output_images_list']: os.remove(seg_path)
-            
-        for fname in sorted(os.listdir(self.yolo_output_path)):
-            yolo_path = os.path.join(self.yolo_output_path, fname)
-            image_name = fname.split('.txt')[0]
-            if image_name not in self.data_dict['output_images_list']: os.remove(yolo_path)
 
 class Ui(QtWidgets.QMainWindow):
     def __init__(self, data_dict, parent=None):
@@ -9,7 +9,7 @@ from labels4rails.utils.config import Labels4RailsConfig
 config_store = hydra.core.config_store.ConfigStore.instance()
 config_store.store(name="rail_label_config", node=Labels4RailsConfig)
 
-def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str]):
+def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str], names : Optional[list[str]] = None):
     cfg: Labels4RailsConfig = None
     if cfg_file:
         if pathlib.Path(cfg_file).is_absolute():
@@ -35,7 +35,7 @@ def main(data_path_in : str, data_path_out : str, cfg_file : Optional[str]):
 
     dataset: data.IDataSet = data.DataSet(None, data_path_in)
     label_converter_yolo = label_conversion.LabelConverterYOLO(dataset, cfg)
-    label_converter_yolo.generate_switch_labels(output_pth, kinds, directions)
+    label_converter_yolo.generate_switch_labels(output_pth, kinds, directions, names=names)
     
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Create YOLO labels.')
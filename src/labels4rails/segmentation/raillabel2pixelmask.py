@@ -11,7 +11,13 @@ from labels4rails.utils.config import Labels4RailsConfig
 config_store = hydra.core.config_store.ConfigStore.instance()
 config_store.store(name="rail_label_config", node=Labels4RailsConfig)
 
-def main(data_path_in_list, data_path_out, track_segmentation, cfg_file: Optional[str]): 
+def main(
+    data_path_in_list,
+    data_path_out,
+    track_segmentation: Optional[dict] = None,
+    cfg_file: Optional[str] = None,
+    names: Optional[list[str]] = None,
+):
     cfg: Labels4RailsConfig = None
     if cfg_file:
         if pathlib.Path(cfg_file).is_absolute():
@@ -24,8 +30,13 @@ def main(data_path_in_list, data_path_out, track_segmentation, cfg_file: Optiona
             output_pth.mkdir(parents=True, exist_ok=True)
 
         print(data_path_in)
-        label_converter_pm = label_conversion.label_converter_segmentation.LabelConverterPixelmask(None, None, data_path_in, track_segmentation)
-        label_converter_pm.generate_track_labels(output_pth)
+        label_converter_pm: label_conversion.label_converter_segmentation.LabelConverterPixelmask
+        if track_segmentation is None:
+            label_converter_pm = label_conversion.label_converter_segmentation.LabelConverterPixelmask(None, None, data_path_in)
+        else:
+            label_converter_pm = label_conversion.label_converter_segmentation.LabelConverterPixelmask(None, None, data_path_in, track_segmentation)
+        # Only scenes passing the filter are rendered
+        label_converter_pm.generate_track_labels(output_pth, names=names)
 
 
 if __name__ == "__main__":
@@ -36,4 +47,4 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
 
-    main(args.in_data_path, args.out_data_path, args.config_file)
+    main(args.in_data_path, args.out_data_path, None, args.config_file)
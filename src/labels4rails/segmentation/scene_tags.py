@@ -0,0 +1,53 @@
+import pathlib
+
+from labels4rails import data
+
+# Format of the persisted filter tags
+VERSION = 1
+
+def scene_tags(annotation):
+    """
+    Filter tags and element counts of a scene. Besides the tags of all tag
+    groups ('unknown' named after its group), switches add their direction
+    and kind and tracks their relative position.
+
+    :param annotation: Annotation of a scene
+    :return: Sorted tags without duplicates and number of tracks and switches
+    """
+    tag_list = []
+    for k, v in annotation.get('tag groups', {}).items():
+        tag_list += v
+        if 'unknown' in tag_list: tag_list[tag_list.index('unknown')] = k + '_unknown'
+
+    switches = annotation.get('switches', {})
+    for k, v in switches.items():
+        tag_list += ['switch_' + v['direction']]
+        tag_list += [v['kind']]
+
+    tracks = annotation.get('tracks', {})
+    for k, v in tracks.items():
+        tag_list += [v['relative position']]
+
+    count = {'tracks': len(tracks), 'switches': len(switches)}
+    return sorted(set(tag_list)), count
+
+def load_scene_tags(annotations_path):
+    """
+    Filter tags and element counts of all scenes of a chunk, annotation
+    directories and packs alike. Results are persisted in
+    '.annotations.filter.json' next to the annotations, only annotations
+    changed since are read again.
+
+    :param annotations_path: Annotations of the chunk
+    :return: Tags and counts by scene name, in name order
+    """
+    annotations_path = pathlib.Path(annotations_path)
+    store = data.open_annotation_store(annotations_path)
+    cache = data.StampCache(annotations_path.parent / f'.{annotations_path.name}.filter.json', VERSION)
+
+    def evaluate(name):
+        annotation = store.read(name)
+        return None if annotation is None else list(scene_tags(annotation))
+
+    cache.update(store.stamps(), evaluate)
+    return {name: cache[name] for name in cache.names}
@@ -0,0 +1,3 @@
+from .statistics import Statistics
+from .corpus import ChunkStatistics, compute_statistics, total_statistics, write_json, write_csv
+from .tables import SceneTables, export_tables, read_table
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import argparse
+import json
+
+from labels4rails import stats
+
+
+def main(chunk_paths: list[str], json_path: str, csv_path: str, workers: int, tables_path: str = None, format_: str = "auto"):
+    if tables_path:
+        stats.export_tables(chunk_paths, tables_path, format_)
+        if not (json_path or csv_path):
+            return
+    statistics = stats.compute_statistics(chunk_paths, workers)
+    if json_path:
+        stats.write_json(json_path, statistics)
+    if csv_path:
+        stats.write_csv(csv_path, statistics)
+    if not (json_path or csv_path):
+        print(json.dumps(stats.total_statistics(statistics).summary(), indent=4))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Count tracks, switches, tags, rail lengths and mark densities of data batches or export their scenes as tables.')
+    parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('-j', '--json', type=str, help='JSON file to store the statistics of every data batch and their total')
+    parser.add_argument('--csv', type=str, help='CSV file to store one row per data batch and their total')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes evaluating data batches')
+    parser.add_argument('-t', '--tables', type=str, help='directory to store frames, tags, tracks, rails, marks, switches and switch boxes as tables')
+    parser.add_argument('-f', '--format', type=str, default='auto', choices=stats.tables.FORMATS, help='file format of the tables, auto uses Parquet if pyarrow is installed and CSV otherwise')
+
+    args = parser.parse_args()
+    main(args.in_data_path, args.json, args.csv, args.workers, args.tables, args.format)
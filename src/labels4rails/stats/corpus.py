@@ -0,0 +1,151 @@
+from typing import Iterable, Optional, Union
+import concurrent.futures
+import csv
+import json
+import pathlib
+from labels4rails import data
+from .statistics import Statistics
+
+
+class ChunkStatistics:
+    """
+    Statistics of the scenes of a chunk. The statistics of every scene are
+    persisted next to the annotations together with a version token of the
+    annotation, only added or changed annotations are read again.
+    """
+
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        chunk_path: Union[pathlib.Path, str],
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param chunk_path: Chunk containing the 'annotations' directory
+        :param cache_path: File to persist the statistics, None to store
+            them as hidden file in the chunk
+        """
+        self._chunk_path: pathlib.Path = pathlib.Path(chunk_path)
+        self._annotations_path: pathlib.Path = self._chunk_path / "annotations"
+        self._cache_path: pathlib.Path = (
+            self._chunk_path / ".annotations.stats.json" if cache_path is None else pathlib.Path(cache_path)
+        )
+        # name -> statistics
+        self._cache: data.StampCache = data.StampCache(self._cache_path, self.VERSION)
+        self.read: int = 0
+        self._update()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def total(self) -> Statistics:
+        """
+        Statistics of all scenes of the chunk.
+        """
+        total: Statistics = Statistics()
+        for name in self._cache.names:
+            total += Statistics.from_dict(self._cache[name])
+        return total
+
+    def scene(self, name: str) -> Statistics:
+        """
+        Statistics of a scene.
+        :param name: Scene name
+        :return: Statistics of the scene
+        """
+        return Statistics.from_dict(self._cache[name])
+
+    def _update(self) -> None:
+        """
+        Load the persisted statistics and evaluate changed annotations.
+        """
+        if not self._annotations_path.is_dir():
+            msg: str = f"Could not find annotations in '{self._chunk_path}'."
+            raise FileNotFoundError(msg)
+        store: data.IAnnotationStore = data.open_annotation_store(self._annotations_path)
+
+        def statistics(name: str) -> Optional[dict]:
+            annotation: Optional[dict] = store.read(name)
+            return None if annotation is None else Statistics.from_annotation(annotation).to_dict()
+
+        self.read = self._cache.update(store.stamps(), statistics)
+
+
+def _chunk_total(chunk_path: str) -> tuple[Statistics, int]:
+    """
+    Worker function, evaluate a chunk.
+    :param chunk_path: Chunk containing the 'annotations' directory
+    :return: Statistics of the chunk and number of annotations read
+    """
+    chunk: ChunkStatistics = ChunkStatistics(chunk_path)
+    return chunk.total, chunk.read
+
+
+def compute_statistics(
+    chunk_paths: Iterable[Union[pathlib.Path, str]],
+    workers: int = 1,
+) -> dict[str, Statistics]:
+    """
+    Evaluate chunks, in parallel worker processes if more than one worker
+    is given. Chunks are evaluated independently and combined afterwards.
+    :param chunk_paths: Chunks containing an 'annotations' directory
+    :param workers: Number of worker processes
+    :return: Statistics by chunk path, in given order
+    """
+    paths: list[str] = [str(path) for path in chunk_paths]
+    results: list[tuple[Statistics, int]]
+    if workers > 1 and len(paths) > 1:
+        with concurrent.futures.ProcessPoolExecutor(min(workers, len(paths))) as executor:
+            results = list(executor.map(_chunk_total, paths))
+    else:
+        results = [_chunk_total(path) for path in paths]
+    read: int = sum(result[1] for result in results)
+    scenes: int = sum(result[0].scenes for result in results)
+    print(f"Evaluated {len(paths)} chunks with {scenes} scenes, read {read} changed annotations.")
+    return {path: result[0] for path, result in zip(paths, results)}
+
+
+def total_statistics(statistics: dict[str, Statistics]) -> Statistics:
+    """
+    Combine statistics of chunks.
+    :param statistics: Statistics by chunk
+    :return: Statistics of all chunks
+    """
+    total: Statistics = Statistics()
+    for chunk_statistics in statistics.values():
+        total += chunk_statistics
+    return total
+
+
+def write_json(path: Union[pathlib.Path, str], statistics: dict[str, Statistics]) -> None:
+    """
+    Store summaries of all chunks and their total.
+    :param path: JSON file
+    :param statistics: Statistics by chunk
+    """
+    content: dict = {
+        "total": total_statistics(statistics).summary(),
+        "chunks": {chunk: chunk_statistics.summary() for chunk, chunk_statistics in statistics.items()},
+    }
+    with open(path, "w") as file_pointer:
+        json.dump(content, file_pointer, indent=4)
+
+
+def write_csv(path: Union[pathlib.Path, str], statistics: dict[str, Statistics]) -> None:
+    """
+    Store one row per chunk and a last row 'total'. Columns of counts are
+    named like 'tracks/ego', counts missing in a chunk are 0.
+    :param path: CSV file
+    :param statistics: Statistics by chunk
+    """
+    rows: list[dict] = [
+        {"chunk": chunk, **chunk_statistics.row()} for chunk, chunk_statistics in statistics.items()
+    ]
+    rows.append({"chunk": "total", **total_statistics(statistics).row()})
+    columns: list[str] = list(rows[-1])
+    with open(path, "w", newline="") as file_pointer:
+        writer: csv.DictWriter = csv.DictWriter(file_pointer, columns, restval=0)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,130 @@
+from typing import Any
+import dataclasses
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclasses.dataclass
+class Statistics:
+    """
+    Aggregates over annotated scenes. All fields are sums or counts, so
+    statistics of scenes and chunks are combined by adding them.
+    """
+
+    scenes: int = 0
+    tracks: dict[str, int] = dataclasses.field(default_factory=dict)  # by relative position
+    switches: dict[str, int] = dataclasses.field(default_factory=dict)  # by '<kind>/<direction>'
+    tags: dict[str, int] = dataclasses.field(default_factory=dict)  # by '<tag group>/<tag>'
+    rails: int = 0
+    rail_length: float = 0.0  # pixels
+    marks: int = 0  # rail marks
+
+    def __add__(self, other: "Statistics") -> "Statistics":
+        result: Statistics = Statistics.from_dict(self.to_dict())
+        result += other
+        return result
+
+    def __iadd__(self, other: "Statistics") -> "Statistics":
+        self.scenes += other.scenes
+        for counts, other_counts in (
+            (self.tracks, other.tracks),
+            (self.switches, other.switches),
+            (self.tags, other.tags),
+        ):
+            for key, count in other_counts.items():
+                counts[key] = counts.get(key, 0) + count
+        self.rails += other.rails
+        self.rail_length += other.rail_length
+        self.marks += other.marks
+        return self
+
+    @classmethod
+    def from_annotation(cls, annotation: dict) -> "Statistics":
+        """
+        Statistics of a single serialized scene. The scene is evaluated as
+        stored, it is not deserialized.
+        :param annotation: Serialized scene
+        :return: Statistics of the scene
+        """
+        statistics: Statistics = cls(scenes=1)
+        track: dict
+        for track in annotation.get("tracks", {}).values():
+            position: str = track.get("relative position", "unknown")
+            statistics.tracks[position] = statistics.tracks.get(position, 0) + 1
+            for rail in ("left rail", "right rail"):
+                points: list[dict] = track.get(rail, {}).get("points", [])
+                statistics.rails += 1
+                statistics.marks += len(points)
+                statistics.rail_length += _polyline_length(points)
+        switch: dict
+        for switch in annotation.get("switches", {}).values():
+            key: str = f"{switch.get('kind', 'unknown')}/{switch.get('direction', 'unknown')}"
+            statistics.switches[key] = statistics.switches.get(key, 0) + 1
+        group: str
+        for group, tags in annotation.get("tag groups", {}).items():
+            for tag in tags:
+                key = f"{group}/{tag}"
+                statistics.tags[key] = statistics.tags.get(key, 0) + 1
+        return statistics
+
+    @classmethod
+    def from_dict(cls, content: dict) -> "Statistics":
+        return cls(
+            scenes=content["scenes"],
+            tracks=dict(content["tracks"]),
+            switches=dict(content["switches"]),
+            tags=dict(content["tags"]),
+            rails=content["rails"],
+            rail_length=content["rail_length"],
+            marks=content["marks"],
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Counts and derived means.
+        :return: Nested dictionary, JSON serializable
+        """
+        return {
+            "scenes": self.scenes,
+            "tracks": dict(sorted(self.tracks.items())),
+            "switches": dict(sorted(self.switches.items())),
+            "tags": dict(sorted(self.tags.items())),
+            "rails": self.rails,
+            "rail_length": round(self.rail_length, 1),
+            "mean_rail_length": round(self.rail_length / self.rails, 1) if self.rails else 0.0,
+            "marks": self.marks,
+            "marks_per_rail": round(self.marks / self.rails, 2) if self.rails else 0.0,
+            # Marks per 100 pixels of rail
+            "mark_density": round(100 * self.marks / self.rail_length, 2) if self.rail_length else 0.0,
+        }
+
+    def row(self) -> dict[str, Any]:
+        """
+        Summary flattened into columns like 'tracks/ego'.
+        :return: Values by column name
+        """
+        row: dict[str, Any] = {}
+        key: str
+        for key, value in self.summary().items():
+            if isinstance(value, dict):
+                row.update({f"{key}/{item}": count for item, count in value.items()})
+            else:
+                row[key] = value
+        return row
+
+
+def _polyline_length(points: list[dict]) -> float:
+    """
+    Length of a rail through its marks.
+    :param points: Marks with 'x' and 'y'
+    :return: Length in pixels
+    """
+    if len(points) < 2:
+        return 0.0
+    coordinates: npt.NDArray[np.float64] = np.array(
+        [(point["x"], point["y"]) for point in points], dtype=np.float64
+    )
+    return float(np.hypot(*np.diff(coordinates, axis=0).T).sum())
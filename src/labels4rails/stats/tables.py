@@ -0,0 +1,257 @@
+from typing import Iterable, Union
+import csv
+import pathlib
+import numpy as np
+import numpy.typing as npt
+from labels4rails import data
+
+FORMATS: tuple[str, ...] = ("auto", "parquet", "feather", "csv")
+
+# Columns and their types per table. Frames are keyed by 'frame_id',
+# tracks and switches by 'frame_id' and their id within the frame.
+SCHEMA: dict[str, dict[str, str]] = {
+    "frames": {"frame_id": "int64", "chunk": "str", "name": "str", "tracks": "int64", "switches": "int64"},
+    "tags": {"frame_id": "int64", "group": "str", "tag": "str"},
+    "tracks": {"frame_id": "int64", "track_id": "int64", "position": "str"},
+    "rails": {
+        "frame_id": "int64",
+        "track_id": "int64",
+        "side": "str",
+        "marks": "int64",
+        "length": "float64",
+    },
+    "marks": {
+        "frame_id": "int64",
+        "track_id": "int64",
+        "side": "str",
+        "index": "int64",
+        "x": "float64",
+        "y": "float64",
+    },
+    "switches": {
+        "frame_id": "int64",
+        "switch_id": "int64",
+        "kind": "str",
+        "direction": "str",
+        "track_ids": "str",  # separated by ';'
+    },
+    "switch_boxes": {
+        "frame_id": "int64",
+        "switch_id": "int64",
+        "x_min": "float64",
+        "y_min": "float64",
+        "x_max": "float64",
+        "y_max": "float64",
+    },
+}
+
+
+class SceneTables:
+    """
+    Flatten serialized scenes into one table per entity: frames, tags,
+    tracks, rails, marks, switches and switch boxes. Tables are stored as
+    columns, see 'SCHEMA'.
+    """
+
+    def __init__(self) -> None:
+        self._columns: dict[str, dict[str, list]] = {
+            table: {column: [] for column in columns} for table, columns in SCHEMA.items()
+        }
+        self._frames: int = 0
+
+    def __len__(self) -> int:
+        return self._frames
+
+    def add(self, chunk: str, name: str, annotation: dict) -> int:
+        """
+        Add the rows of a scene.
+        :param chunk: Chunk of the scene
+        :param name: Scene name
+        :param annotation: Serialized scene
+        :return: Frame id of the scene
+        """
+        frame_id: int = self._frames
+        self._frames += 1
+        tracks: dict = annotation.get("tracks", {})
+        switches: dict = annotation.get("switches", {})
+        self._append("frames", frame_id, chunk, name, len(tracks), len(switches))
+        group: str
+        for group, tags in annotation.get("tag groups", {}).items():
+            for tag in tags:
+                self._append("tags", frame_id, group, tag)
+        track_id: str
+        track: dict
+        for track_id, track in tracks.items():
+            self._append("tracks", frame_id, int(track_id), track.get("relative position", "unknown"))
+            for side in ("left", "right"):
+                points: list[dict] = track.get(f"{side} rail", {}).get("points", [])
+                coordinates: npt.NDArray[np.float64] = np.array(
+                    [(point["x"], point["y"]) for point in points], dtype=np.float64
+                ).reshape(-1, 2)
+                length: float = float(np.hypot(*np.diff(coordinates, axis=0).T).sum())
+                self._append("rails", frame_id, int(track_id), side, len(points), length)
+                marks: dict[str, list] = self._columns["marks"]
+                marks["frame_id"] += [frame_id] * len(points)
+                marks["track_id"] += [int(track_id)] * len(points)
+                marks["side"] += [side] * len(points)
+                marks["index"] += range(len(points))
+                marks["x"] += coordinates[:, 0].tolist()
+                marks["y"] += coordinates[:, 1].tolist()
+        switch_id: str
+        switch: dict
+        for switch_id, switch in switches.items():
+            self._append(
+                "switches",
+                frame_id,
+                int(switch_id),
+                switch.get("kind", "unknown"),
+                switch.get("direction", "unknown"),
+                ";".join(str(track) for track in switch.get("track_ids", [])),
+            )
+            corners: list[dict] = switch.get("marks", [])
+            if len(corners) == 2:
+                xs: list[float] = [corner["x"] for corner in corners]
+                ys: list[float] = [corner["y"] for corner in corners]
+                self._append("switch_boxes", frame_id, int(switch_id), min(xs), min(ys), max(xs), max(ys))
+        return frame_id
+
+    def add_chunk(self, chunk_path: Union[pathlib.Path, str]) -> None:
+        """
+        Add all annotated scenes of a chunk in name order.
+        :param chunk_path: Chunk containing the 'annotations' directory
+        """
+        store: data.IAnnotationStore = data.open_annotation_store(pathlib.Path(chunk_path) / "annotations")
+        for name, annotation in store.items():
+            self.add(str(chunk_path), name, annotation)
+
+    def tables(self) -> dict[str, dict[str, npt.NDArray]]:
+        """
+        Columns of all tables.
+        :return: Arrays by column name by table name
+        """
+        return {
+            table: {
+                column: _array(values, SCHEMA[table][column]) for column, values in columns.items()
+            }
+            for table, columns in self._columns.items()
+        }
+
+    def write(self, output_path: Union[pathlib.Path, str], format_: str = "auto") -> str:
+        """
+        Store every table in a file named after it.
+        :param output_path: Directory to store the tables
+        :param format_: 'parquet', 'feather' (both require pyarrow), 'csv' or
+            'auto' for Parquet if pyarrow is installed and CSV otherwise
+        :return: Format used
+        """
+        if format_ not in FORMATS:
+            msg: str = f"Expected format to be one of {FORMATS}, got {format_}."
+            raise ValueError(msg)
+        if format_ == "auto":
+            try:
+                import pyarrow  # noqa: F401
+                format_ = "parquet"
+            except ImportError:
+                format_ = "csv"
+        output_path = pathlib.Path(output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+        table: str
+        for table, columns in self.tables().items():
+            path: pathlib.Path = output_path / f"{table}.{format_}"
+            if format_ == "csv":
+                _write_csv(path, columns)
+            else:
+                import pyarrow
+                arrow_table = pyarrow.table(columns)
+                if format_ == "parquet":
+                    import pyarrow.parquet
+                    pyarrow.parquet.write_table(arrow_table, path)
+                else:
+                    import pyarrow.feather
+                    pyarrow.feather.write_feather(arrow_table, path)
+        return format_
+
+    def _append(self, table: str, *values) -> None:
+        """
+        Append a row to a table.
+        :param table: Table name
+        :param values: Value of every column in schema order
+        """
+        column: list
+        for column, value in zip(self._columns[table].values(), values):
+            column.append(value)
+
+
+def export_tables(
+    chunk_paths: Iterable[Union[pathlib.Path, str]],
+    output_path: Union[pathlib.Path, str],
+    format_: str = "auto",
+) -> SceneTables:
+    """
+    Flatten the annotated scenes of chunks into tables.
+    :param chunk_paths: Chunks containing an 'annotations' directory
+    :param output_path: Directory to store the tables
+    :param format_: 'parquet', 'feather', 'csv' or 'auto'
+    :return: Tables of all scenes
+    """
+    tables: SceneTables = SceneTables()
+    for chunk_path in chunk_paths:
+        tables.add_chunk(chunk_path)
+    format_ = tables.write(output_path, format_)
+    print(f"Wrote tables of {len(tables)} scenes as {format_} to '{output_path}'.")
+    return tables
+
+
+def read_table(path: Union[pathlib.Path, str]) -> dict[str, npt.NDArray]:
+    """
+    Read a table written by 'SceneTables' as columns, e.g. for vectorized
+    queries with numpy.
+    :param path: File of the table, the format is taken from its suffix
+    :return: Array by column name
+    """
+    path = pathlib.Path(path)
+    if path.suffix == ".csv":
+        schema: dict[str, str] = SCHEMA[path.stem]
+        with open(path, newline="") as file_pointer:
+            reader: csv.reader = csv.reader(file_pointer)
+            header: list[str] = next(reader)
+            rows: list[list[str]] = list(reader)
+        return {
+            column: _array([row[index] for row in rows], schema[column])
+            for index, column in enumerate(header)
+        }
+    import pyarrow
+    if path.suffix == ".parquet":
+        import pyarrow.parquet
+        arrow_table = pyarrow.parquet.read_table(path)
+    else:
+        import pyarrow.feather
+        arrow_table = pyarrow.feather.read_table(path)
+    return {
+        column: _array(arrow_table.column(column).to_pylist(), SCHEMA[path.stem][column])
+        for column in arrow_table.column_names
+    }
+
+
+def _array(values: list, dtype: str) -> npt.NDArray:
+    """
+    Column as array, strings as unicode arrays.
+    :param values: Values of the column
+    :param dtype: Type from 'SCHEMA'
+    :return: Array
+    """
+    if dtype == "str":
+        return np.array(values, dtype=str) if values else np.zeros(0, dtype=str)
+    return np.array(values, dtype=dtype)
+
+
+def _write_csv(path: pathlib.Path, columns: dict[str, npt.NDArray]) -> None:
+    """
+    Store columns as CSV.
+    :param path: CSV file
+    :param columns: Array by column name
+    """
+    with open(path, "w", newline="") as file_pointer:
+        writer: csv.writer = csv.writer(file_pointer)
+        writer.writerow(columns)
+        writer.writerows(zip(*(values.tolist() for values in columns.values())))
@@ -1 +1,2 @@
-from .camera import Camera, ICamera
+from .camera import Camera, ICamera, shared_camera
+from .undistortion import IUndistorter, OpenCVUndistorter, get_undistorter, camera_hash
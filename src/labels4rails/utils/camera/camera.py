@@ -1,6 +1,8 @@
 from typing import Union, Optional
 import abc
 import functools
+import hashlib
+import threading
 from labels4rails import utils
 from labels4rails import data
 import numpy as np
@@ -226,3 +228,25 @@ class Camera(ICamera):
             return image_point
         else:
             return self.world_to_pixel(world_point)
+
+
+_cameras: dict[str, Camera] = {}
+_cameras_lock = threading.Lock()
+
+
+def shared_camera(calib_data: data.ICameraReader) -> ICamera:
+    """
+    Camera shared by all users of the same calibration within the process.
+    Cached geometry calculations are reused across data chunks.
+    :param calib_data: Information about camera
+    :return: Camera for given calibration
+    """
+    digest = hashlib.sha1()
+    digest.update(np.array([calib_data.roll, calib_data.pitch, calib_data.yaw], dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(calib_data.tvec, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(calib_data.camera_matrix, dtype=np.float64).tobytes())
+    key: str = digest.hexdigest()
+    with _cameras_lock:
+        if key not in _cameras:
+            _cameras[key] = Camera(calib_data)
+        return _cameras[key]
@@ -0,0 +1,323 @@
+from typing import Optional, Union
+import abc
+import hashlib
+import os
+import pathlib
+import threading
+from labels4rails import data
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+
+class IUndistorter(metaclass=abc.ABCMeta):
+    """
+    Remove lens distortion from images, masks and points and apply it
+    again.
+    """
+
+    @property
+    @abc.abstractmethod
+    def camera_matrix(self) -> npt.NDArray[np.float_]:
+        """
+        Camera matrix of the undistorted images.
+        """
+        pass
+
+    @abc.abstractmethod
+    def undistort_image(self, image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Remove lens distortion from an image.
+        :param image: Distorted image
+        :return: Undistorted image
+        """
+        pass
+
+    @abc.abstractmethod
+    def redistort_image(self, image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Apply lens distortion to an undistorted image.
+        :param image: Undistorted image
+        :return: Distorted image
+        """
+        pass
+
+    @abc.abstractmethod
+    def undistort_mask(self, mask: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Remove lens distortion from a label mask. Mask values are not
+        interpolated.
+        :param mask: Distorted mask
+        :return: Undistorted mask
+        """
+        pass
+
+    @abc.abstractmethod
+    def redistort_mask(self, mask: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Apply lens distortion to an undistorted label mask. Mask values are
+        not interpolated.
+        :param mask: Undistorted mask
+        :return: Distorted mask
+        """
+        pass
+
+    @abc.abstractmethod
+    def undistort_points(self, points: npt.ArrayLike) -> npt.NDArray[np.float_]:
+        """
+        Remove lens distortion from pixel coordinates.
+        :param points: Distorted points of shape (N, 2)
+        :return: Undistorted points of shape (N, 2)
+        """
+        pass
+
+    @abc.abstractmethod
+    def redistort_points(self, points: npt.ArrayLike) -> npt.NDArray[np.float_]:
+        """
+        Apply lens distortion to pixel coordinates.
+        :param points: Undistorted points of shape (N, 2)
+        :return: Distorted points of shape (N, 2)
+        """
+        pass
+
+
+def camera_hash(calib_data: data.ICameraReader, alpha: float = 0.0) -> str:
+    """
+    Hash of all calibration values the undistortion maps depend on.
+    :param calib_data: Information about camera
+    :param alpha: Free scaling parameter of the undistorted camera matrix
+    :return: Hex digest
+    """
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(calib_data.camera_matrix, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(calib_data.distortion_coefficients, dtype=np.float64).tobytes())
+    digest.update(np.array([calib_data.width, calib_data.height, alpha], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def default_cache_dir() -> pathlib.Path:
+    """
+    Directory to store undistortion maps between runs.
+    :return: Path inside the user cache directory
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")
+    return pathlib.Path(cache_home) / "labels4rails" / "undistortion"
+
+
+class OpenCVUndistorter(IUndistorter):
+    """
+    Undistort with remapping tables from cv2.initUndistortRectifyMap. The
+    tables are calculated once per calibration and stored on disk.
+    """
+
+    def __init__(
+        self,
+        calib_data: data.ICameraReader,
+        cache_dir: Optional[Union[pathlib.Path, str]] = None,
+        alpha: float = 0.0,
+    ) -> None:
+        """
+        :param calib_data: Information about camera
+        :param cache_dir: Directory to store remapping tables, None to use
+            the user cache directory
+        :param alpha: Free scaling parameter of the undistorted camera
+            matrix, 0 keeps only valid pixels, 1 keeps all source pixels
+        """
+        self._camera_matrix_distorted: npt.NDArray[np.float_]
+        self._camera_matrix_distorted = np.asarray(calib_data.camera_matrix, dtype=np.float64)
+        self._distortion_coefficients: npt.NDArray[np.float_]
+        self._distortion_coefficients = np.asarray(
+            calib_data.distortion_coefficients, dtype=np.float64
+        ).ravel()
+        self._size: tuple[int, int] = (int(calib_data.width), int(calib_data.height))
+        self._hash: str = camera_hash(calib_data, alpha)
+        self._identity: bool = not np.any(self._distortion_coefficients)
+
+        self._camera_matrix: npt.NDArray[np.float_] = self._camera_matrix_distorted
+        self._undistort_maps: Optional[tuple[np.ndarray, np.ndarray]] = None
+        self._redistort_maps: Optional[tuple[np.ndarray, np.ndarray]] = None
+        if not self._identity:
+            cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+            self._load_or_build_maps(pathlib.Path(cache_dir), alpha)
+
+    @property
+    def hash(self) -> str:
+        return self._hash
+
+    @property
+    def camera_matrix(self) -> npt.NDArray[np.float_]:
+        return self._camera_matrix
+
+    def _load_or_build_maps(self, cache_dir: pathlib.Path, alpha: float) -> None:
+        """
+        Read remapping tables from disk or calculate and store them.
+        :param cache_dir: Directory containing remapping tables
+        :param alpha: Free scaling parameter of the undistorted camera matrix
+        """
+        cache_path: pathlib.Path = cache_dir / f"{self._hash}.npz"
+        try:
+            with np.load(cache_path) as maps:
+                self._camera_matrix = maps["camera_matrix"]
+                self._undistort_maps = (maps["undistort_1"], maps["undistort_2"])
+                self._redistort_maps = (maps["redistort_1"], maps["redistort_2"])
+            return
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            pass
+
+        self._camera_matrix, _ = cv2.getOptimalNewCameraMatrix(
+            self._camera_matrix_distorted,
+            self._distortion_coefficients,
+            self._size,
+            alpha,
+            self._size,
+        )
+        self._undistort_maps = cv2.initUndistortRectifyMap(
+            self._camera_matrix_distorted,
+            self._distortion_coefficients,
+            None,
+            self._camera_matrix,
+            self._size,
+            cv2.CV_16SC2,
+        )
+        # The inverse maps look up the undistorted position of every
+        # distorted pixel.
+        width, height = self._size
+        grid = np.mgrid[0:height, 0:width][::-1].reshape(2, -1).T.astype(np.float32)
+        undistorted = self.undistort_points(grid).astype(np.float32)
+        self._redistort_maps = cv2.convertMaps(
+            undistorted[:, 0].reshape(height, width),
+            undistorted[:, 1].reshape(height, width),
+            cv2.CV_16SC2,
+        )
+
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path: pathlib.Path = cache_path.with_suffix(f".{os.getpid()}.tmp.npz")
+            np.savez(
+                tmp_path,
+                camera_matrix=self._camera_matrix,
+                undistort_1=self._undistort_maps[0],
+                undistort_2=self._undistort_maps[1],
+                redistort_1=self._redistort_maps[0],
+                redistort_2=self._redistort_maps[1],
+            )
+            os.replace(tmp_path, cache_path)
+        except OSError as error:
+            print("Could not store undistortion maps:", error)
+
+    def _remap(
+        self,
+        image: npt.NDArray[np.uint8],
+        maps: Optional[tuple[np.ndarray, np.ndarray]],
+        interpolation: int,
+    ) -> npt.NDArray[np.uint8]:
+        """
+        Apply remapping tables to an image.
+        :param image: Image to remap
+        :param maps: Remapping tables
+        :param interpolation: OpenCV interpolation flag
+        :return: Remapped image
+        """
+        if self._identity:
+            return image
+        if image.shape[1] != self._size[0] or image.shape[0] != self._size[1]:
+            msg: str = f"Expected image resolution {self._size}, "
+            msg += f"got {(image.shape[1], image.shape[0])}."
+            raise ValueError(msg)
+        return cv2.remap(image, maps[0], maps[1], interpolation, borderMode=cv2.BORDER_CONSTANT)
+
+    def undistort_image(self, image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Remove lens distortion from an image.
+        :param image: Distorted image
+        :return: Undistorted image
+        """
+        return self._remap(image, self._undistort_maps, cv2.INTER_LINEAR)
+
+    def redistort_image(self, image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Apply lens distortion to an undistorted image.
+        :param image: Undistorted image
+        :return: Distorted image
+        """
+        return self._remap(image, self._redistort_maps, cv2.INTER_LINEAR)
+
+    def undistort_mask(self, mask: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Remove lens distortion from a label mask. Mask values are not
+        interpolated.
+        :param mask: Distorted mask
+        :return: Undistorted mask
+        """
+        return self._remap(mask, self._undistort_maps, cv2.INTER_NEAREST)
+
+    def redistort_mask(self, mask: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+        """
+        Apply lens distortion to an undistorted label mask. Mask values are
+        not interpolated.
+        :param mask: Undistorted mask
+        :return: Distorted mask
+        """
+        return self._remap(mask, self._redistort_maps, cv2.INTER_NEAREST)
+
+    def undistort_points(self, points: npt.ArrayLike) -> npt.NDArray[np.float_]:
+        """
+        Remove lens distortion from pixel coordinates.
+        :param points: Distorted points of shape (N, 2)
+        :return: Undistorted points of shape (N, 2)
+        """
+        points_arr = np.asarray(points, dtype=np.float64).reshape(-1, 1, 2)
+        if self._identity or len(points_arr) == 0:
+            return points_arr.reshape(-1, 2).copy()
+        undistorted = cv2.undistortPoints(
+            points_arr,
+            self._camera_matrix_distorted,
+            self._distortion_coefficients,
+            P=self._camera_matrix,
+        )
+        return undistorted.reshape(-1, 2)
+
+    def redistort_points(self, points: npt.ArrayLike) -> npt.NDArray[np.float_]:
+        """
+        Apply lens distortion to pixel coordinates.
+        :param points: Undistorted points of shape (N, 2)
+        :return: Distorted points of shape (N, 2)
+        """
+        points_arr = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self._identity or len(points_arr) == 0:
+            return points_arr.copy()
+        # Normalized camera coordinates on the plane z = 1
+        homogeneous = np.hstack((points_arr, np.ones((len(points_arr), 1))))
+        normalized = np.dot(np.linalg.inv(self._camera_matrix), homogeneous.T).T
+        redistorted, _ = cv2.projectPoints(
+            normalized,
+            np.zeros(3),
+            np.zeros(3),
+            self._camera_matrix_distorted,
+            self._distortion_coefficients,
+        )
+        return redistorted.reshape(-1, 2)
+
+
+_undistorters: dict[str, IUndistorter] = {}
+_undistorters_lock = threading.Lock()
+
+
+def get_undistorter(
+    calib_data: data.ICameraReader,
+    cache_dir: Optional[Union[pathlib.Path, str]] = None,
+    alpha: float = 0.0,
+) -> IUndistorter:
+    """
+    Undistorter shared by all users of the same calibration within the
+    process.
+    :param calib_data: Information about camera
+    :param cache_dir: Directory to store remapping tables
+    :param alpha: Free scaling parameter of the undistorted camera matrix
+    :return: Undistorter for given calibration
+    """
+    key: str = camera_hash(calib_data, alpha)
+    with _undistorters_lock:
+        if key not in _undistorters:
+            _undistorters[key] = OpenCVUndistorter(calib_data, cache_dir, alpha)
+        return _undistorters[key]
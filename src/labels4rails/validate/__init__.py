@@ -0,0 +1,2 @@
+from .checks import ERROR, WARNING, Issue, check_annotation, known_tags, locate
+from .validator import ChunkValidator, validate_chunks
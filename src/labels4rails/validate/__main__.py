@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import sys
+import yaml
+
+from labels4rails import validate
+
+DEFAULT_CONFIG_PATH = pathlib.Path(__file__).parents[2] / "conf" / "config.yaml"
+
+
+def main(chunk_paths: list[str], cfg_file: str, workers: int, show_warnings: bool) -> int:
+    tags = None
+    if cfg_file and pathlib.Path(cfg_file).is_file():
+        with open(cfg_file) as file_pointer:
+            tags = validate.known_tags(yaml.safe_load(file_pointer))
+    else:
+        print("No configuration, tags are not checked.")
+    results = validate.validate_chunks(chunk_paths, tags, workers)
+    errors = 0
+    warnings = 0
+    for issues in results.values():
+        for issue in issues:
+            if issue.severity == validate.ERROR:
+                errors += 1
+            else:
+                warnings += 1
+                if not show_warnings:
+                    continue
+            print(issue)
+    print(f"{errors} errors, {warnings} warnings.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check annotations of data batches for schema violations, broken geometry, unknown tags and images without annotation.')
+    parser.add_argument('in_data_path', type=str, nargs='+', help='path to data batch (the directory that contains images, annotations and camera)')
+    parser.add_argument('-c', '--config_file', type=str, default=str(DEFAULT_CONFIG_PATH), help='config file defining the known tags')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of processes validating data batches')
+    parser.add_argument('--warnings', action='store_true', help='also print warnings, like unknown tags')
+
+    args = parser.parse_args()
+    sys.exit(main(args.in_data_path, args.config_file, args.workers, args.warnings))
@@ -0,0 +1,276 @@
+from typing import Any, Optional, Union
+import dataclasses
+import math
+import re
+from labels4rails import scene
+
+ERROR: str = "error"
+WARNING: str = "warning"
+
+Location = tuple[Union[str, int], ...]
+
+_TRACK_POSITIONS: set[str] = {position.value for position in scene.target.TrackPosition}
+_SWITCH_KINDS: set[str] = {kind.value for kind in scene.target.SwitchKind}
+_SWITCH_DIRECTIONS: set[str] = {direction.value for direction in scene.target.SwitchDirection}
+
+
+@dataclasses.dataclass
+class Issue:
+    """
+    Problem found in an annotation or a chunk.
+    """
+
+    severity: str
+    message: str
+    file: str = ""
+    line: Optional[int] = None
+    location: Location = ()
+
+    def __str__(self) -> str:
+        position: str = self.file if self.line is None else f"{self.file}:{self.line}"
+        where: str = f" at '{'/'.join(str(key) for key in self.location)}'" if self.location else ""
+        return f"{position}: {self.severity}: {self.message}{where}"
+
+    def to_list(self) -> list:
+        return [self.severity, self.message, self.file, self.line, list(self.location)]
+
+    @classmethod
+    def from_list(cls, values: list) -> "Issue":
+        severity, message, file, line, location = values
+        return cls(severity, message, file, line, tuple(location))
+
+
+def known_tags(cfg: Any) -> dict[str, list[str]]:
+    """
+    Tags defined in a RailLabel configuration, by the group name used in
+    annotations.
+    :param cfg: RailLabel configuration or its content as dictionary
+    :return: Tags by group
+    """
+    tags: dict[str, list[str]] = {
+        str(group): [str(tag) for tag in group_tags] for group, group_tags in cfg["targets"]["tags"].items()
+    }
+    # The configuration calls 'additional_attributes' 'additional'
+    if "additional" in tags:
+        tags["additional_attributes"] = tags.pop("additional")
+    return tags
+
+
+def check_annotation(
+    annotation: Any,
+    tags: Optional[dict[str, list[str]]] = None,
+    image_size: Optional[tuple[float, float]] = None,
+) -> list[Issue]:
+    """
+    Check a serialized scene against the format of 'DictSceneSerializer'
+    and geometric invariants: rails need at least two marks, switch boxes
+    two corners, switches may only reference tracks of the scene and marks
+    have to lie within the image.
+    :param annotation: Serialized scene
+    :param tags: Known tags by group, None to accept all tags
+    :param image_size: Width and height of the image, None to skip bounds
+    :return: Issues without file context
+    """
+    issues: list[Issue] = []
+    if not isinstance(annotation, dict):
+        issues.append(Issue(ERROR, f"Expected scene to be an object, got {type(annotation).__name__}."))
+        return issues
+    if "tracks" not in annotation:
+        issues.append(Issue(ERROR, "Missing 'tracks'."))
+    _check_tags(annotation.get("tag groups", {}), tags, issues)
+    tracks: Any = annotation.get("tracks", {})
+    track_ids: set[int] = set()
+    if _expect(isinstance(tracks, dict), "Expected tracks to be an object.", ("tracks",), issues):
+        track_id: str
+        for track_id, track in tracks.items():
+            location: Location = ("tracks", track_id)
+            if not _expect(_is_id(track_id), f"Expected track id, got '{track_id}'.", location, issues):
+                continue
+            track_ids.add(int(track_id))
+            _check_track(track, location, image_size, issues)
+    switches: Any = annotation.get("switches", {})
+    if _expect(isinstance(switches, dict), "Expected switches to be an object.", ("switches",), issues):
+        switch_id: str
+        for switch_id, switch in switches.items():
+            location = ("switches", switch_id)
+            if _expect(_is_id(switch_id), f"Expected switch id, got '{switch_id}'.", location, issues):
+                _check_switch(switch, location, track_ids, image_size, issues)
+    if not any(issue.severity == ERROR for issue in issues):
+        # Anything the checks above missed
+        try:
+            scene.DictSceneSerializer().de_serialize(annotation)
+        except Exception as error:
+            issues.append(Issue(ERROR, f"Could not read scene: {error!r}."))
+    return issues
+
+
+def _check_tags(tag_groups: Any, tags: Optional[dict[str, list[str]]], issues: list[Issue]) -> None:
+    """
+    Tag groups are lists of tags, unknown groups and tags are kept by the
+    annotator and reported as warnings.
+    """
+    if not _expect(isinstance(tag_groups, dict), "Expected tag groups to be an object.", ("tag groups",), issues):
+        return
+    group: str
+    for group, group_tags in tag_groups.items():
+        location: Location = ("tag groups", group)
+        if not _expect(isinstance(group_tags, list), "Expected tags to be a list.", location, issues):
+            continue
+        if tags is None:
+            continue
+        if group not in tags:
+            issues.append(Issue(WARNING, f"Unknown tag group '{group}'.", location=location))
+            continue
+        for tag in group_tags:
+            if tag not in tags[group]:
+                issues.append(Issue(WARNING, f"Unknown tag '{tag}'.", location=location))
+
+
+def _check_track(
+    track: Any,
+    location: Location,
+    image_size: Optional[tuple[float, float]],
+    issues: list[Issue],
+) -> None:
+    if not _expect(isinstance(track, dict), "Expected track to be an object.", location, issues):
+        return
+    position: Any = track.get("relative position")
+    _expect(
+        position in _TRACK_POSITIONS,
+        f"Expected relative position to be one of {sorted(_TRACK_POSITIONS)}, got {position!r}.",
+        location + ("relative position",),
+        issues,
+    )
+    side: str
+    for side in ("left rail", "right rail"):
+        rail: Any = track.get(side)
+        rail_location: Location = location + (side,)
+        if not _expect(
+            isinstance(rail, dict) and isinstance(rail.get("points"), list),
+            "Expected rail with a list of points.",
+            rail_location,
+            issues,
+        ):
+            continue
+        points: list = rail["points"]
+        _expect(
+            len(points) >= 2,
+            f"Expected rail with at least 2 marks, got {len(points)}.",
+            rail_location + ("points",),
+            issues,
+        )
+        index: int
+        for index, point in enumerate(points):
+            _check_point(point, rail_location + ("points", index), image_size, issues)
+
+
+def _check_switch(
+    switch: Any,
+    location: Location,
+    track_ids: set[int],
+    image_size: Optional[tuple[float, float]],
+    issues: list[Issue],
+) -> None:
+    if not _expect(isinstance(switch, dict), "Expected switch to be an object.", location, issues):
+        return
+    kind: Any = switch.get("kind")
+    _expect(
+        kind in _SWITCH_KINDS,
+        f"Expected kind to be one of {sorted(_SWITCH_KINDS)}, got {kind!r}.",
+        location + ("kind",),
+        issues,
+    )
+    direction: Any = switch.get("direction")
+    _expect(
+        direction in _SWITCH_DIRECTIONS,
+        f"Expected direction to be one of {sorted(_SWITCH_DIRECTIONS)}, got {direction!r}.",
+        location + ("direction",),
+        issues,
+    )
+    marks: Any = switch.get("marks")
+    if _expect(
+        isinstance(marks, list) and len(marks) in (0, 2),
+        "Expected switch box with 2 corners or none.",
+        location + ("marks",),
+        issues,
+    ):
+        index: int
+        for index, point in enumerate(marks):
+            _check_point(point, location + ("marks", index), image_size, issues)
+    referenced: Any = switch.get("track_ids", [])
+    if not _expect(isinstance(referenced, list), "Expected track ids to be a list.", location + ("track_ids",), issues):
+        return
+    for track_id in referenced:
+        _expect(
+            isinstance(track_id, int) and track_id in track_ids,
+            f"Switch references missing track {track_id!r}.",
+            location + ("track_ids",),
+            issues,
+        )
+
+
+def _check_point(
+    point: Any,
+    location: Location,
+    image_size: Optional[tuple[float, float]],
+    issues: list[Issue],
+) -> None:
+    coordinates: list = [point.get(axis) for axis in ("x", "y")] if isinstance(point, dict) else []
+    if not _expect(
+        len(coordinates) == 2
+        and all(isinstance(value, (int, float)) and math.isfinite(value) for value in coordinates),
+        "Expected mark with finite 'x' and 'y'.",
+        location,
+        issues,
+    ):
+        return
+    if image_size is not None:
+        x, y = coordinates
+        _expect(
+            0 <= x < image_size[0] and 0 <= y < image_size[1],
+            f"Mark ({x}, {y}) outside of the {image_size[0]:g}x{image_size[1]:g} image.",
+            location,
+            issues,
+        )
+
+
+def _expect(condition: bool, message: str, location: Location, issues: list[Issue]) -> bool:
+    """
+    Record an error if a condition does not hold.
+    :return: Condition
+    """
+    if not condition:
+        issues.append(Issue(ERROR, message, location=location))
+    return condition
+
+
+def _is_id(key: str) -> bool:
+    return isinstance(key, str) and key.isdigit()
+
+
+def locate(text: str, location: Location) -> int:
+    """
+    Line of a location in a serialized scene. Keys are searched in order of
+    the location, list items are counted by their opening brace, so the
+    line is exact for files written by the annotator and approximate for
+    hand-edited ones.
+    :param text: JSON text of the scene
+    :param location: Keys and list indices from the root
+    :return: Line number starting at 1
+    """
+    position: int = 0
+    key: Union[str, int]
+    for key in location:
+        if isinstance(key, int):
+            found: Optional[re.Match] = None
+            for found, _ in zip(re.finditer(r"\{", text[position:]), range(key + 1)):
+                pass
+            if found is None:
+                break
+            position += found.start()
+            continue
+        index: int = text.find(f'"{key}"', position)
+        if index < 0:
+            break
+        position = index
+    return text.count("\n", 0, position) + 1
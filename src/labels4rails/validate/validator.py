@@ -0,0 +1,220 @@
+from typing import Iterable, Optional, Union
+import concurrent.futures
+import hashlib
+import json
+import pathlib
+from labels4rails import data
+from .checks import ERROR, WARNING, Issue, check_annotation, locate
+
+# Images without annotation are listed up to this number per chunk
+_MAX_LISTED: int = 5
+
+
+class ChunkValidator:
+    """
+    Check every annotation of a chunk and the pairing of images and
+    annotations. The result of every annotation is persisted next to the
+    annotations together with its version token and content hash. Only
+    added or changed annotations are read, and only those whose content
+    changed are checked again.
+    """
+
+    VERSION: int = 2
+
+    def __init__(
+        self,
+        chunk_path: Union[pathlib.Path, str],
+        tags: Optional[dict[str, list[str]]] = None,
+        cache_path: Optional[Union[pathlib.Path, str]] = None,
+    ) -> None:
+        """
+        :param chunk_path: Chunk containing the 'images', 'annotations' and
+            'camera' directories
+        :param tags: Known tags by group, None to accept all tags
+        :param cache_path: File to persist the results, None to store them
+            as hidden file in the chunk
+        """
+        self._chunk_path: pathlib.Path = pathlib.Path(chunk_path)
+        self._annotations_path: pathlib.Path = self._chunk_path / "annotations"
+        self._tags: Optional[dict[str, list[str]]] = tags
+        self._cache_path: pathlib.Path = (
+            self._chunk_path / ".annotations.validation.json" if cache_path is None else pathlib.Path(cache_path)
+        )
+        self._image_size: Optional[tuple[float, float]] = None
+        self._store: Optional[data.IAnnotationStore] = None
+        # name -> [content hash, issues]
+        self._cache: Optional[data.StampCache] = None
+        self._chunk_issues: list[Issue] = []
+        self.read: int = 0
+        self.checked: int = 0
+        self._update()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def issues(self) -> list[Issue]:
+        """
+        Issues of the chunk followed by those of its annotations in name
+        order.
+        """
+        issues: list[Issue] = list(self._chunk_issues)
+        for name in self._cache.names:
+            issues += [Issue.from_list(issue) for issue in self._cache[name][1]]
+        return issues
+
+    @property
+    def valid(self) -> bool:
+        return not any(issue.severity == ERROR for issue in self.issues)
+
+    def _update(self) -> None:
+        """
+        Check the pairing of images and annotations, load persisted results
+        and check changed annotations.
+        """
+        if not self._annotations_path.is_dir():
+            msg: str = f"Could not find annotations in '{self._chunk_path}'."
+            raise FileNotFoundError(msg)
+        self._store = data.open_annotation_store(self._annotations_path)
+        self._read_camera()
+        self._check_pairs()
+        # Results depend on the known tags and the image size
+        self._cache = data.StampCache(self._cache_path, self.VERSION, [self._tags, self._image_size])
+        self.read = self._cache.update(self._store.stamps(), self._evaluate)
+
+    def _evaluate(self, name: str) -> Optional[list]:
+        """
+        Check an annotation unless only its stamp changed.
+        :param name: Scene name
+        :return: Content hash and issues, None if not stored
+        """
+        raw: Optional[bytes] = self._store.read_raw(name)
+        if raw is None:
+            return None
+        content_hash: str = hashlib.sha1(raw).hexdigest()
+        previous: Optional[list] = self._cache.previous(name)
+        if previous is not None and previous[0] == content_hash:
+            # Touched but unchanged
+            return previous
+        self.checked += 1
+        issues: list[Issue] = self._check(name, raw)
+        return [content_hash, [issue.to_list() for issue in issues]]
+
+    def _check(self, name: str, raw: bytes) -> list[Issue]:
+        """
+        Check an annotation and add file and line context to its issues.
+        :param name: Scene name
+        :param raw: Stored JSON text
+        :return: Issues of the annotation
+        """
+        file: str = self._file(name)
+        text: str
+        try:
+            text = raw.decode()
+            annotation = json.loads(text)
+        except UnicodeDecodeError as error:
+            return [Issue(ERROR, f"Could not decode annotation: {error}.", file)]
+        except json.JSONDecodeError as error:
+            return [Issue(ERROR, f"Invalid JSON: {error.msg}.", file, error.lineno)]
+        issues: list[Issue] = check_annotation(annotation, self._tags, self._image_size)
+        issue: Issue
+        for issue in issues:
+            issue.file = file
+            if isinstance(self._store, data.DirectoryAnnotationStore):
+                issue.line = locate(text, issue.location)
+        return issues
+
+    def _file(self, name: str) -> str:
+        """
+        File containing an annotation.
+        :param name: Scene name
+        :return: JSON file, or record file and scene name of packed chunks
+        """
+        if isinstance(self._store, data.PackedAnnotationStore):
+            return f"{self._store.path}[{name}]"
+        return str(self._annotations_path / (name + ".json"))
+
+    def _read_camera(self) -> None:
+        """
+        Image size from the camera calibration, marks are not checked for
+        bounds without one.
+        """
+        camera_path: pathlib.Path = self._chunk_path / "camera" / "camera.yaml"
+        try:
+            calibration: data.CameraCalibration = data.read_calibration(camera_path)
+        except FileNotFoundError:
+            self._chunk_issues.append(
+                Issue(WARNING, "No camera calibration, marks are not checked for image bounds.", str(camera_path))
+            )
+            return
+        self._image_size = (float(calibration.width), float(calibration.height))
+
+    def _check_pairs(self) -> None:
+        """
+        Every annotation needs an image and the names of images need to be
+        unique, images without annotation are reported once per chunk.
+        """
+        images_path: pathlib.Path = self._chunk_path / "images"
+        if not images_path.is_dir():
+            self._chunk_issues.append(Issue(ERROR, "Missing images directory.", str(images_path)))
+            return
+        images: dict[str, list[str]] = {}
+        for path in data.ImageListing(images_path, data.IMAGE_EXTENSIONS, natural=False).paths:
+            images.setdefault(path.stem, []).append(path.name)
+        name: str
+        for name, files in images.items():
+            if len(files) > 1:
+                self._chunk_issues.append(
+                    Issue(ERROR, f"Images {', '.join(files)} share one annotation.", str(images_path))
+                )
+        annotated: list[str] = self._store.names()
+        for name in annotated:
+            if name not in images:
+                self._chunk_issues.append(Issue(ERROR, "Annotation without image.", self._file(name)))
+        unannotated: list[str] = sorted(set(images) - set(annotated))
+        if unannotated:
+            listed: str = ", ".join(unannotated[:_MAX_LISTED]) + (", ..." if len(unannotated) > _MAX_LISTED else "")
+            self._chunk_issues.append(
+                Issue(WARNING, f"{len(unannotated)} images without annotation: {listed}.", str(images_path))
+            )
+
+
+
+def _validate_chunk(chunk_path: str, tags: Optional[dict[str, list[str]]]) -> tuple[list[Issue], int, int]:
+    """
+    Worker function, validate a chunk.
+    :param chunk_path: Chunk containing the 'annotations' directory
+    :param tags: Known tags by group
+    :return: Issues, number of annotations read and checked
+    """
+    try:
+        chunk: ChunkValidator = ChunkValidator(chunk_path, tags)
+    except FileNotFoundError as error:
+        return [Issue(ERROR, str(error), chunk_path)], 0, 0
+    return chunk.issues, chunk.read, chunk.checked
+
+
+def validate_chunks(
+    chunk_paths: Iterable[Union[pathlib.Path, str]],
+    tags: Optional[dict[str, list[str]]] = None,
+    workers: int = 1,
+) -> dict[str, list[Issue]]:
+    """
+    Validate chunks, in parallel worker processes if more than one worker
+    is given.
+    :param chunk_paths: Chunks containing an 'annotations' directory
+    :param tags: Known tags by group, None to accept all tags
+    :param workers: Number of worker processes
+    :return: Issues by chunk path, in given order
+    """
+    paths: list[str] = [str(path) for path in chunk_paths]
+    results: list[tuple[list[Issue], int, int]]
+    if workers > 1 and len(paths) > 1:
+        with concurrent.futures.ProcessPoolExecutor(min(workers, len(paths))) as executor:
+            results = list(executor.map(_validate_chunk, paths, [tags] * len(paths)))
+    else:
+        results = [_validate_chunk(path, tags) for path in paths]
+    read: int = sum(result[1] for result in results)
+    checked: int = sum(result[2] for result in results)
+    print(f"Validated {len(paths)} chunks, read {read} changed annotations and checked {checked}.")
+    return {path: result[0] for path, result in zip(paths, results)}